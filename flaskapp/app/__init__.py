@@ -216,6 +216,19 @@ def create_app():
         app.logger.setLevel(logging.INFO)
 
     # ---- DB / Extensions init ----------------------------------------------
+    # Pool sized for bursts of insight writes; pre-ping and recycle replace
+    # connections MySQL has already dropped (wait_timeout) before use. The
+    # compiled-SQL cache is raised from SQLAlchemy's default 500 so the many
+    # distinct (bound-parameter) statement shapes across blueprints stay
+    # cached instead of being recompiled after eviction.
+    if not app.config["SQLALCHEMY_DATABASE_URI"].startswith("sqlite"):
+        app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", {
+            "pool_size": int(_os.getenv("DB_POOL_SIZE", "10")),
+            "max_overflow": int(_os.getenv("DB_MAX_OVERFLOW", "20")),
+            "pool_pre_ping": True,
+            "pool_recycle": 1800,
+            "query_cache_size": int(_os.getenv("DB_QUERY_CACHE_SIZE", "1200")),
+        })
     db.init_app(app)
     migrate.init_app(app, db)
     try:
@@ -604,6 +604,7 @@ def ai_prompt_edit(prompt_id: int):
 def ai_prompt_update(prompt_id: int):
     """Update a specific AI prompt."""
     from app.models_ads import AIPrompt
+    from app.services.ai_prompts_init import bust_prompt_cache
 
     prompt = AIPrompt.query.get_or_404(prompt_id)
 
@@ -628,6 +629,7 @@ def ai_prompt_update(prompt_id: int):
     prompt.updated_by = current_user.id
 
     db.session.commit()
+    bust_prompt_cache(prompt.prompt_key)
 
     flash(f"Updated prompt '{prompt.name}' successfully.", "success")
     _audit("ai_prompt_update", note=f"prompt_id={prompt_id}, key={prompt.prompt_key}")
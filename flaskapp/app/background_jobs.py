@@ -153,7 +153,47 @@ def register_scheduled_jobs(scheduler, app):
         kwargs={'app': app}
     )
 
-    app.logger.info("Registered 5 scheduled background jobs")
+    # Store results of finished FB Ads insight batches (every 30 minutes)
+    scheduler.add_job(
+        func=poll_fbads_insight_batches,
+        trigger='interval',
+        minutes=30,
+        id='poll_fbads_insight_batches',
+        replace_existing=True,
+        kwargs={'app': app}
+    )
+
+    # Store results of finished GA insight batches (every 30 minutes)
+    scheduler.add_job(
+        func=poll_ga_insight_batches,
+        trigger='interval',
+        minutes=30,
+        id='poll_ga_insight_batches',
+        replace_existing=True,
+        kwargs={'app': app}
+    )
+
+    # Store results of finished GLSA insight batches (every 30 minutes)
+    scheduler.add_job(
+        func=poll_glsa_insight_batches,
+        trigger='interval',
+        minutes=30,
+        id='poll_glsa_insight_batches',
+        replace_existing=True,
+        kwargs={'app': app}
+    )
+
+    # Re-queue emails a restarted process never delivered (every 10 minutes)
+    scheduler.add_job(
+        func=requeue_stale_emails,
+        trigger='interval',
+        minutes=10,
+        id='requeue_stale_emails',
+        replace_existing=True,
+        kwargs={'app': app}
+    )
+
+    app.logger.info("Registered 9 scheduled background jobs")
 
 
 # ===== Scheduled Job Functions =====
@@ -281,7 +321,7 @@ def send_welcome_emails(app: Flask):
     """
     with app.app_context():
         from app.models import User
-        from app.services.email_service import send_welcome_email
+        from app.services.email_service import build_welcome_email, send_bulk
 
         try:
             # Find users who registered in last 7 days but no welcome email sent
@@ -292,15 +332,16 @@ def send_welcome_emails(app: Flask):
                 User.created_at >= datetime.utcnow() - timedelta(days=7)
             ).limit(100).all()
 
-            sent_count = 0
+            messages = []
             for user in recent_users:
                 try:
-                    if send_welcome_email(user):
-                        sent_count += 1
+                    messages.append(build_welcome_email(user))
                 except Exception as e:
-                    current_app.logger.warning(f"Failed to send welcome email to {user.email}: {e}")
+                    current_app.logger.warning(f"Failed to build welcome email for {user.email}: {e}")
                     continue
 
+            # One SMTP session for the whole batch
+            sent_count = sum(send_bulk(messages))
             current_app.logger.info(f"Sent {sent_count} welcome emails")
 
         except Exception as e:
@@ -453,6 +494,78 @@ def generate_google_ads_insights_daily(app: Flask):
             current_app.logger.error(f"Error in daily Google Ads insights job: {e}", exc_info=True)
 
 
+def poll_fbads_insight_batches(app: Flask):
+    """
+    Store recommendations from finished FB Ads OpenAI batch jobs.
+
+    Batches are submitted by submit_fbads_insights_batch() and complete
+    asynchronously within 24 hours.
+    """
+    with app.app_context():
+        from app.services.fbads_insights import poll_fbads_insight_batches as poll
+
+        try:
+            finished = poll()
+            if finished:
+                current_app.logger.info(f"Processed {finished} finished FB Ads insight batches")
+
+        except Exception as e:
+            current_app.logger.error(f"Error polling FB Ads insight batches: {e}", exc_info=True)
+
+
+def poll_ga_insight_batches(app: Flask):
+    """
+    Store recommendations from finished Google Analytics OpenAI batch jobs.
+
+    Batches are submitted by generate_ga_insights_batch() and complete
+    asynchronously within 24 hours.
+    """
+    with app.app_context():
+        from app.services.ga_insights import poll_ga_insight_batches as poll
+
+        try:
+            finished = poll()
+            if finished:
+                current_app.logger.info(f"Processed {finished} finished GA insight batches")
+
+        except Exception as e:
+            current_app.logger.error(f"Error polling GA insight batches: {e}", exc_info=True)
+
+
+def poll_glsa_insight_batches(app: Flask):
+    """
+    Store recommendations from finished Local Services Ads OpenAI batch jobs.
+
+    Batches are submitted by submit_glsa_insights_batch() and complete
+    asynchronously within 24 hours.
+    """
+    with app.app_context():
+        from app.services.glsa_insights import poll_glsa_insight_batches as poll
+
+        try:
+            finished = poll()
+            if finished:
+                current_app.logger.info(f"Processed {finished} finished GLSA insight batches")
+
+        except Exception as e:
+            current_app.logger.error(f"Error polling GLSA insight batches: {e}", exc_info=True)
+
+
+def requeue_stale_emails(app: Flask):
+    """
+    Queue again emails left in the outbox by a process that exited before
+    delivering them. Emails that exhausted their retries stay 'failed'.
+    """
+    with app.app_context():
+        from app.services.email_service import requeue_stale_emails as requeue
+
+        try:
+            requeue()
+
+        except Exception as e:
+            current_app.logger.error(f"Error re-queueing stale emails: {e}", exc_info=True)
+
+
 # ===== Manual Job Execution =====
 
 def run_job_now(job_id: str):
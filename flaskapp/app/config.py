@@ -52,8 +52,12 @@ class Config:
 
     # Email settings
     EMAIL_PROVIDER = os.environ.get("EMAIL_PROVIDER", "smtp")  # 'smtp' or 'sendgrid'
+    EMAIL_PROVIDER_CHAIN = os.environ.get("EMAIL_PROVIDER_CHAIN", "")  # failover order, e.g. "sendgrid,smtp"
     EMAIL_FROM = os.environ.get("EMAIL_FROM", "noreply@fieldsprout.com")
     EMAIL_FROM_NAME = os.environ.get("EMAIL_FROM_NAME", "FieldSprout")
+    EMAIL_SEND_ASYNC = os.environ.get("EMAIL_SEND_ASYNC", "true").lower() == "true"  # send from a background pool
+    EMAIL_WORKERS = int(os.environ.get("EMAIL_WORKERS", "4"))
+    EMAIL_MAX_RETRIES = int(os.environ.get("EMAIL_MAX_RETRIES", "5"))
 
     # SMTP settings (if using SMTP provider)
     SMTP_HOST = os.environ.get("SMTP_HOST", "localhost")
@@ -64,6 +68,7 @@ class Config:
 
     # SendGrid settings (if using SendGrid provider)
     SENDGRID_API_KEY = os.environ.get("SENDGRID_API_KEY", "")
+    SENDGRID_RPM = int(os.environ.get("SENDGRID_RPM", "600"))  # client-side requests/minute cap
 
     # Sentry error tracking and monitoring
     SENTRY_DSN = os.environ.get("SENTRY_DSN", "")
@@ -661,7 +661,14 @@ def optimize_ads_json():
 @fbads_bp.post("/insights.json", endpoint="insights_json")
 @login_required
 def insights_json():
-    """Generate AI-powered optimization insights for Facebook Ads profile and campaigns."""
+    """
+    Generate AI-powered optimization insights for Facebook Ads profile and campaigns.
+
+    This blocks the worker thread on OpenAI, which is I/O wait with the GIL
+    released, so run threaded workers rather than moving to ASGI. Repeat
+    requests for the same account share one generation and the cached
+    response; bulk refreshes go through submit_fbads_insights_batch().
+    """
     aid = current_account_id()
 
     try:
@@ -3048,8 +3048,13 @@ def oauth_callback():
 @google_bp.route("/ga/insights.json", methods=["POST"], endpoint="ga_insights_json")
 @login_required
 def ga_insights_json():
-    """Generate AI insights for Google Analytics property."""
-    from app.services.ga_insights import generate_ga_insights
+    """
+    Generate AI insights for Google Analytics property.
+
+    With "background": true the generation runs off the request and a job id
+    is returned at once; poll ga_insights_job for the result.
+    """
+    from app.services.ga_insights import generate_ga_insights, start_ga_insights_job
 
     aid = current_account_id()
     data = request.get_json() if request.is_json else {}
@@ -3060,6 +3065,10 @@ def ga_insights_json():
         return jsonify({"ok": False, "error": "Missing property_id"}), 400
 
     try:
+        if data.get("background"):
+            job_id = start_ga_insights_job(aid, property_id, regenerate=regenerate)
+            return jsonify({"ok": True, "status": "pending", "job_id": job_id}), 202
+
         insights = generate_ga_insights(aid, property_id, regenerate=regenerate)
         return jsonify({"ok": True, **insights})
     except Exception as e:
@@ -3067,6 +3076,23 @@ def ga_insights_json():
         return jsonify({"ok": False, "error": str(e)}), 500
 
 
+@google_bp.route("/ga/insights/jobs/<job_id>.json", methods=["GET"], endpoint="ga_insights_job")
+@login_required
+def ga_insights_job(job_id):
+    """Status, and once complete the result, of a background GA insights job."""
+    from app.services.ga_insights import get_ga_insights_job
+
+    job = get_ga_insights_job(job_id, current_account_id())
+    if job is None:
+        return jsonify({"ok": False, "error": "Job not found"}), 404
+
+    if job["status"] == "complete":
+        return jsonify({"ok": True, "status": "complete", **job["result"]})
+    if job["status"] == "failed":
+        return jsonify({"ok": False, "status": "failed", "error": job.get("error", "")}), 500
+    return jsonify({"ok": True, "status": "pending"})
+
+
 @google_bp.route("/ga/apply-recommendation", methods=["POST"], endpoint="ga_apply_recommendation")
 @login_required
 def ga_apply_recommendation():
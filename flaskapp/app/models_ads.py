@@ -317,6 +317,13 @@ class OptimizerRecommendation(db.Model):
     __table_args__ = (
         db.Index("ix_opt_scope", "scope_type", "scope_id"),
         db.Index("ix_opt_source", "source_type", "source_id"),
+        # Open recommendations for an account, listed by severity then recency
+        db.Index("ix_optrec_acct_src_status_sev_ctime", "account_id", "source_type", "status", "severity", "created_at"),
+        # "Any insights newer than N hours?" freshness checks
+        db.Index("ix_optrec_recent", "account_id", "source_type", "status", "created_at"),
+        # Same two lookups scoped to one property/site (GA, Search Console)
+        db.Index("ix_optrec_src_id_status_sev", "account_id", "source_type", "source_id", "status", "severity"),
+        db.Index("ix_optrec_src_id_recent", "account_id", "source_type", "source_id", "status", "created_at"),
     )
 
 
@@ -343,6 +350,35 @@ class OptimizerAction(db.Model):
     notes = db.Column(db.Text, nullable=True)  # Optional notes (e.g., dismissal reason)
 
 
+class OptimizerBatchJob(db.Model):
+    """
+    An OpenAI Batch API job submitted for non-interactive insight regeneration.
+    A poller picks up finished batches and stores their recommendations.
+    """
+    __tablename__ = "optimizer_batch_jobs"
+
+    id = db.Column(db.BigInteger, primary_key=True)
+    source_type = db.Column(db.String(32), nullable=False)  # 'fbads'|...
+
+    # OpenAI identifiers
+    batch_id = db.Column(db.String(64), unique=True, nullable=False)
+    input_file_id = db.Column(db.String(64), nullable=False)
+    output_file_id = db.Column(db.String(64), nullable=True)
+
+    # submitted|completed|failed|expired|cancelled
+    status = db.Column(db.String(16), nullable=False, default="submitted", index=True)
+
+    # JSON object keyed by account ID with the inputs each request was built from
+    request_json = db.Column(db.Text, nullable=False)
+    error = db.Column(db.Text, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=utcnow, nullable=False)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<OptimizerBatchJob {self.source_type} {self.batch_id} {self.status}>"
+
+
 class AIPrompt(db.Model):
     """
     Stores AI prompts for different Google product optimization features.
@@ -426,7 +462,7 @@ class PerformanceMetrics(db.Model):
     # Core metrics (flexible JSON blob for source-specific metrics)
     metrics_json = db.Column(db.Text, nullable=False)
     # Examples:
-    # Google Ads: {"impressions": 1000, "clicks": 50, "cost": 25.50, "conversions": 5}
+    # Google Ads: {"impressions": 1000, "clicks": 50, "cost_micros": 25500000, "conversions": 5}
     # Analytics: {"sessions": 500, "pageviews": 1200, "bounce_rate": 45.2, "avg_session_duration": 120}
     # GSC: {"impressions": 5000, "clicks": 200, "ctr": 4.0, "position": 12.5}
     # GLSA: {"leads": 10, "phone_calls": 5, "messages": 3, "bookings": 2}
@@ -0,0 +1,64 @@
+# app/models_email.py
+"""
+Durable record of emails handed to the background worker pool.
+
+A row is written before a send is queued and deleted once it is delivered:
+- 'queued' rows that stop being updated belong to a process that exited
+  before delivering them; requeue_stale_emails() submits them again
+- 'failed' rows exhausted their retries and stay as a dead-letter record
+"""
+
+from datetime import datetime
+
+from sqlalchemy.dialects.mysql import MEDIUMTEXT
+from app import db
+
+# Rendered bodies can exceed TEXT's 64 KB on MySQL
+BodyType = db.Text().with_variant(MEDIUMTEXT(), 'mysql')
+
+
+class EmailOutbox(db.Model):
+    __tablename__ = "email_outbox"
+
+    id = db.Column(db.BigInteger, primary_key=True)
+
+    to_email = db.Column(db.String(255), nullable=False)
+    subject = db.Column(db.String(998), nullable=False)
+    html_body = db.Column(BodyType, nullable=False)
+    text_body = db.Column(BodyType, nullable=True)
+    reply_to = db.Column(db.String(255), nullable=True)
+    idempotency_key = db.Column(db.String(255), nullable=True)
+
+    # queued|failed
+    status = db.Column(db.String(16), nullable=False, default="queued", index=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text, nullable=True)
+
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f"<EmailOutbox {self.id} {self.to_email} {self.status}>"
+
+
+def ensure_email_tables():
+    """Create the email outbox table if it doesn't exist (for deployments without Alembic)."""
+    with db.engine.begin() as conn:
+        conn.execute(db.text("""
+        CREATE TABLE IF NOT EXISTS email_outbox (
+            id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            to_email VARCHAR(255) NOT NULL,
+            subject VARCHAR(998) NOT NULL,
+            html_body MEDIUMTEXT NOT NULL,
+            text_body MEDIUMTEXT NULL,
+            reply_to VARCHAR(255) NULL,
+            idempotency_key VARCHAR(255) NULL,
+            status VARCHAR(16) NOT NULL DEFAULT 'queued',
+            attempts INT NOT NULL DEFAULT 0,
+            error TEXT NULL,
+            created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            INDEX idx_email_outbox_status (status),
+            INDEX idx_email_outbox_updated (updated_at)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+        """))
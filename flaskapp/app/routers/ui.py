@@ -1,6 +1,6 @@
 # app/routers/ui.py
 from fastapi import APIRouter, Request, Form, Depends, HTTPException
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, Response
 from sqlalchemy.orm import Session
 from typing import Optional, List
 import json
@@ -8,7 +8,7 @@ import json
 from app.db import get_db
 from app.models import CompanyProfile, CampaignDraft
 from app.services.llm_service import generate_pain_service_campaign
-from app.services.export_service import draft_to_excel
+from app.services.export_service import XLSX_MIMETYPE, draft_to_excel_bytes
 from app.services.validation import validate_draft_no_broad
 
 router = APIRouter()
@@ -112,8 +112,13 @@ def builder_export(draft_id: int, db: Session = Depends(get_db)):
     draft = db.get(CampaignDraft, draft_id)
     if not draft:
         raise HTTPException(404, "Draft not found")
-    path = draft_to_excel(draft.draft_json, f"draft_{draft.id}.xlsx")
-    return RedirectResponse(url=f"/download/local?path={path}", status_code=302)
+    # Serve straight from memory instead of writing to disk and redirecting to /download/local;
+    # the workbook is already fully buffered, so send it in one body with a Content-Length
+    return Response(
+        content=draft_to_excel_bytes(draft.draft_json).getvalue(),
+        media_type=XLSX_MIMETYPE,
+        headers={"Content-Disposition": f'attachment; filename="draft_{draft.id}.xlsx"'},
+    )
 
 @router.post("/builder/approve/{draft_id}")
 def builder_approve(draft_id: int, db: Session = Depends(get_db)):
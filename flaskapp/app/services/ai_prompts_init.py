@@ -4,9 +4,19 @@ Initialize default AI prompts in the database.
 This extracts hardcoded prompts from the services and stores them in the AIPrompt table.
 """
 
+import threading
+import time
+
 from app import db
 from app.models_ads import AIPrompt
 
+# Prompt configs are read on every insight request but change only when an
+# admin edits them, so they're cached per process. Edits made through this
+# process bust the cache immediately; other workers pick them up within the TTL.
+_PROMPT_CACHE_TTL = 300
+_prompt_cache = {}  # prompt_key -> (expires_at, config or None)
+_prompt_cache_lock = threading.Lock()
+
 
 def initialize_ai_prompts(force=False):
     """
@@ -80,25 +90,9 @@ Return ONLY valid JSON array of recommendations, no additional text.'''
         ga_prompt.name = 'Google Analytics Optimization'
         ga_prompt.description = 'Main prompt for generating Google Analytics optimization recommendations'
         ga_prompt.system_message = 'You are a Google Analytics expert providing data-driven optimization recommendations in JSON format.'
-        ga_prompt.prompt_template = '''You are a Google Analytics optimization expert. Analyze the following GA4 data and provide actionable recommendations.
-
-PROPERTY PERFORMANCE (Last 30 Days):
-- Sessions: {sessions}
-- Users: {users}
-- Engagement Rate: {engagement_rate}
-- Avg Session Duration: {avg_session_duration}s
-- Conversions: {conversions}
-- Conversion Rate: {conversion_rate}
-- Revenue: ${revenue}
-
-TOP PAGES:
-{top_pages}
-
-TOP TRAFFIC SOURCES:
-{top_sources}
-
-CONVERSION EVENTS:
-{conversions_data}
+        # Static instructions first and the property's data last, so the
+        # prompt prefix is identical across calls and OpenAI can cache it
+        ga_prompt.prompt_template = '''You are a Google Analytics optimization expert. Analyze the GA4 data below and provide actionable recommendations.
 
 Provide 5-10 specific, actionable recommendations in JSON format. Each recommendation should include:
 - title: Brief, action-oriented title
@@ -116,7 +110,25 @@ Focus on:
 4. User engagement enhancements
 5. Technical performance issues
 
-Return ONLY valid JSON array of recommendations, no additional text.'''
+Return ONLY a JSON object with a "recommendations" array, no additional text.
+
+PROPERTY PERFORMANCE (Last 30 Days):
+- Sessions: {sessions}
+- Users: {users}
+- Engagement Rate: {engagement_rate}
+- Avg Session Duration: {avg_session_duration}s
+- Conversions: {conversions}
+- Conversion Rate: {conversion_rate}
+- Revenue: ${revenue}
+
+TOP PAGES:
+{top_pages}
+
+TOP TRAFFIC SOURCES:
+{top_sources}
+
+CONVERSION EVENTS:
+{conversions_data}'''
         ga_prompt.model = 'gpt-4o-mini'
         ga_prompt.temperature = 0.7
         ga_prompt.max_tokens = 2000
@@ -379,9 +391,19 @@ Return ONLY valid JSON array of recommendations, no additional text.'''
         count += 1
 
     db.session.commit()
+    bust_prompt_cache()
     return count
 
 
+def bust_prompt_cache(prompt_key: str = None):
+    """Forget cached prompt configs (one key, or all) after prompts are edited."""
+    with _prompt_cache_lock:
+        if prompt_key is None:
+            _prompt_cache.clear()
+        else:
+            _prompt_cache.pop(prompt_key, None)
+
+
 def get_prompt_for_service(prompt_key: str) -> dict:
     """
     Retrieve a prompt configuration for a service.
@@ -393,16 +415,26 @@ def get_prompt_for_service(prompt_key: str) -> dict:
         Dict with prompt_template, system_message, model, temperature, max_tokens
         Returns None if prompt not found or not active
     """
+    now = time.monotonic()
+    with _prompt_cache_lock:
+        cached = _prompt_cache.get(prompt_key)
+    if cached and cached[0] > now:
+        return dict(cached[1]) if cached[1] else None
+
     prompt = AIPrompt.query.filter_by(prompt_key=prompt_key, is_active=True).first()
 
-    if not prompt:
-        return None
-
-    return {
-        'prompt_template': prompt.prompt_template,
-        'system_message': prompt.system_message,
-        'model': prompt.model,
-        'temperature': prompt.temperature,
-        'max_tokens': prompt.max_tokens,
-        'name': prompt.name
-    }
+    config = None
+    if prompt:
+        config = {
+            'prompt_template': prompt.prompt_template,
+            'system_message': prompt.system_message,
+            'model': prompt.model,
+            'temperature': prompt.temperature,
+            'max_tokens': prompt.max_tokens,
+            'name': prompt.name
+        }
+
+    with _prompt_cache_lock:
+        _prompt_cache[prompt_key] = (now + _PROMPT_CACHE_TTL, config)
+
+    return dict(config) if config else None
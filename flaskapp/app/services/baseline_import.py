@@ -7,12 +7,129 @@ This allows capturing performance BEFORE using FieldSprout for YoY comparison.
 from __future__ import annotations
 import datetime as dt
 import json
+import os
+import queue
+import re
+import threading
 from typing import Dict, List, Optional, Any
 from dateutil.relativedelta import relativedelta
 
 from app.services.metrics_service import save_metrics, save_metrics_batch
 
 
+_NUMERIC_RE = re.compile(r'^[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?$')
+_INT_RE = re.compile(r'^[-+]?\d+$')
+
+# Background read-ahead for large CSV imports
+_PREFETCH_CHUNK_SIZE = 1 << 20  # characters per read()
+_PREFETCH_DEPTH = 4             # chunks buffered ahead of the parser
+
+# Static content served by generate_baseline_template() /
+# get_baseline_import_instructions(); built once at import.
+_BASELINE_CSV_TEMPLATE = """date,impressions,clicks,spend,conversions
+2024-01-01,10000,500,250.50,25
+2024-01-02,12000,600,300.00,30
+2024-01-03,11000,550,275.25,28
+# Add your historical data below
+# Date format: YYYY-MM-DD
+# Spend in dollars (not cents or micros)
+# Add any additional metric columns as needed
+"""
+
+_BASELINE_IMPORT_INSTRUCTIONS: Dict[str, Any] = {
+    'overview': 'Import historical performance data from before using FieldSprout to enable YoY comparison',
+    'methods': [
+        {
+            'name': 'CSV Import',
+            'description': 'Import from exported CSV files',
+            'steps': [
+                '1. Export historical data from Google Ads, Facebook Ads, etc.',
+                '2. Format as CSV with columns: date, impressions, clicks, spend, conversions',
+                '3. Use import_baseline_from_csv() function',
+                '4. Verify import with SQL query'
+            ]
+        },
+        {
+            'name': 'API Import',
+            'description': 'Fetch historical data directly from APIs',
+            'steps': [
+                '1. Use import_google_ads_historical() for Google Ads',
+                '2. Use import_facebook_ads_historical() for Facebook Ads',
+                '3. Specify date range (e.g., last 12 months)',
+                '4. Data is automatically saved to performance_metrics table'
+            ]
+        },
+        {
+            'name': 'Manual Import',
+            'description': 'Enter monthly aggregates from spreadsheets',
+            'steps': [
+                '1. Prepare monthly data as list of dictionaries',
+                '2. Use import_manual_baseline() function',
+                '3. Data is stored as monthly aggregates',
+                '4. Suitable when daily data is not available'
+            ]
+        }
+    ],
+    'example_csv_format': _BASELINE_CSV_TEMPLATE,
+    'recommended_period': '12 months of historical data for meaningful YoY comparison'
+}
+
+
+def _coerce_metric(value: Optional[str]) -> Any:
+    """Convert a CSV cell to int/float when numeric, otherwise return it unchanged."""
+    # Match first so non-numeric columns never go through a raised ValueError
+    stripped = value.strip() if value else value
+    if not stripped or not _NUMERIC_RE.match(stripped):
+        return value
+    if _INT_RE.match(stripped):
+        return int(stripped)
+    return float(stripped)
+
+
+def _iter_prefetched_lines(f, chunk_size: int = _PREFETCH_CHUNK_SIZE, depth: int = _PREFETCH_DEPTH):
+    """
+    Yield lines from a text file while a background thread reads ahead.
+
+    Disk reads for the next chunks overlap with parsing/saving of the
+    current one. Lines keep their trailing newline so csv.reader can
+    still handle quoted fields that span lines.
+    """
+    chunks: queue.Queue = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def _reader():
+        try:
+            while not stop.is_set():
+                chunk = f.read(chunk_size)
+                chunks.put(chunk)
+                if not chunk:
+                    return
+        except Exception as e:
+            chunks.put(e)
+
+    threading.Thread(target=_reader, daemon=True).start()
+
+    tail = ''
+    try:
+        while True:
+            chunk = chunks.get()
+            if isinstance(chunk, Exception):
+                raise chunk
+            if not chunk:
+                break
+            lines = (tail + chunk).split('\n')
+            tail = lines.pop()
+            for line in lines:
+                yield line + '\n'
+        if tail:
+            yield tail
+    finally:
+        # Unblock the reader if we stopped early
+        stop.set()
+        while not chunks.empty():
+            chunks.get_nowait()
+
+
 def import_baseline_from_csv(
     account_id: int,
     source_type: str,
@@ -40,28 +157,45 @@ def import_baseline_from_csv(
     errors = []
 
     try:
-        with open(csv_file_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
+        with open(csv_file_path, 'r', encoding='utf-8', newline='') as f:
+            if hasattr(os, 'posix_fadvise'):
+                try:
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                except OSError:
+                    pass
+
+            reader = csv.reader(_iter_prefetched_lines(f))
+
+            # Resolve column positions once from the header instead of
+            # building a dict per row
+            header = next(reader, None)
+            if header is None:
+                return {'success': True, 'imported': 0, 'errors': None}
+            if 'date' not in header:
+                return {
+                    'success': False,
+                    'error': "CSV is missing required 'date' column",
+                    'imported': 0
+                }
+
+            width = len(header)
+            date_idx = header.index('date')
+            metric_cols = [(i, name) for i, name in enumerate(header) if name != 'date']
 
             for row in reader:
+                if not row:
+                    continue  # blank line
+
                 try:
+                    if len(row) < width:
+                        row += [None] * (width - len(row))
+
                     # Parse date
-                    date_str = row.get('date', '')
+                    date_str = row[date_idx] or ''
                     date = dt.datetime.strptime(date_str, '%Y-%m-%d').date()
 
                     # Build metrics dict from row
-                    metrics = {}
-                    for key, value in row.items():
-                        if key == 'date':
-                            continue
-                        # Try to convert to number
-                        try:
-                            if '.' in value:
-                                metrics[key] = float(value)
-                            else:
-                                metrics[key] = int(value)
-                        except (ValueError, AttributeError):
-                            metrics[key] = value
+                    metrics = {name: _coerce_metric(row[i]) for i, name in metric_cols}
 
                     # Save to database
                     save_metrics(
@@ -144,7 +278,8 @@ def import_google_ads_historical(
                 metrics = {
                     'impressions': row.metrics.impressions,
                     'clicks': row.metrics.clicks,
-                    'cost': row.metrics.cost_micros / 1_000_000,
+                    # Kept in micros; save_metrics() derives the dollar spend column
+                    'cost_micros': row.metrics.cost_micros,
                     'conversions': row.metrics.conversions,
                     'conversion_value': row.metrics.conversions_value
                 }
@@ -336,59 +471,16 @@ def generate_baseline_template() -> str:
     Returns:
         CSV string with header row and example data
     """
-    template = """date,impressions,clicks,spend,conversions
-2024-01-01,10000,500,250.50,25
-2024-01-02,12000,600,300.00,30
-2024-01-03,11000,550,275.25,28
-# Add your historical data below
-# Date format: YYYY-MM-DD
-# Spend in dollars (not cents or micros)
-# Add any additional metric columns as needed
-"""
-    return template
+    return _BASELINE_CSV_TEMPLATE
 
 
 def get_baseline_import_instructions() -> Dict[str, Any]:
     """
     Get instructions for importing baseline data.
 
+    The returned dict is shared module state; treat it as read-only.
+
     Returns:
         Dictionary with step-by-step instructions
     """
-    return {
-        'overview': 'Import historical performance data from before using FieldSprout to enable YoY comparison',
-        'methods': [
-            {
-                'name': 'CSV Import',
-                'description': 'Import from exported CSV files',
-                'steps': [
-                    '1. Export historical data from Google Ads, Facebook Ads, etc.',
-                    '2. Format as CSV with columns: date, impressions, clicks, spend, conversions',
-                    '3. Use import_baseline_from_csv() function',
-                    '4. Verify import with SQL query'
-                ]
-            },
-            {
-                'name': 'API Import',
-                'description': 'Fetch historical data directly from APIs',
-                'steps': [
-                    '1. Use import_google_ads_historical() for Google Ads',
-                    '2. Use import_facebook_ads_historical() for Facebook Ads',
-                    '3. Specify date range (e.g., last 12 months)',
-                    '4. Data is automatically saved to performance_metrics table'
-                ]
-            },
-            {
-                'name': 'Manual Import',
-                'description': 'Enter monthly aggregates from spreadsheets',
-                'steps': [
-                    '1. Prepare monthly data as list of dictionaries',
-                    '2. Use import_manual_baseline() function',
-                    '3. Data is stored as monthly aggregates',
-                    '4. Suitable when daily data is not available'
-                ]
-            }
-        ],
-        'example_csv_format': generate_baseline_template(),
-        'recommended_period': '12 months of historical data for meaningful YoY comparison'
-    }
+    return _BASELINE_IMPORT_INSTRUCTIONS
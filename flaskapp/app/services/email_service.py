@@ -9,27 +9,113 @@ Supports multiple providers:
 
 Configuration via environment variables:
 - EMAIL_PROVIDER: 'smtp' or 'sendgrid'
+- EMAIL_PROVIDER_CHAIN: optional failover order, e.g. 'sendgrid,smtp'
+- EMAIL_SEND_ASYNC: 'true' to hand sends to a background worker pool (default)
+- EMAIL_WORKERS, EMAIL_MAX_RETRIES: background pool size and retry budget;
+  queued sends are recorded in the email_outbox table until delivered
+  (see app/models_email.py)
 - For SMTP:
   - SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASSWORD, SMTP_USE_TLS
 - For SendGrid:
   - SENDGRID_API_KEY
+  - SENDGRID_RPM: client-side cap on API calls per minute, per process
 """
 
+import atexit
+import hashlib
+import logging
 import os
+import queue
+import random
+import re
 import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from html.parser import HTMLParser
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from email import policy
+from email.message import EmailMessage
+from pathlib import Path
 from typing import Optional, List, Dict, Any
-from flask import current_app, render_template_string
+
+import jinja2
+from flask import current_app
+
+try:
+    from sendgrid import SendGridAPIClient
+    from sendgrid.helpers.mail import Mail, Email, To, Content
+    from python_http_client.exceptions import HTTPError, TooManyRequestsError
+    _SENDGRID_OK = True
+except ImportError:  # SendGrid is optional; SMTP-only deployments don't install it
+    _SENDGRID_OK = False
+
+# Child of the Flask "app" logger, so records reach the app's handlers; works
+# from worker threads without an app context and defers message formatting.
+logger = logging.getLogger(__name__)
+
+# Provider/transport failures. Transient ones (see _is_overload_error: 429,
+# 5xx, SMTP 4xx, dropped connections) fail over to the next provider in the
+# chain and are retried from the background pool; permanent ones (HTTP 4xx,
+# refused recipients, auth failures) and anything else (bad template data,
+# missing config) fail fast on the first attempt.
+_PROVIDER_ERRORS = (smtplib.SMTPException, OSError) + ((HTTPError,) if _SENDGRID_OK else ())
+_PROVIDER_COOLDOWN = 60.0  # seconds a failing provider is moved to the back of the chain
+_RETRY_BASE_DELAY = 2.0   # seconds, doubled on each attempt
+_RETRY_MAX_DELAY = 60.0
+
+# Created lazily so each gunicorn worker gets its own pool after fork.
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+# Outbox rows still 'queued' this long after their last update are assumed
+# to belong to a process that exited before delivering them.
+_OUTBOX_STALE_AFTER = timedelta(minutes=30)
+
+_SMTP_TIMEOUT = 30                      # seconds, per socket operation
+_SMTP_POOL_SIZE = 4                     # idle connections kept per server/login
+_SMTP_MAX_SENDS_PER_CONNECTION = 1000   # rotate well below provider per-connection caps
+
+_SENDGRID_MAX_429_RETRIES = 3
+
+_IDEMPOTENCY_TTL = 7 * 24 * 3600  # seconds a delivered idempotency key is remembered
+_LOCAL_SENT_KEYS_MAX = 10000
+
+# Transactional templates only use the values passed to them, so they are
+# compiled once at import with a standalone environment rather than looked
+# up through current_app.jinja_env on every send.
+_TEMPLATE_ENV = jinja2.Environment(
+    loader=jinja2.FileSystemLoader(Path(__file__).resolve().parents[2] / "templates"),
+    autoescape=True,
+)
+_TEAM_INVITE_TMPL = _TEMPLATE_ENV.get_template("emails/team_invite.html")
+_WELCOME_TMPL = _TEMPLATE_ENV.get_template("emails/welcome.html")
+_SUBSCRIPTION_CONFIRMATION_TMPL = _TEMPLATE_ENV.get_template("emails/subscription_confirmation.html")
+_PAYMENT_FAILED_TMPL = _TEMPLATE_ENV.get_template("emails/payment_failed.html")
 
 
 def get_email_config() -> Dict[str, Any]:
-    """Get email configuration from app config or environment."""
-    return {
+    """
+    Get email configuration from app config or environment.
+
+    Resolved once per app and cached on it, since settings don't change
+    while the process runs. Treat the returned dict as read-only; delete
+    ``app._email_config`` after reconfiguring an app to pick up changes.
+    """
+    config = getattr(current_app, '_email_config', None)
+    if config is not None:
+        return config
+
+    config = {
         'provider': current_app.config.get('EMAIL_PROVIDER', os.getenv('EMAIL_PROVIDER', 'smtp')),
+        'provider_chain': current_app.config.get('EMAIL_PROVIDER_CHAIN', os.getenv('EMAIL_PROVIDER_CHAIN', '')),
         'from_email': current_app.config.get('EMAIL_FROM', os.getenv('EMAIL_FROM', 'noreply@fieldsprout.com')),
         'from_name': current_app.config.get('EMAIL_FROM_NAME', os.getenv('EMAIL_FROM_NAME', 'FieldSprout')),
 
+        'base_url': current_app.config.get('BASE_URL', 'http://localhost:5000'),
+
         # SMTP settings
         'smtp_host': current_app.config.get('SMTP_HOST', os.getenv('SMTP_HOST', 'localhost')),
         'smtp_port': int(current_app.config.get('SMTP_PORT', os.getenv('SMTP_PORT', '587'))),
@@ -39,7 +125,393 @@ def get_email_config() -> Dict[str, Any]:
 
         # SendGrid settings
         'sendgrid_api_key': current_app.config.get('SENDGRID_API_KEY', os.getenv('SENDGRID_API_KEY', '')),
+        'sendgrid_rpm': int(current_app.config.get('SENDGRID_RPM', os.getenv('SENDGRID_RPM', '600'))),
+
+        # Background delivery (sends run synchronously under TESTING)
+        'send_async': current_app.config.get('EMAIL_SEND_ASYNC', os.getenv('EMAIL_SEND_ASYNC', 'true').lower() == 'true') and not current_app.testing,
+        'workers': int(current_app.config.get('EMAIL_WORKERS', os.getenv('EMAIL_WORKERS', '4'))),
+        'max_retries': int(current_app.config.get('EMAIL_MAX_RETRIES', os.getenv('EMAIL_MAX_RETRIES', '5'))),
     }
+    # Ordered failover list, e.g. "sendgrid,smtp"; defaults to just EMAIL_PROVIDER
+    chain = config['provider_chain']
+    if isinstance(chain, str):
+        chain = [p.strip() for p in chain.split(',') if p.strip()]
+    config['provider_chain'] = list(chain) or [config['provider']]
+
+    current_app._email_config = config
+    return config
+
+
+def _get_executor(max_workers: int) -> ThreadPoolExecutor:
+    """Return the process-wide email worker pool, creating it on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="email")
+    return _executor
+
+
+class _PooledSMTP(smtplib.SMTP):
+    """SMTP connection that counts messages so the pool can rotate it."""
+
+    sends = 0
+
+    def send_message(self, *args, **kwargs):
+        result = super().send_message(*args, **kwargs)
+        self.sends += 1
+        return result
+
+
+class SMTPPool:
+    """
+    Reusable authenticated SMTP connections for one (host, port, user).
+
+    STARTTLS + AUTH dominate the cost of a single send, so connections are
+    kept open between messages. Idle connections are health-checked with
+    NOOP on checkout and replaced if the server has dropped them.
+    """
+
+    def __init__(self, host: str, port: int, user: str, password: str, use_tls: bool,
+                 max_idle: int = _SMTP_POOL_SIZE,
+                 max_sends: int = _SMTP_MAX_SENDS_PER_CONNECTION):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.use_tls = use_tls
+        self.max_sends = max_sends
+        self._idle: "queue.LifoQueue[_PooledSMTP]" = queue.LifoQueue(maxsize=max_idle)
+
+    def _connect(self) -> _PooledSMTP:
+        server = _PooledSMTP(self.host, self.port, timeout=_SMTP_TIMEOUT)
+        try:
+            if self.use_tls:
+                server.starttls()
+            if self.user and self.password:
+                server.login(self.user, self.password)
+        except BaseException:
+            self.discard(server)
+            raise
+        return server
+
+    @staticmethod
+    def discard(server: smtplib.SMTP) -> None:
+        """Close a connection instead of returning it to the pool."""
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+    def acquire(self) -> _PooledSMTP:
+        """Check out a live connection, opening a new one if none are idle."""
+        while True:
+            try:
+                server = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            try:
+                if server.noop()[0] == 250:
+                    return server
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.discard(server)
+
+    def release(self, server: _PooledSMTP) -> None:
+        """Return a healthy connection to the pool, or close it if worn out or the pool is full."""
+        if server.sends >= self.max_sends:
+            self.discard(server)
+            return
+        try:
+            self._idle.put_nowait(server)
+        except queue.Full:
+            self.discard(server)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; it is discarded rather than reused if the block raises."""
+        server = self.acquire()
+        try:
+            yield server
+        except BaseException:
+            self.discard(server)
+            raise
+        self.release(server)
+
+    def close_all(self) -> None:
+        while True:
+            try:
+                self.discard(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+
+_smtp_pools: Dict[tuple, SMTPPool] = {}
+_smtp_pools_lock = threading.Lock()
+
+
+def _get_smtp_pool(config: Dict[str, Any]) -> SMTPPool:
+    """Return the shared pool for the configured SMTP server and login."""
+    key = (config['smtp_host'], config['smtp_port'], config['smtp_user'])
+    pool = _smtp_pools.get(key)
+    if pool is None:
+        with _smtp_pools_lock:
+            pool = _smtp_pools.get(key)
+            if pool is None:
+                pool = _smtp_pools[key] = SMTPPool(
+                    config['smtp_host'], config['smtp_port'], config['smtp_user'],
+                    config['smtp_password'], config['smtp_use_tls'],
+                )
+    return pool
+
+
+@atexit.register
+def _close_smtp_pools() -> None:
+    for pool in list(_smtp_pools.values()):
+        pool.close_all()
+
+
+class SlidingWindowLimiter:
+    """Process-local limiter allowing at most ``limit`` calls per ``window`` seconds."""
+
+    def __init__(self, limit: int, window: float = 60.0):
+        self.limit = limit
+        self.window = window
+        self._calls: deque = deque()
+        self._lock = threading.Lock()
+
+    def wait_if_throttled(self) -> None:
+        """Block until a call fits in the window, then record it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._calls and now - self._calls[0] >= self.window:
+                    self._calls.popleft()
+                if len(self._calls) < self.limit:
+                    self._calls.append(now)
+                    return
+                wait = self.window - (now - self._calls[0])
+            time.sleep(wait)
+
+
+_sendgrid_limiter: Optional[SlidingWindowLimiter] = None
+_limiters_lock = threading.Lock()
+
+
+def _get_sendgrid_limiter(rpm: int) -> SlidingWindowLimiter:
+    global _sendgrid_limiter
+    if _sendgrid_limiter is None:
+        with _limiters_lock:
+            if _sendgrid_limiter is None:
+                _sendgrid_limiter = SlidingWindowLimiter(rpm)
+    return _sendgrid_limiter
+
+
+class AIMDLimiter:
+    """
+    Adaptive cap on concurrent sends to one provider (TCP-style AIMD).
+
+    The limit grows by ``increase`` after each successful send and is
+    multiplied by ``decrease`` when the provider signals overload
+    (throttling, 5xx, dropped connections, timeouts), so concurrency settles
+    just under what the provider will accept without manual tuning.
+    """
+
+    def __init__(self, maximum: int, initial: float = 1.0, minimum: float = 1.0,
+                 increase: float = 0.5, decrease: float = 0.5):
+        self.maximum = float(maximum)
+        self.minimum = minimum
+        self.limit = min(initial, self.maximum)
+        self.increase = increase
+        self.decrease = decrease
+        self._in_flight = 0
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def slot(self):
+        """Hold one unit of concurrency for the duration of a send."""
+        with self._cond:
+            while self._in_flight >= int(self.limit):
+                self._cond.wait()
+            self._in_flight += 1
+        try:
+            yield
+        except BaseException as e:
+            with self._cond:
+                if _is_overload_error(e):
+                    self.limit = max(self.minimum, self.limit * self.decrease)
+            raise
+        else:
+            with self._cond:
+                self.limit = min(self.maximum, self.limit + self.increase)
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._cond.notify_all()
+
+
+def _is_overload_error(e: BaseException) -> bool:
+    """True for errors that mean "slow down" rather than "this message is bad"."""
+    if isinstance(e, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+        return True
+    if isinstance(e, smtplib.SMTPResponseException):
+        return 400 <= e.smtp_code < 500  # 4xx replies are transient, 5xx permanent
+    if isinstance(e, smtplib.SMTPException):  # refused recipients etc.; an OSError subclass
+        return False
+    if isinstance(e, OSError):
+        return True
+    status = getattr(e, 'status_code', None)  # python_http_client.HTTPError
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+
+_concurrency_limiters: Dict[str, AIMDLimiter] = {}
+
+
+def _get_concurrency_limiter(config: Dict[str, Any], provider: str) -> AIMDLimiter:
+    """Return the AIMD limiter for ``provider``, bounded by the worker pool size."""
+    limiter = _concurrency_limiters.get(provider)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _concurrency_limiters.get(provider)
+            if limiter is None:
+                limiter = _concurrency_limiters[provider] = AIMDLimiter(maximum=max(1, config['workers']))
+    return limiter
+
+
+def _send_slot(config: Dict[str, Any], provider: str):
+    """
+    Concurrency slot for one send to ``provider``.
+
+    Only background sends are throttled: the AIMD limit is sized to the
+    worker pool, and applying it to synchronous sends would serialise
+    request threads behind one another.
+    """
+    if not config['send_async']:
+        return nullcontext()
+    return _get_concurrency_limiter(config, provider).slot()
+
+
+_provider_down_until: Dict[str, float] = {}
+
+
+def _ordered_providers(chain: List[str]) -> List[str]:
+    """Providers in configured order, with any still cooling down after a failure moved last."""
+    now = time.monotonic()
+    healthy = [p for p in chain if _provider_down_until.get(p, 0.0) <= now]
+    return healthy + [p for p in chain if p not in healthy]
+
+
+def _provider_configured(config: Dict[str, Any], provider: str) -> bool:
+    if provider == 'sendgrid':
+        return _SENDGRID_OK and bool(config['sendgrid_api_key'])
+    return _smtp_configured(config)
+
+
+def _any_provider_configured(config: Dict[str, Any]) -> bool:
+    """Whether any provider in the chain could send at all, checked before queueing."""
+    return any(_provider_configured(config, p) for p in config['provider_chain'])
+
+
+def _outbox_add(messages: List[Dict[str, Any]]) -> List[Optional[int]]:
+    """
+    Record messages about to be queued in email_outbox, returning their ids.
+
+    Uses its own connection so the caller's session transaction is left
+    alone. If the table can't be written the messages are still queued,
+    just without a durable record (ids are None).
+    """
+    from app import db
+    from app.models_email import EmailOutbox
+
+    table = EmailOutbox.__table__
+    now = datetime.utcnow()
+    try:
+        with db.engine.begin() as conn:
+            return [
+                conn.execute(table.insert().values(
+                    to_email=m['to'], subject=m['subject'], html_body=m['html_body'],
+                    text_body=m.get('text_body'), reply_to=m.get('reply_to'),
+                    idempotency_key=m.get('idempotency_key'), status='queued', attempts=0,
+                    created_at=now, updated_at=now
+                )).inserted_primary_key[0]
+                for m in messages
+            ]
+    except Exception as e:
+        logger.error("Email outbox unavailable, queueing %s email(s) without a durable record: %s",
+                     len(messages), e)
+        return [None] * len(messages)
+
+
+def _outbox_finish(outbox_ids: List[Optional[int]], results: List[bool], attempts: int) -> None:
+    """Delete delivered outbox rows and keep undelivered ones as 'failed' dead letters."""
+    from app import db
+    from app.models_email import EmailOutbox
+
+    delivered = [i for i, ok in zip(outbox_ids, results) if ok and i is not None]
+    failed = [i for i, ok in zip(outbox_ids, results) if not ok and i is not None]
+    if not delivered and not failed:
+        return
+
+    table = EmailOutbox.__table__
+    try:
+        with db.engine.begin() as conn:
+            if delivered:
+                conn.execute(table.delete().where(table.c.id.in_(delivered)))
+            if failed:
+                conn.execute(table.update().where(table.c.id.in_(failed)).values(
+                    status='failed', attempts=table.c.attempts + attempts,
+                    error=f"Not delivered after {attempts} attempt(s); provider errors are in the email log",
+                    updated_at=datetime.utcnow()
+                ))
+    except Exception as e:
+        logger.error("Failed to update email outbox rows %s: %s", delivered + failed, e)
+
+
+def requeue_stale_emails(limit: int = 500) -> int:
+    """
+    Queue again outbox emails left 'queued' by a process that exited
+    (deploy, restart, crash) before delivering them.
+
+    Each row is claimed by bumping its updated_at, so two schedulers can't
+    both take it. Idempotency keys stop a resend of mail that went out just
+    before the old process died.
+
+    Returns:
+        Number of emails queued again
+    """
+    from app import db
+    from app.models_email import EmailOutbox
+
+    config = get_email_config()
+    if not _any_provider_configured(config):
+        return 0
+
+    table = EmailOutbox.__table__
+    cutoff = datetime.utcnow() - _OUTBOX_STALE_AFTER
+    rows = db.session.execute(
+        table.select().where(table.c.status == 'queued', table.c.updated_at < cutoff)
+        .order_by(table.c.id).limit(limit)
+    ).all()
+
+    app = current_app._get_current_object()
+    requeued = 0
+    for row in rows:
+        claimed = db.session.execute(
+            table.update().where(table.c.id == row.id, table.c.updated_at == row.updated_at)
+            .values(updated_at=datetime.utcnow())
+        ).rowcount
+        db.session.commit()
+        if not claimed:
+            continue
+        _get_executor(config['workers']).submit(
+            _deliver_in_background, app, row.to_email, row.subject, row.html_body, row.text_body,
+            row.reply_to, row.idempotency_key, row.id
+        )
+        requeued += 1
+
+    if requeued:
+        logger.warning("Re-queued %s email(s) left undelivered by an earlier process", requeued)
+    return requeued
 
 
 def send_email(
@@ -47,7 +519,8 @@ def send_email(
     subject: str,
     html_body: str,
     text_body: Optional[str] = None,
-    reply_to: Optional[str] = None
+    reply_to: Optional[str] = None,
+    idempotency_key: Optional[str] = None
 ) -> bool:
     """
     Send an email using configured provider.
@@ -58,24 +531,203 @@ def send_email(
         html_body: HTML email body
         text_body: Plain text fallback (optional, generated from HTML if not provided)
         reply_to: Reply-to address (optional)
+        idempotency_key: Stable id for this logical email (e.g. "invite:<token>");
+            a key already delivered to ``to`` in the last 7 days is not re-sent
 
     Returns:
-        True if email sent successfully, False otherwise
+        True if the email was sent or, with EMAIL_SEND_ASYNC (the default),
+        queued for background delivery; a queued email that still fails
+        after retries is kept as a 'failed' row in email_outbox. False if
+        it wasn't sent or no provider is configured.
     """
     config = get_email_config()
-    provider = config['provider']
 
+    if config['send_async']:
+        if not _any_provider_configured(config):
+            logger.warning("No email provider configured, email to %s not sent: %s", to, subject)
+            return False
+        # Hand off to the worker pool so the request returns without waiting
+        # on the SMTP/SendGrid round-trip; failures are retried there.
+        app = current_app._get_current_object()
+        outbox_id = _outbox_add([{
+            'to': to, 'subject': subject, 'html_body': html_body, 'text_body': text_body,
+            'reply_to': reply_to, 'idempotency_key': idempotency_key,
+        }])[0]
+        _get_executor(config['workers']).submit(
+            _deliver_in_background, app, to, subject, html_body, text_body, reply_to, idempotency_key, outbox_id
+        )
+        return True
+
+    return _deliver(to, subject, html_body, text_body, reply_to, config, idempotency_key=idempotency_key)
+
+
+def send_bulk(messages: List[Dict[str, Any]]) -> List[bool]:
+    """
+    Send many emails, sharing one SMTP session across all of them.
+
+    Args:
+        messages: Dicts with the same keys as send_email's arguments
+            (to, subject, html_body, and optionally text_body, reply_to,
+            idempotency_key)
+
+    Returns:
+        One result per message, in order, with the same meaning as
+        send_email's: True if sent or queued for background delivery
+    """
+    if not messages:
+        return []
+
+    config = get_email_config()
+
+    if config['send_async']:
+        if not _any_provider_configured(config):
+            logger.warning("No email provider configured, %s bulk emails not sent", len(messages))
+            return [False] * len(messages)
+        app = current_app._get_current_object()
+        outbox_ids = _outbox_add(messages)
+        _get_executor(config['workers']).submit(_deliver_bulk_in_background, app, messages, outbox_ids)
+        return [True] * len(messages)
+
+    return _deliver_bulk(messages, config)
+
+
+def _deliver_bulk_in_background(app, messages: List[Dict[str, Any]],
+                                outbox_ids: Optional[List[Optional[int]]] = None) -> List[bool]:
+    """Worker-pool entry point for send_bulk."""
+    with app.app_context():
+        config = get_email_config()
+        results = _deliver_bulk(messages, config, max_retries=config['max_retries'])
+        if outbox_ids:
+            _outbox_finish(outbox_ids, results, config['max_retries'] + 1)
+        return results
+
+
+def _deliver_bulk(messages: List[Dict[str, Any]], config: Dict[str, Any], max_retries: int = 0) -> List[bool]:
+    """
+    Deliver ``messages`` with the same retry and failover guarantees as _deliver.
+
+    When SMTP leads the chain the batch shares one session first; messages
+    that fail there go back through the provider chain individually.
+    """
+    if _ordered_providers(config['provider_chain'])[0] != 'smtp':
+        # The HTTP API has no session to amortise; send one by one (with failover).
+        return [
+            _deliver(m['to'], m['subject'], m['html_body'], m.get('text_body'), m.get('reply_to'), config,
+                     max_retries=max_retries, idempotency_key=m.get('idempotency_key'))
+            for m in messages
+        ]
+
+    # Claim idempotency keys up front; duplicates count as delivered.
+    results: List[bool] = [True] * len(messages)
+    pending, digests = [], []
+    for i, m in enumerate(messages):
+        key = m.get('idempotency_key')
+        digest = _idempotency_digest(m['to'], key) if key else None
+        if digest is not None and not _claim_send(digest):
+            logger.info("Skipping duplicate email to %s (%s)", m['to'], key)
+            continue
+        pending.append(i)
+        digests.append(digest)
+
+    with _send_slot(config, 'smtp'):
+        sent = _send_bulk_via_smtp([messages[i] for i in pending], config)
+
+    for i, digest, ok in zip(pending, digests, sent):
+        if not ok:
+            m = messages[i]
+            ok = _deliver_with_retries(m['to'], m['subject'], m['html_body'], m.get('text_body'),
+                                       m.get('reply_to'), config, max_retries)
+        results[i] = ok
+        if not ok and digest is not None:
+            _release_send(digest)
+    return results
+
+
+def _deliver_in_background(
+    app,
+    to: str,
+    subject: str,
+    html_body: str,
+    text_body: Optional[str],
+    reply_to: Optional[str],
+    idempotency_key: Optional[str] = None,
+    outbox_id: Optional[int] = None
+) -> bool:
+    """Worker-pool entry point: deliver with retries inside an app context."""
+    with app.app_context():
+        config = get_email_config()
+        sent = _deliver(to, subject, html_body, text_body, reply_to, config,
+                        max_retries=config['max_retries'], idempotency_key=idempotency_key)
+        if outbox_id is not None:
+            _outbox_finish([outbox_id], [sent], config['max_retries'] + 1)
+        return sent
+
+
+def _deliver(
+    to: str,
+    subject: str,
+    html_body: str,
+    text_body: Optional[str],
+    reply_to: Optional[str],
+    config: Dict[str, Any],
+    max_retries: int = 0,
+    idempotency_key: Optional[str] = None
+) -> bool:
+    """Send once per idempotency key (if given), retrying transport errors."""
+    if idempotency_key is None:
+        return _deliver_with_retries(to, subject, html_body, text_body, reply_to, config, max_retries)
+
+    digest = _idempotency_digest(to, idempotency_key)
+    if not _claim_send(digest):
+        logger.info("Skipping duplicate email to %s (%s)", to, idempotency_key)
+        return True
+
+    sent = False
     try:
-        if provider == 'sendgrid':
-            return _send_via_sendgrid(to, subject, html_body, text_body, reply_to, config)
-        else:  # Default to SMTP
-            return _send_via_smtp(to, subject, html_body, text_body, reply_to, config)
-    except Exception as e:
-        current_app.logger.error(f"Failed to send email to {to}: {e}", exc_info=True)
-        return False
+        sent = _deliver_with_retries(to, subject, html_body, text_body, reply_to, config, max_retries)
+    finally:
+        if not sent:
+            _release_send(digest)
+    return sent
 
 
-def _send_via_smtp(
+def _deliver_with_retries(
+    to: str,
+    subject: str,
+    html_body: str,
+    text_body: Optional[str],
+    reply_to: Optional[str],
+    config: Dict[str, Any],
+    max_retries: int = 0
+) -> bool:
+    """Send via the provider chain, retrying transient errors with jittered backoff."""
+    attempt = 0
+
+    while True:
+        try:
+            return _send_via_chain(to, subject, html_body, text_body, reply_to, config)
+        except _PROVIDER_ERRORS as e:
+            if not _is_overload_error(e):
+                logger.error("Email to %s rejected, not retrying: %s", to, e, exc_info=True)
+                return False
+            if attempt >= max_retries:
+                logger.error(
+                    "Failed to send email to %s after %d attempt(s), giving up: %s",
+                    to, attempt + 1, e, exc_info=True
+                )
+                return False
+            delay = min(_RETRY_MAX_DELAY, _RETRY_BASE_DELAY * 2 ** attempt) * random.uniform(0.5, 1.5)
+            attempt += 1
+            logger.warning(
+                "Email to %s failed (%s), retry %d/%d in %.1fs", to, e, attempt, max_retries, delay
+            )
+            time.sleep(delay)
+        except Exception as e:
+            logger.error("Failed to send email to %s: %s", to, e, exc_info=True)
+            return False
+
+
+def _send_via_chain(
     to: str,
     subject: str,
     html_body: str,
@@ -83,47 +735,241 @@ def _send_via_smtp(
     reply_to: Optional[str],
     config: Dict[str, Any]
 ) -> bool:
-    """Send email via SMTP."""
-    from_email = f"{config['from_name']} <{config['from_email']}>"
+    """
+    Try each provider in failover order until one delivers.
 
-    # Create message
-    msg = MIMEMultipart('alternative')
-    msg['From'] = from_email
+    A provider that raises a transient error is put on cooldown so the next
+    sends go to the others first; if every provider fails, the last error is
+    raised for the caller's retry loop. A permanent rejection is raised
+    straight away without failing over.
+    """
+    last_error: Optional[Exception] = None
+
+    for provider in _ordered_providers(config['provider_chain']):
+        try:
+            with _send_slot(config, provider):
+                if provider == 'sendgrid':
+                    sent = _send_via_sendgrid(to, subject, html_body, text_body, reply_to, config)
+                else:  # Default to SMTP
+                    sent = _send_via_smtp(to, subject, html_body, text_body, reply_to, config)
+        except _PROVIDER_ERRORS as e:
+            if not _is_overload_error(e):
+                raise  # the message itself was refused; another provider won't help
+            _provider_down_until[provider] = time.monotonic() + _PROVIDER_COOLDOWN
+            logger.warning("Email provider %s failed for %s: %s", provider, to, e)
+            last_error = e
+            continue
+        if sent:
+            return True
+
+    if last_error is not None:
+        raise last_error
+    return False
+
+
+_local_sent_keys: Dict[str, float] = {}  # digest -> expiry, used when Redis is unavailable
+
+
+def _idempotency_digest(to: str, idempotency_key: str) -> str:
+    return hashlib.blake2b(f"{to}|{idempotency_key}".encode(), digest_size=16).hexdigest()
+
+
+def _claim_send(digest: str) -> bool:
+    """Atomically mark ``digest`` as being sent; False if it already was."""
+    r = getattr(current_app, 'redis', None)
+    if r is not None:
+        try:
+            return bool(r.set(f"email:sent:{digest}", "1", nx=True, ex=_IDEMPOTENCY_TTL))
+        except Exception as e:
+            logger.warning("Redis unavailable for email idempotency, using local memory: %s", e)
+
+    now = time.time()
+    with _limiters_lock:
+        expires = _local_sent_keys.get(digest)
+        if expires is not None and expires > now:
+            return False
+        if len(_local_sent_keys) >= _LOCAL_SENT_KEYS_MAX:
+            for k in [k for k, exp in _local_sent_keys.items() if exp <= now]:
+                del _local_sent_keys[k]
+        _local_sent_keys[digest] = now + _IDEMPOTENCY_TTL
+        return True
+
+
+def _release_send(digest: str) -> None:
+    """Forget a claim after a failed send so a later retry can go out."""
+    r = getattr(current_app, 'redis', None)
+    if r is not None:
+        try:
+            r.delete(f"email:sent:{digest}")
+        except Exception as e:
+            logger.warning("Failed to release email idempotency key: %s", e)
+    with _limiters_lock:
+        _local_sent_keys.pop(digest, None)
+
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+class _HTMLToText(HTMLParser):
+    """Minimal HTML -> plain text for the text/plain alternative part."""
+
+    _BLOCK_TAGS = {'p', 'div', 'tr', 'table', 'h1', 'h2', 'h3', 'h4', 'ol', 'ul', 'hr'}
+    _SKIP_TAGS = {'head', 'style', 'script', 'title'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skip = 0
+        self._href: Optional[str] = None
+        self._link_text: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._SKIP_TAGS:
+            self._skip += 1
+        elif tag in self._BLOCK_TAGS:
+            self.parts.append('\n\n')
+        elif tag == 'br':
+            self.parts.append('\n')
+        elif tag == 'li':
+            self.parts.append('\n- ')
+        elif tag == 'a':
+            self._href = dict(attrs).get('href')
+            self._link_text = []
+
+    def handle_endtag(self, tag):
+        if tag in self._SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+        elif tag in self._BLOCK_TAGS:
+            self.parts.append('\n\n')
+        elif tag == 'a' and self._href:
+            text = ' '.join(''.join(self._link_text).split())
+            if self._href.startswith(('http://', 'https://')) and self._href != text:
+                self.parts.append(f" ({self._href})")
+            self._href = None
+
+    def handle_data(self, data):
+        if self._skip:
+            return
+        data = _WHITESPACE_RE.sub(' ', data)  # HTML collapses whitespace; only tags break lines
+        self.parts.append(data)
+        if self._href:
+            self._link_text.append(data)
+
+    def text(self) -> str:
+        lines = (' '.join(line.split()) for line in ''.join(self.parts).splitlines())
+        out: List[str] = []
+        for line in lines:
+            if line or (out and out[-1]):
+                out.append(line)
+        return '\n'.join(out).strip()
+
+
+def _html_to_text(html_body: str) -> str:
+    """Plain-text rendering of an HTML body."""
+    parser = _HTMLToText()
+    parser.feed(html_body)
+    parser.close()
+    return parser.text()
+
+
+def _build_smtp_message(
+    to: str,
+    subject: str,
+    html_body: str,
+    text_body: Optional[str],
+    reply_to: Optional[str],
+    config: Dict[str, Any]
+) -> EmailMessage:
+    """Build the multipart/alternative message for an SMTP send."""
+    msg = EmailMessage(policy=policy.SMTP)
+    msg['From'] = f"{config['from_name']} <{config['from_email']}>"
     msg['To'] = to
     msg['Subject'] = subject
 
     if reply_to:
         msg['Reply-To'] = reply_to
 
-    # Add text and HTML parts
-    if text_body:
-        text_part = MIMEText(text_body, 'plain')
-        msg.attach(text_part)
+    msg.set_content(text_body or _html_to_text(html_body))
+    msg.add_alternative(html_body, subtype='html')
 
-    html_part = MIMEText(html_body, 'html')
-    msg.attach(html_part)
+    return msg
 
-    # Send via SMTP
+
+def _smtp_configured(config: Dict[str, Any]) -> bool:
     smtp_host = config['smtp_host']
-    smtp_port = config['smtp_port']
+    return bool(smtp_host) and smtp_host != 'localhost'
 
-    if not smtp_host or smtp_host == 'localhost':
-        current_app.logger.warning(f"SMTP not configured, email to {to} not sent: {subject}")
-        return False
 
-    with smtplib.SMTP(smtp_host, smtp_port) as server:
-        if config['smtp_use_tls']:
-            server.starttls()
+def _send_via_smtp(
+    to: str,
+    subject: str,
+    html_body: str,
+    text_body: Optional[str],
+    reply_to: Optional[str],
+    config: Dict[str, Any]
+) -> bool:
+    """Send email via SMTP."""
+    msg = _build_smtp_message(to, subject, html_body, text_body, reply_to, config)
 
-        if config['smtp_user'] and config['smtp_password']:
-            server.login(config['smtp_user'], config['smtp_password'])
+    if not _smtp_configured(config):
+        logger.warning("SMTP not configured, email to %s not sent: %s", to, subject)
+        return False
 
+    with _get_smtp_pool(config).connection() as server:
         server.send_message(msg)
 
-    current_app.logger.info(f"Email sent via SMTP to {to}: {subject}")
+    logger.info("Email sent via SMTP to %s: %s", to, subject)
     return True
 
 
+def _send_bulk_via_smtp(messages: List[Dict[str, Any]], config: Dict[str, Any]) -> List[bool]:
+    """
+    Send several messages over one pooled SMTP session.
+
+    A rejected message (bad recipient, content refused) only fails that
+    message; a dropped connection is replaced before the next one.
+    """
+    if not _smtp_configured(config):
+        logger.warning("SMTP not configured, %s bulk emails not sent", len(messages))
+        return [False] * len(messages)
+
+    pool = _get_smtp_pool(config)
+    results: List[bool] = []
+    server: Optional[_PooledSMTP] = None
+
+    try:
+        for m in messages:
+            to = m['to']
+            try:
+                msg = _build_smtp_message(
+                    to, m['subject'], m['html_body'], m.get('text_body'), m.get('reply_to'), config
+                )
+                if server is None:
+                    server = pool.acquire()
+                server.send_message(msg)
+                results.append(True)
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError) as e:
+                logger.error("SMTP rejected bulk email to %s: %s", to, e)
+                results.append(False)
+            except (smtplib.SMTPException, OSError) as e:
+                logger.error("SMTP connection failed during bulk send to %s: %s", to, e)
+                if server is not None:
+                    pool.discard(server)
+                    server = None
+                results.append(False)
+                continue
+
+            if server is not None and server.sends >= pool.max_sends:
+                pool.release(server)
+                server = None
+    finally:
+        if server is not None:
+            pool.release(server)
+
+    logger.info("Bulk SMTP send: %s/%s delivered", sum(results), len(messages))
+    return results
+
+
 def _send_via_sendgrid(
     to: str,
     subject: str,
@@ -133,16 +979,13 @@ def _send_via_sendgrid(
     config: Dict[str, Any]
 ) -> bool:
     """Send email via SendGrid API."""
-    try:
-        from sendgrid import SendGridAPIClient
-        from sendgrid.helpers.mail import Mail, Email, To, Content
-    except ImportError:
-        current_app.logger.error("SendGrid library not installed. Run: pip install sendgrid")
+    if not _SENDGRID_OK:
+        logger.error("SendGrid library not installed. Run: pip install sendgrid")
         return False
 
     api_key = config['sendgrid_api_key']
     if not api_key:
-        current_app.logger.warning(f"SendGrid API key not configured, email to {to} not sent")
+        logger.warning("SendGrid API key not configured, email to %s not sent", to)
         return False
 
     # Create message
@@ -152,24 +995,66 @@ def _send_via_sendgrid(
 
     message = Mail(from_email, to_email, subject, content)
 
-    if text_body:
-        message.add_content(Content("text/plain", text_body))
+    message.add_content(Content("text/plain", text_body or _html_to_text(html_body)))
 
     if reply_to:
         message.reply_to = Email(reply_to)
 
     # Send via SendGrid
-    sg = SendGridAPIClient(api_key)
-    response = sg.send(message)
+    sg = _get_sendgrid_client(api_key)
+    limiter = _get_sendgrid_limiter(config['sendgrid_rpm'])
+    attempt = 0
+    while True:
+        limiter.wait_if_throttled()
+        try:
+            response = sg.send(message)
+            break
+        except TooManyRequestsError as e:
+            if attempt >= _SENDGRID_MAX_429_RETRIES:
+                raise
+            delay = _sendgrid_retry_delay(e.headers, attempt)
+            attempt += 1
+            logger.warning(
+                "SendGrid rate limited email to %s, retry %d/%d in %.1fs",
+                to, attempt, _SENDGRID_MAX_429_RETRIES, delay
+            )
+            time.sleep(delay)
 
     if response.status_code in [200, 201, 202]:
-        current_app.logger.info(f"Email sent via SendGrid to {to}: {subject}")
+        logger.info("Email sent via SendGrid to %s: %s", to, subject)
         return True
     else:
-        current_app.logger.error(f"SendGrid returned status {response.status_code} for {to}")
+        logger.error("SendGrid returned status %s for %s", response.status_code, to)
         return False
 
 
+_sendgrid_clients: Dict[str, "SendGridAPIClient"] = {}
+
+
+def _get_sendgrid_client(api_key: str) -> "SendGridAPIClient":
+    """Return the process-wide SendGrid client for ``api_key``, creating it on first use."""
+    sg = _sendgrid_clients.get(api_key)
+    if sg is None:
+        with _limiters_lock:
+            sg = _sendgrid_clients.get(api_key)
+            if sg is None:
+                sg = _sendgrid_clients[api_key] = SendGridAPIClient(api_key)
+    return sg
+
+
+def _sendgrid_retry_delay(headers, attempt: int) -> float:
+    """Seconds to wait after a 429, from Retry-After / X-RateLimit-Reset when present."""
+    now = time.time()
+    if headers is not None:
+        retry_after = headers.get('Retry-After')
+        if retry_after and retry_after.isdigit():
+            return min(_RETRY_MAX_DELAY, float(retry_after))
+        reset = headers.get('X-RateLimit-Reset')
+        if reset and reset.isdigit():
+            return min(_RETRY_MAX_DELAY, max(0.0, int(reset) - now))
+    return min(_RETRY_MAX_DELAY, 2 ** attempt) * random.uniform(0.5, 1.5)
+
+
 # ===== Specific Email Templates =====
 
 def send_team_invite_email(invite, inviter) -> bool:
@@ -188,104 +1073,17 @@ def send_team_invite_email(invite, inviter) -> bool:
     account = Account.query.get(invite.account_id)
     account_name = account.name if account else "a team"
 
-    base_url = current_app.config.get("BASE_URL", "http://localhost:5000")
-    invite_url = f"{base_url}/team/invite/{invite.token}"
-
-    html_body = render_template_string("""
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Team Invitation</title>
-</head>
-<body style="margin: 0; padding: 0; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Helvetica, Arial, sans-serif; background-color: #f9fafb;">
-    <table width="100%" cellpadding="0" cellspacing="0" style="background-color: #f9fafb; padding: 40px 20px;">
-        <tr>
-            <td align="center">
-                <table width="600" cellpadding="0" cellspacing="0" style="background-color: #ffffff; border-radius: 8px; box-shadow: 0 1px 3px rgba(0,0,0,0.1);">
-                    <!-- Header -->
-                    <tr>
-                        <td style="padding: 40px 40px 20px; text-align: center; background: linear-gradient(135deg, #7c3aed 0%, #6d28d9 100%); border-radius: 8px 8px 0 0;">
-                            <h1 style="margin: 0; color: #ffffff; font-size: 24px; font-weight: 600;">You're Invited!</h1>
-                        </td>
-                    </tr>
-
-                    <!-- Content -->
-                    <tr>
-                        <td style="padding: 40px;">
-                            <p style="margin: 0 0 20px; font-size: 16px; line-height: 24px; color: #111827;">
-                                <strong>{{ inviter.name }}</strong> ({{ inviter.email }}) has invited you to join <strong>{{ account_name }}</strong> as a <strong>{{ invite.role }}</strong>.
-                            </p>
-
-                            <p style="margin: 0 0 30px; font-size: 14px; line-height: 22px; color: #6b7280;">
-                                Click the button below to accept the invitation and get started. This invitation will expire in 7 days.
-                            </p>
-
-                            <!-- CTA Button -->
-                            <table width="100%" cellpadding="0" cellspacing="0">
-                                <tr>
-                                    <td align="center" style="padding: 0 0 30px;">
-                                        <a href="{{ invite_url }}" style="display: inline-block; padding: 14px 32px; background-color: #7c3aed; color: #ffffff; text-decoration: none; border-radius: 6px; font-size: 16px; font-weight: 600;">
-                                            Accept Invitation
-                                        </a>
-                                    </td>
-                                </tr>
-                            </table>
-
-                            <p style="margin: 0 0 20px; font-size: 14px; line-height: 22px; color: #6b7280;">
-                                Or copy and paste this URL into your browser:
-                            </p>
-                            <p style="margin: 0 0 30px; padding: 12px; background-color: #f3f4f6; border-radius: 4px; font-size: 12px; color: #4b5563; word-break: break-all; font-family: monospace;">
-                                {{ invite_url }}
-                            </p>
-
-                            <hr style="border: none; border-top: 1px solid #e5e7eb; margin: 30px 0;">
-
-                            <p style="margin: 0; font-size: 13px; line-height: 20px; color: #9ca3af;">
-                                If you don't have an account yet, you'll be able to create one when you click the link. If you didn't expect this invitation, you can safely ignore this email.
-                            </p>
-                        </td>
-                    </tr>
-
-                    <!-- Footer -->
-                    <tr>
-                        <td style="padding: 20px 40px; text-align: center; background-color: #f9fafb; border-radius: 0 0 8px 8px;">
-                            <p style="margin: 0; font-size: 12px; color: #9ca3af;">
-                                © {{ year }} FieldSprout. All rights reserved.
-                            </p>
-                        </td>
-                    </tr>
-                </table>
-            </td>
-        </tr>
-    </table>
-</body>
-</html>
-    """, inviter=inviter, invite=invite, account_name=account_name, invite_url=invite_url, year=2025)
-
-    text_body = f"""
-You're Invited to Join {account_name}!
-
-{inviter.name} ({inviter.email}) has invited you to join {account_name} as a {invite.role}.
-
-Click the link below to accept the invitation:
-{invite_url}
-
-This invitation will expire in 7 days.
-
-If you don't have an account yet, you'll be able to create one when you click the link.
-
-If you didn't expect this invitation, you can safely ignore this email.
-
-© 2025 FieldSprout. All rights reserved.
-    """
+    invite_url = f"{get_email_config()['base_url']}/team/invite/{invite.token}"
+
+    html_body = _TEAM_INVITE_TMPL.render(
+        inviter=inviter, invite=invite, account_name=account_name, invite_url=invite_url, year=datetime.utcnow().year
+    )
 
     return send_email(
         to=invite.email,
         subject=f"{inviter.name} invited you to join {account_name}",
         html_body=html_body,
-        text_body=text_body
+        idempotency_key=f"invite:{invite.token}"
     )
 
 
@@ -299,145 +1097,31 @@ def send_welcome_email(user) -> bool:
     Returns:
         True if sent successfully
     """
-    html_body = render_template_string("""
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Welcome to FieldSprout</title>
-</head>
-<body style="margin: 0; padding: 0; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Helvetica, Arial, sans-serif; background-color: #f9fafb;">
-    <table width="100%" cellpadding="0" cellspacing="0" style="background-color: #f9fafb; padding: 40px 20px;">
-        <tr>
-            <td align="center">
-                <table width="600" cellpadding="0" cellspacing="0" style="background-color: #ffffff; border-radius: 8px; box-shadow: 0 1px 3px rgba(0,0,0,0.1);">
-                    <!-- Header -->
-                    <tr>
-                        <td style="padding: 40px 40px 20px; text-align: center; background: linear-gradient(135deg, #7c3aed 0%, #6d28d9 100%); border-radius: 8px 8px 0 0;">
-                            <h1 style="margin: 0; color: #ffffff; font-size: 28px; font-weight: 600;">Welcome to FieldSprout!</h1>
-                        </td>
-                    </tr>
-
-                    <!-- Content -->
-                    <tr>
-                        <td style="padding: 40px;">
-                            <p style="margin: 0 0 20px; font-size: 16px; line-height: 24px; color: #111827;">
-                                Hi <strong>{{ user.name }}</strong>,
-                            </p>
-
-                            <p style="margin: 0 0 20px; font-size: 16px; line-height: 24px; color: #111827;">
-                                Thanks for signing up! We're excited to help you grow your local business with AI-powered marketing insights.
-                            </p>
-
-                            <div style="margin: 30px 0; padding: 20px; background-color: #f3f4f6; border-left: 4px solid #7c3aed; border-radius: 4px;">
-                                <h3 style="margin: 0 0 15px; font-size: 18px; color: #111827;">Get Started in 3 Steps:</h3>
-                                <ol style="margin: 0; padding-left: 20px; color: #4b5563;">
-                                    <li style="margin-bottom: 10px;">Connect your Google, Facebook, and WordPress accounts</li>
-                                    <li style="margin-bottom: 10px;">Review your first automated insights report</li>
-                                    <li>Invite your team to collaborate</li>
-                                </ol>
-                            </div>
-
-                            <!-- CTA Button -->
-                            <table width="100%" cellpadding="0" cellspacing="0">
-                                <tr>
-                                    <td align="center" style="padding: 20px 0;">
-                                        <a href="{{ dashboard_url }}" style="display: inline-block; padding: 14px 32px; background-color: #7c3aed; color: #ffffff; text-decoration: none; border-radius: 6px; font-size: 16px; font-weight: 600;">
-                                            Go to Dashboard
-                                        </a>
-                                    </td>
-                                </tr>
-                            </table>
-
-                            <p style="margin: 30px 0 0; font-size: 14px; line-height: 22px; color: #6b7280;">
-                                Need help? Check out our <a href="#" style="color: #7c3aed; text-decoration: none;">documentation</a> or <a href="#" style="color: #7c3aed; text-decoration: none;">contact support</a>.
-                            </p>
-                        </td>
-                    </tr>
-
-                    <!-- Footer -->
-                    <tr>
-                        <td style="padding: 20px 40px; text-align: center; background-color: #f9fafb; border-radius: 0 0 8px 8px;">
-                            <p style="margin: 0; font-size: 12px; color: #9ca3af;">
-                                © {{ year }} FieldSprout. All rights reserved.
-                            </p>
-                        </td>
-                    </tr>
-                </table>
-            </td>
-        </tr>
-    </table>
-</body>
-</html>
-    """, user=user, dashboard_url=f"{current_app.config.get('BASE_URL', 'http://localhost:5000')}/account/dashboard", year=2025)
-
-    text_body = f"""
-Welcome to FieldSprout!
-
-Hi {user.name},
-
-Thanks for signing up! We're excited to help you grow your local business with AI-powered marketing insights.
-
-Get Started in 3 Steps:
-1. Connect your Google, Facebook, and WordPress accounts
-2. Review your first automated insights report
-3. Invite your team to collaborate
-
-Go to your dashboard: {current_app.config.get('BASE_URL', 'http://localhost:5000')}/account/dashboard
-
-Need help? Check out our documentation or contact support.
-
-© 2025 FieldSprout. All rights reserved.
-    """
+    return send_email(**build_welcome_email(user))
 
-    return send_email(
-        to=user.email,
-        subject="Welcome to FieldSprout - Let's Get Started!",
-        html_body=html_body,
-        text_body=text_body
-    )
+
+def build_welcome_email(user) -> Dict[str, Any]:
+    """Render the welcome email for ``user`` as send_email/send_bulk keyword arguments."""
+    dashboard_url = f"{get_email_config()['base_url']}/account/dashboard"
+
+    html_body = _WELCOME_TMPL.render(user=user, dashboard_url=dashboard_url, year=datetime.utcnow().year)
+
+    return {
+        'to': user.email,
+        'subject': "Welcome to FieldSprout - Let's Get Started!",
+        'html_body': html_body,
+        'idempotency_key': f"welcome:{user.id}",
+    }
 
 
 def send_subscription_confirmation_email(user, subscription) -> bool:
     """Send email confirming subscription purchase."""
     plan_name = "Growth Plan"  # Customize based on subscription.price_id
 
-    html_body = render_template_string("""
-<!DOCTYPE html>
-<html>
-<body style="font-family: Arial, sans-serif; background-color: #f9fafb; padding: 20px;">
-    <div style="max-width: 600px; margin: 0 auto; background-color: #ffffff; border-radius: 8px; padding: 40px;">
-        <h1 style="color: #7c3aed; margin-bottom: 20px;">Subscription Confirmed!</h1>
-
-        <p>Hi {{ user.name }},</p>
-
-        <p>Your subscription to <strong>{{ plan_name }}</strong> is now active.</p>
-
-        <p><strong>Next billing date:</strong> {{ subscription.current_period_end.strftime('%B %d, %Y') }}</p>
-
-        <p>You now have access to:</p>
-        <ul>
-            <li>AI campaign suggestions</li>
-            <li>Lead quality insights</li>
-            <li>A/B creative tips</li>
-            <li>Team collaboration (up to 10 members)</li>
-        </ul>
-
-        <p style="margin-top: 30px;">
-            <a href="{{ billing_url }}" style="display: inline-block; padding: 12px 24px; background-color: #7c3aed; color: #ffffff; text-decoration: none; border-radius: 6px;">
-                Manage Subscription
-            </a>
-        </p>
-
-        <p style="margin-top: 30px; font-size: 14px; color: #6b7280;">
-            Questions? Contact us at support@fieldsprout.com
-        </p>
-    </div>
-</body>
-</html>
-    """, user=user, plan_name=plan_name, subscription=subscription,
-    billing_url=f"{current_app.config.get('BASE_URL', 'http://localhost:5000')}/billing/portal")
+    html_body = _SUBSCRIPTION_CONFIRMATION_TMPL.render(
+        user=user, plan_name=plan_name, subscription=subscription,
+        billing_url=f"{get_email_config()['base_url']}/billing/portal"
+    )
 
     return send_email(
         to=user.email,
@@ -448,37 +1132,10 @@ def send_subscription_confirmation_email(user, subscription) -> bool:
 
 def send_payment_failed_email(user, subscription) -> bool:
     """Send email when payment fails."""
-    html_body = render_template_string("""
-<!DOCTYPE html>
-<html>
-<body style="font-family: Arial, sans-serif; background-color: #f9fafb; padding: 20px;">
-    <div style="max-width: 600px; margin: 0 auto; background-color: #ffffff; border-radius: 8px; padding: 40px; border-left: 4px solid #ef4444;">
-        <h1 style="color: #ef4444; margin-bottom: 20px;">Payment Failed</h1>
-
-        <p>Hi {{ user.name }},</p>
-
-        <p>We were unable to process your recent payment. Your subscription may be interrupted if this isn't resolved.</p>
-
-        <p><strong>What to do next:</strong></p>
-        <ol>
-            <li>Check that your payment method is valid and has sufficient funds</li>
-            <li>Update your payment method in the billing portal</li>
-            <li>Retry the payment</li>
-        </ol>
-
-        <p style="margin-top: 30px;">
-            <a href="{{ billing_url }}" style="display: inline-block; padding: 12px 24px; background-color: #ef4444; color: #ffffff; text-decoration: none; border-radius: 6px;">
-                Update Payment Method
-            </a>
-        </p>
-
-        <p style="margin-top: 30px; font-size: 14px; color: #6b7280;">
-            Need help? Contact us at support@fieldsprout.com
-        </p>
-    </div>
-</body>
-</html>
-    """, user=user, billing_url=f"{current_app.config.get('BASE_URL', 'http://localhost:5000')}/billing/portal")
+    html_body = _PAYMENT_FAILED_TMPL.render(
+        user=user,
+        billing_url=f"{get_email_config()['base_url']}/billing/portal"
+    )
 
     return send_email(
         to=user.email,
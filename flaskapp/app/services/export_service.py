@@ -1,73 +1,101 @@
 # app/services/export_service.py
-import pandas as pd
+import io
+import os
+from itertools import zip_longest
 from pathlib import Path
 
+import xlsxwriter
+
+XLSX_MIMETYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Sheet columns, in Google Ads Editor order. Rows are accumulated column-wise
+# (one list per column) and transposed back to rows when written.
+_CAMPAIGN_COLS = ("Campaign", "Campaign State", "Campaign Type", "Budget", "Budget Type",
+                  "Networks", "Location", "Languages", "Bid Strategy Type")
+_AD_GROUP_COLS = ("Campaign", "Ad Group", "Ad Group State", "Default Max CPC")
+_KEYWORD_COLS = ("Campaign", "Ad Group", "Keyword", "Criterion Type", "Final URL")
+_PATH_COLS = ("Path 1", "Path 2")
+_HEADLINE_COLS = tuple(f"Headline {i}" for i in range(1, 16))
+_DESC_COLS = tuple(f"Description {i}" for i in range(1, 5))
+_RSA_OPTIONAL_COLS = _PATH_COLS + _HEADLINE_COLS + _DESC_COLS
+_RSA_COLS = ("Campaign", "Ad Group", "Ad State", "Final URL") + _RSA_OPTIONAL_COLS
+_NEGATIVE_COLS = ("Campaign", "Ad Group", "Keyword", "Match Type")
+_SITELINK_COLS = ("Campaign", "Ad Group", "Extension", "Link Text", "Final URL",
+                  "Description Line 1", "Description Line 2")
+
+def _columns(names):
+    return {n: [] for n in names}
+
+def _append(cols: dict, *values):
+    for col, v in zip(cols.values(), values):
+        col.append(v)
+
 def _rows_from_draft(draft: dict):
-    campaigns, ad_groups, keywords, rsas, negatives, sitelinks = [], [], [], [], [], []
+    campaigns, ad_groups, keywords = _columns(_CAMPAIGN_COLS), _columns(_AD_GROUP_COLS), _columns(_KEYWORD_COLS)
+    rsas, negatives, sitelinks = _columns(_RSA_COLS), _columns(_NEGATIVE_COLS), _columns(_SITELINK_COLS)
     for c in draft.get("campaigns", []):
-        campaigns.append({
-            "Campaign": c["name"],
-            "Campaign State": "enabled",
-            "Campaign Type": c.get("type","Search"),
-            "Budget": c.get("budget_per_day", 100),
-            "Budget Type": "Daily",
-            "Networks": "Google; Search Partners",
-            "Location": "; ".join(c.get("locations", [])),
-            "Languages": "; ".join(c.get("languages", [])),
-            "Bid Strategy Type": c.get("bid_strategy","MANUAL_CPC")
-        })
+        _append(campaigns,
+                c["name"], "enabled", c.get("type","Search"), c.get("budget_per_day", 100), "Daily",
+                "Google; Search Partners", "; ".join(c.get("locations", [])),
+                "; ".join(c.get("languages", [])), c.get("bid_strategy","MANUAL_CPC"))
         for g in c.get("ad_groups", []):
-            ad_groups.append({
-                "Campaign": c["name"],
-                "Ad Group": g["name"],
-                "Ad Group State": "enabled",
-                "Default Max CPC": g.get("default_max_cpc", 1.5),
-            })
+            _append(ad_groups, c["name"], g["name"], "enabled", g.get("default_max_cpc", 1.5))
             for kw in g.get("keywords", []):
-                keywords.append({
-                    "Campaign": c["name"],
-                    "Ad Group": g["name"],
-                    "Keyword": kw["text"],
-                    "Criterion Type": kw["match"],  # "Phrase" or "Exact"
-                    "Final URL": kw.get("final_url","")
-                })
+                # Criterion Type is "Phrase" or "Exact"
+                _append(keywords, c["name"], g["name"], kw["text"], kw["match"], kw.get("final_url",""))
             for ad in g.get("rsas", []):
-                row = {"Campaign": c["name"], "Ad Group": g["name"], "Ad State": "enabled", "Final URL": ad.get("final_url","")}
-                if "paths" in ad:
-                    if len(ad["paths"]) > 0: row["Path 1"] = ad["paths"][0]
-                    if len(ad["paths"]) > 1: row["Path 2"] = ad["paths"][1]
-                for i, h in enumerate(ad.get("headlines", [])[:15], 1):
-                    row[f"Headline {i}"] = h
-                for i, d in enumerate(ad.get("descriptions", [])[:4], 1):
-                    row[f"Description {i}"] = d
-                rsas.append(row)
+                _append(rsas, c["name"], g["name"], "enabled", ad.get("final_url",""))
+                # zip_longest pads unused slots with None; extra values past the last column are dropped
+                for names, values in ((_PATH_COLS, ad.get("paths", ())[:2]),
+                                      (_HEADLINE_COLS, ad.get("headlines", ())[:15]),
+                                      (_DESC_COLS, ad.get("descriptions", ())[:4])):
+                    for name, v in zip_longest(names, values):
+                        rsas[name].append(v)
             for neg in g.get("negatives", []):
-                negatives.append({
-                    "Campaign": c["name"],
-                    "Ad Group": g["name"],
-                    "Keyword": neg["text"],
-                    "Match Type": neg.get("match","Broad")
-                })
+                _append(negatives, c["name"], g["name"], neg["text"], neg.get("match","Broad"))
             for sl in g.get("extensions", {}).get("sitelinks", []):
-                sitelinks.append({
-                    "Campaign": c["name"],
-                    "Ad Group": "",
-                    "Extension": "Sitelink",
-                    "Link Text": sl["text"],
-                    "Final URL": sl.get("final_url",""),
-                    "Description Line 1": sl.get("desc1",""),
-                    "Description Line 2": sl.get("desc2","")
-                })
+                _append(sitelinks,
+                        c["name"], "", "Sitelink", sl["text"], sl.get("final_url",""),
+                        sl.get("desc1",""), sl.get("desc2",""))
+    # Only keep path/headline/description columns some ad actually uses
+    for name in _RSA_OPTIONAL_COLS:
+        if all(v is None for v in rsas[name]):
+            del rsas[name]
     return campaigns, ad_groups, keywords, rsas, negatives, sitelinks
 
-def draft_to_excel(draft: dict, filename: str) -> str:
+def _write_sheet(wb, name: str, cols: dict, header_fmt):
+    ws = wb.add_worksheet(name)
+    ws.write_row(0, 0, list(cols), header_fmt)
+    for r, row in enumerate(zip(*cols.values()), 1):
+        ws.write_row(r, 0, row)
+
+def _write_workbook(draft: dict, target):
     c, ag, kw, ads, neg, sl = _rows_from_draft(draft)
-    out = Path("/mnt/data") / filename
-    with pd.ExcelWriter(out, engine="xlsxwriter") as w:
-        pd.DataFrame(c).to_excel(w, "Campaigns", index=False)
-        pd.DataFrame(ag).to_excel(w, "AdGroups", index=False)
-        pd.DataFrame(kw).to_excel(w, "Keywords", index=False)
-        pd.DataFrame(ads).to_excel(w, "RSAs", index=False)
-        pd.DataFrame(neg).to_excel(w, "Negatives", index=False)
-        pd.DataFrame(sl).to_excel(w, "Extensions", index=False)
+    # constant_memory streams each row to disk as soon as the next one starts,
+    # so rows must be written strictly top to bottom. Sheets are written one
+    # after another on purpose: xlsxwriter serialises in pure Python under the
+    # GIL, so a thread per sheet would only add locking.
+    wb = xlsxwriter.Workbook(target, {"constant_memory": True})
+    try:
+        header_fmt = wb.add_format({"bold": True, "border": 1, "align": "center", "valign": "top"})
+        _write_sheet(wb, "Campaigns", c, header_fmt)
+        _write_sheet(wb, "AdGroups", ag, header_fmt)
+        _write_sheet(wb, "Keywords", kw, header_fmt)
+        _write_sheet(wb, "RSAs", ads, header_fmt)
+        _write_sheet(wb, "Negatives", neg, header_fmt)
+        _write_sheet(wb, "Extensions", sl, header_fmt)
+    finally:
+        wb.close()
+
+def draft_to_excel_bytes(draft: dict) -> io.BytesIO:
+    """Build the draft workbook in memory, ready to stream to the client or upload."""
+    buf = io.BytesIO()
+    _write_workbook(draft, buf)
+    buf.seek(0)
+    return buf
+
+def draft_to_excel(draft: dict, filename: str) -> str:
+    """Local-storage fallback: write the workbook under EXPORTS_DIR and return its path."""
+    out = Path(os.getenv("EXPORTS_DIR", "/mnt/data")) / filename
+    _write_workbook(draft, str(out))
     return str(out)
@@ -4,19 +4,85 @@ AI-powered optimization insights for Facebook Ads.
 Uses OpenAI GPT models with database-stored prompts to generate recommendations.
 """
 
+import hashlib
 import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from itertools import takewhile
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+import numpy as np
 from flask import current_app
-from openai import OpenAI
+from sqlalchemy import func
+from openai import DefaultHttpxClient, OpenAI
 
 from app import db
-from app.models_ads import OptimizerRecommendation, OptimizerAction
+from app.models_ads import OptimizerRecommendation, OptimizerAction, OptimizerBatchJob
+from app.services.json_stream import StreamedItemParser
+
+# orjson is several times faster than the stdlib for the prompt, response
+# and per-row payload (de)serialisation on this path; fall back if missing
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _json_dumps(obj) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj)
+
+
+_json_loads = orjson.loads if orjson is not None else json.loads
 
 # OpenAI Configuration
 OPENAI_API_KEY = None  # Set from env in generate_fbads_insights
 OPENAI_MODEL = "gpt-4o-mini"
 
+# Only these fields are sent to the model; the rest of the client payload is
+# noise billed per input token. Tuples keep the serialised order stable.
+_PROFILE_KEEP = ('name', 'page_name', 'category', 'about', 'description', 'website',
+                 'cta_button', 'cover_photo', 'profile_photo', 'fan_count', 'engagement')
+_CAMPAIGN_KEEP = ('name', 'objective', 'status', 'spend', 'impressions', 'clicks', 'ctr', 'cpc')
+
+# Profile and campaign prompts are independent network round-trips, so they
+# run side by side; latency becomes max(profile, campaign) instead of the sum.
+_OPENAI_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="fbads-openai")
+
+# Every OpenAI client in the process shares one keep-alive connection pool,
+# so concurrent refreshes reuse warm TLS connections instead of each client
+# opening (and contending for) its own.
+_HTTP_CLIENT: Optional[DefaultHttpxClient] = None
+_HTTP_CLIENT_LOCK = threading.Lock()
+
+# OpenAI clients are built once per API key and reused across requests
+_CLIENTS: Dict[str, OpenAI] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+# Formatted insight responses per account, so dashboard reloads inside the
+# 6-hour window skip both the freshness query and the re-format. Entries
+# are dropped whenever an account's recommendations change. Redis is used
+# when configured so every worker sees invalidations; otherwise the cache
+# is local to the process.
+CACHE_TTL = 6 * 3600
+_RESPONSE_CACHE: Dict[int, tuple] = {}  # account_id -> (expires_at, response)
+_RESPONSE_CACHE_LOCK = threading.Lock()
+
+# Recommendations per insights response; total_count covers the rest
+RESPONSE_PAGE_SIZE = 50
+
+# How long parsed recommendations are reused for an identical prompt
+_PROMPT_RESULT_TTL = 86400
+
+# Generations in progress in this process, and how long another worker may
+# hold the cross-process lock for an account
+_INFLIGHT: Dict[int, "_Flight"] = {}
+_INFLIGHT_LOCK = threading.Lock()
+_GENERATION_LOCK_TTL = 60
+
 
 def generate_fbads_insights(
     account_id: int,
@@ -38,42 +104,69 @@ def generate_fbads_insights(
     """
     # Check for recent insights (6-hour cache)
     if not regenerate:
-        cutoff = datetime.utcnow() - timedelta(hours=6)
-        recent = OptimizerRecommendation.query.filter(
+        cached = _get_cached_response(account_id)
+        if cached is not None:
+            return cached
+
+        # Only the newest timestamp is needed, which ix_optrec_recent answers
+        # without reading any table rows
+        cutoff = datetime.utcnow() - timedelta(seconds=CACHE_TTL)
+        latest = db.session.query(OptimizerRecommendation.created_at).filter(
             OptimizerRecommendation.account_id == account_id,
             OptimizerRecommendation.source_type == 'fbads',
             OptimizerRecommendation.status == 'open',
             OptimizerRecommendation.created_at >= cutoff
-        ).first()
+        ).order_by(OptimizerRecommendation.created_at.desc()).limit(1).scalar()
 
-        if recent:
+        if latest:
             current_app.logger.info(f"Using cached FB Ads insights for account {account_id}")
-            return _format_recommendations_response(account_id)
+            response = _format_recommendations_response(account_id)
+            _cache_response(account_id, response, (latest - cutoff).total_seconds())
+            return response
+
+    # Concurrent requests for the same account share one generation
+    return _single_flight(account_id, lambda: _generate_insights(account_id, profile_data, campaign_data))
 
+
+def _generate_insights(account_id: int, profile_data: Dict, campaign_data: Optional[Dict]) -> Dict:
+    """Call OpenAI, store the recommendations and return the formatted response."""
     # Generate new insights
     current_app.logger.info(f"Generating new FB Ads insights for account {account_id}")
 
     try:
-        # Get AI recommendations from OpenAI
-        recommendations = []
-
-        # Generate profile recommendations
-        if profile_data:
-            profile_recs = _call_openai_for_profile_insights(profile_data)
-            recommendations.extend(profile_recs)
+        # Get AI recommendations from OpenAI (profile first, then campaigns).
+        # With both inputs, one combined request replaces the two separate
+        # ones; its recommendations are inserted as they stream in.
+        stored = 0
+        if profile_data and campaign_data:
+            stored = _store_recommendations(
+                account_id, _call_openai_combined(profile_data, campaign_data), profile_data, campaign_data,
+                commit=False
+            )
+
+        if not stored:
+            calls = []
+            if profile_data:
+                calls.append((_call_openai_for_profile_insights, profile_data))
+            if campaign_data:
+                calls.append((_call_openai_for_campaign_insights, campaign_data))
 
-        # Generate campaign recommendations if data provided
-        if campaign_data:
-            campaign_recs = _call_openai_for_campaign_insights(campaign_data)
-            recommendations.extend(campaign_recs)
+            recommendations = []
+            for recs in _run_concurrently(calls):
+                recommendations.extend(recs)
 
-        # Store recommendations in database
-        _store_recommendations(account_id, recommendations, profile_data, campaign_data)
+            # Store recommendations in database
+            _store_recommendations(account_id, recommendations, profile_data, campaign_data, commit=False)
 
-        # Return formatted response
-        return _format_recommendations_response(account_id)
+        # Read back and commit in the same transaction as the inserts; the
+        # fresh response replaces whatever was cached for the account
+        response = _format_recommendations_response(account_id)
+        db.session.commit()
+        _cache_response(account_id, response, CACHE_TTL)
+        return response
 
     except Exception as e:
+        db.session.rollback()
         current_app.logger.exception(f"Error generating FB Ads insights: {e}")
         return {
             "ok": False,
@@ -83,15 +176,153 @@ def generate_fbads_insights(
         }
 
 
-def _call_openai_for_profile_insights(profile_data: Dict) -> List[Dict]:
+class _Flight:
+    """One in-progress generation that other requests for the account wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[Dict] = None
+
+
+def _single_flight(account_id: int, generate: Callable[[], Dict]) -> Dict:
     """
-    Call OpenAI API to generate Facebook Page profile optimization insights.
+    Run ``generate`` once per account at a time.
 
-    Args:
-        profile_data: Facebook Page profile data
+    Requests that arrive while a generation is in flight in this process wait
+    for it and share its result instead of paying for their own OpenAI calls.
+    Across processes the same is done with a short Redis lock.
+    """
+    with _INFLIGHT_LOCK:
+        flight = _INFLIGHT.get(account_id)
+        leader = flight is None
+        if leader:
+            flight = _INFLIGHT[account_id] = _Flight()
+
+    if not leader:
+        # Bounded so a stuck leader can't hold followers' worker threads
+        if not flight.done.wait(_GENERATION_LOCK_TTL):
+            current_app.logger.warning(f"FB Ads insights generation for account {account_id} still running, generating separately")
+        # The leader leaves no result if it raised or is still running; try on our own
+        return flight.result if flight.result is not None else generate()
 
-    Returns:
-        List of recommendation dictionaries
+    try:
+        flight.result = _generate_across_workers(account_id, generate)
+        return flight.result
+    finally:
+        with _INFLIGHT_LOCK:
+            del _INFLIGHT[account_id]
+        flight.done.set()
+
+
+def _generate_across_workers(account_id: int, generate: Callable[[], Dict]) -> Dict:
+    r = getattr(current_app, 'redis', None)
+    if r is None:
+        return generate()
+
+    lock_key = f"fbads:insights:lock:{account_id}"
+    token = uuid.uuid4().hex
+    try:
+        acquired = r.set(lock_key, token, nx=True, ex=_GENERATION_LOCK_TTL)
+    except Exception as e:
+        current_app.logger.warning(f"Redis unavailable for FB Ads insights lock: {e}")
+        return generate()
+
+    if not acquired:
+        # Another worker is generating; its response lands in the shared cache
+        deadline = time.monotonic() + _GENERATION_LOCK_TTL
+        try:
+            while r.exists(lock_key) and time.monotonic() < deadline:
+                time.sleep(0.5)
+        except Exception as e:
+            current_app.logger.warning(f"Redis unavailable for FB Ads insights lock: {e}")
+        cached = _get_cached_response(account_id)
+        return cached if cached is not None else generate()
+
+    try:
+        return generate()
+    finally:
+        try:
+            if r.get(lock_key) == token:
+                r.delete(lock_key)
+        except Exception as e:
+            current_app.logger.warning(f"Failed to release FB Ads insights lock: {e}")
+
+
+def _response_cache_key(account_id: int) -> str:
+    return f"fbads:insights:{account_id}"
+
+
+def _get_cached_response(account_id: int) -> Optional[Dict]:
+    r = getattr(current_app, 'redis', None)
+    if r is not None:
+        try:
+            cached = r.get(_response_cache_key(account_id))
+            return _json_loads(cached) if cached else None
+        except Exception as e:
+            current_app.logger.warning(f"Redis unavailable for FB Ads insights cache: {e}")
+
+    with _RESPONSE_CACHE_LOCK:
+        entry = _RESPONSE_CACHE.get(account_id)
+        if entry is None:
+            return None
+        if entry[0] <= time.time():
+            del _RESPONSE_CACHE[account_id]
+            return None
+        return entry[1]
+
+
+def _cache_response(account_id: int, response: Dict, ttl: float):
+    r = getattr(current_app, 'redis', None)
+    if r is not None:
+        try:
+            r.set(_response_cache_key(account_id), _json_dumps(response), ex=max(int(ttl), 1))
+            return
+        except Exception as e:
+            current_app.logger.warning(f"Redis unavailable for FB Ads insights cache: {e}")
+
+    with _RESPONSE_CACHE_LOCK:
+        _RESPONSE_CACHE[account_id] = (time.time() + ttl, response)
+
+
+def invalidate_fbads_insights_cache(account_id: int):
+    """Drop the cached insights response after an account's recommendations change."""
+    r = getattr(current_app, 'redis', None)
+    if r is not None:
+        try:
+            r.delete(_response_cache_key(account_id))
+        except Exception as e:
+            current_app.logger.warning(f"Failed to invalidate FB Ads insights cache: {e}")
+    with _RESPONSE_CACHE_LOCK:
+        _RESPONSE_CACHE.pop(account_id, None)
+
+
+def _run_concurrently(calls: List[tuple]) -> List[List[Dict]]:
+    """
+    Run ``(fn, arg)`` OpenAI calls in parallel, each in its own app context.
+
+    Results come back in call order; the first failure is re-raised.
+    """
+    if len(calls) <= 1:
+        return [fn(arg) for fn, arg in calls]
+
+    app = current_app._get_current_object()
+
+    def run(fn: Callable[[Dict], List[Dict]], arg: Dict) -> List[Dict]:
+        with app.app_context():
+            return fn(arg)
+
+    futures = [_OPENAI_POOL.submit(run, fn, arg) for fn, arg in calls]
+    return [f.result() for f in futures]
+
+
+def _pick(data: Dict, keys: tuple) -> Dict:
+    return {k: data[k] for k in keys if k in data}
+
+
+def _build_profile_prompt(profile_data: Dict) -> tuple:
+    """
+    Build the (system_message, user_prompt, model, temperature, max_tokens)
+    for the Facebook Page profile analysis.
     """
     from app.services.ai_prompts_init import get_prompt_for_service
 
@@ -109,7 +340,7 @@ def _call_openai_for_profile_insights(profile_data: Dict) -> List[Dict]:
         user_prompt = f"""Analyze this Facebook Page profile and provide 3-5 actionable optimization recommendations.
 
 PROFILE DATA:
-{json.dumps(profile_data, indent=2)}
+{_json_dumps(_pick(profile_data, _PROFILE_KEEP))}
 
 Return ONLY valid JSON array of recommendations with these fields:
 - title: Brief action-oriented title
@@ -152,54 +383,13 @@ Return ONLY valid JSON array of recommendations with these fields:
             profile_photo=profile_photo
         )
 
-    # Get API key from environment
-    api_key = current_app.config.get('OPENAI_API_KEY')
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY not configured")
-
-    # Call OpenAI
-    client = OpenAI(api_key=api_key)
-
-    try:
-        response = client.chat.completions.create(
-            model=model,
-            temperature=temperature,
-            max_tokens=max_tokens,
-            response_format={"type": "json_object"},
-            messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": user_prompt}
-            ]
-        )
-
-        content = response.choices[0].message.content
-        result = json.loads(content)
-
-        # Extract recommendations array
-        if isinstance(result, dict) and 'recommendations' in result:
-            recommendations = result['recommendations']
-        elif isinstance(result, list):
-            recommendations = result
-        else:
-            current_app.logger.warning(f"Unexpected OpenAI response format: {result}")
-            recommendations = []
-
-        return recommendations
-
-    except Exception as e:
-        current_app.logger.exception(f"OpenAI API error: {e}")
-        raise
+    return system_message, user_prompt, model, temperature, max_tokens
 
 
-def _call_openai_for_campaign_insights(campaign_data: Dict) -> List[Dict]:
+def _build_campaign_prompt(campaign_data: Dict) -> tuple:
     """
-    Call OpenAI API to generate Facebook Ads campaign optimization insights.
-
-    Args:
-        campaign_data: Campaign performance data
-
-    Returns:
-        List of recommendation dictionaries
+    Build the (system_message, user_prompt, model, temperature, max_tokens)
+    for the Facebook Ads campaign analysis.
     """
     from app.services.ai_prompts_init import get_prompt_for_service
 
@@ -217,7 +407,7 @@ def _call_openai_for_campaign_insights(campaign_data: Dict) -> List[Dict]:
         user_prompt = f"""Analyze this Facebook Ads campaign data and provide 5-8 actionable optimization recommendations.
 
 CAMPAIGN DATA:
-{json.dumps(campaign_data, indent=2)}
+{_json_dumps({'campaigns': [_pick(c, _CAMPAIGN_KEEP) for c in campaign_data.get('campaigns', [])]})}
 
 Return ONLY valid JSON array of recommendations."""
     else:
@@ -229,9 +419,12 @@ Return ONLY valid JSON array of recommendations."""
 
         # Extract campaign metrics
         campaigns = campaign_data.get('campaigns', [])
-        total_spend = sum(float(c.get('spend', 0)) for c in campaigns)
-        total_impressions = sum(int(c.get('impressions', 0)) for c in campaigns)
-        total_clicks = sum(int(c.get('clicks', 0)) for c in campaigns)
+        # One pass over the campaigns, then column sums in NumPy
+        totals = np.array(
+            [(float(c.get('spend', 0)), int(c.get('impressions', 0)), int(c.get('clicks', 0))) for c in campaigns],
+            dtype=np.float64
+        ).reshape(-1, 3).sum(axis=0)
+        total_spend, total_impressions, total_clicks = float(totals[0]), int(totals[1]), int(totals[2])
         avg_cpc = total_spend / total_clicks if total_clicks > 0 else 0
         avg_cpm = (total_spend / total_impressions) * 1000 if total_impressions > 0 else 0
         avg_ctr = (total_clicks / total_impressions) * 100 if total_impressions > 0 else 0
@@ -245,57 +438,407 @@ Return ONLY valid JSON array of recommendations."""
             avg_cpc=f"${avg_cpc:.2f}",
             avg_cpm=f"${avg_cpm:.2f}",
             avg_ctr=f"{avg_ctr:.2f}%",
-            campaigns_data=json.dumps(campaigns[:5], indent=2)  # Top 5 campaigns
+            campaigns_data=_json_dumps([_pick(c, _CAMPAIGN_KEEP) for c in campaigns[:5]])  # Top 5 campaigns
         )
 
-    # Get API key from environment
+    return system_message, user_prompt, model, temperature, max_tokens
+
+
+def _http_client() -> DefaultHttpxClient:
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None:
+        with _HTTP_CLIENT_LOCK:
+            if _HTTP_CLIENT is None:
+                # The SDK's own client class keeps its default pool limits and timeouts
+                _HTTP_CLIENT = DefaultHttpxClient()
+    return _HTTP_CLIENT
+
+
+def _openai_client() -> OpenAI:
     api_key = current_app.config.get('OPENAI_API_KEY')
     if not api_key:
         raise ValueError("OPENAI_API_KEY not configured")
 
-    # Call OpenAI
-    client = OpenAI(api_key=api_key)
+    client = _CLIENTS.get(api_key)
+    if client is None:
+        with _CLIENTS_LOCK:
+            client = _CLIENTS.get(api_key)
+            if client is None:
+                client = _CLIENTS[api_key] = OpenAI(
+                    api_key=api_key, max_retries=2, timeout=30.0, http_client=_http_client()
+                )
+    return client
+
+
+# Structured-output schema for one recommendation. Strict mode requires every
+# property to be listed as required and forbids extra keys.
+_RECOMMENDATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "description": {"type": "string"},
+        "category": {"type": "string"},
+        "severity": {"type": "integer", "enum": [1, 2, 3, 4, 5]},
+        "expected_impact": {"type": "string"},
+        "data_points": {"type": "array", "items": {"type": "string"}},
+        "action": {
+            "type": "object",
+            "properties": {
+                "summary": {"type": "string"},
+                "steps": {"type": "array", "items": {"type": "string"}}
+            },
+            "required": ["summary", "steps"],
+            "additionalProperties": False
+        }
+    },
+    "required": ["title", "description", "category", "severity", "expected_impact", "data_points", "action"],
+    "additionalProperties": False
+}
 
-    try:
-        response = client.chat.completions.create(
-            model=model,
-            temperature=temperature,
-            max_tokens=max_tokens,
-            response_format={"type": "json_object"},
-            messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": user_prompt}
-            ]
-        )
+# Model families that accept json_schema response formats; prompts configured
+# for anything else keep plain JSON mode
+_STRUCTURED_OUTPUT_MODELS = ('gpt-4o', 'gpt-4.1', 'gpt-5', 'o1', 'o3', 'o4')
 
-        content = response.choices[0].message.content
-        result = json.loads(content)
 
-        # Extract recommendations array
-        if isinstance(result, dict) and 'recommendations' in result:
-            recommendations = result['recommendations']
-        elif isinstance(result, list):
-            recommendations = result
-        else:
-            current_app.logger.warning(f"Unexpected OpenAI response format: {result}")
-            recommendations = []
+def _response_format(model: str, keys: tuple) -> Dict:
+    """JSON schema with one recommendations array per key, where the model supports it."""
+    if not model.startswith(_STRUCTURED_OUTPUT_MODELS):
+        return {"type": "json_object"}
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "recommendations",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {key: {"type": "array", "items": _RECOMMENDATION_SCHEMA} for key in keys},
+                "required": list(keys),
+                "additionalProperties": False
+            }
+        }
+    }
+
+
+def _chat_request(system_message: str, user_prompt: str, model: str, temperature: float, max_tokens: int,
+                  keys: tuple = ('recommendations',)) -> Dict:
+    """Chat completion parameters, shared by online calls and Batch API lines."""
+    return {
+        "model": model,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "response_format": _response_format(model, keys),
+        "messages": [
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": user_prompt}
+        ]
+    }
+
+
+def _stream_json_items(system_message: str, user_prompt: str, model: str, temperature: float, max_tokens: int,
+                       keys: tuple = ('recommendations',)) -> Iterator[Dict]:
+    """
+    Run one streamed JSON-mode chat completion, yielding each object of the
+    response's arrays as soon as it is complete.
+
+    Parsed items are cached in Redis by a hash of the full request for a day,
+    so regenerating for an unchanged profile doesn't call OpenAI again.
+    """
+    r = getattr(current_app, 'redis', None)
+    cache_key = "fbads_rec:" + hashlib.blake2b(
+        "\0".join((model, system_message, user_prompt, *keys)).encode(), digest_size=16
+    ).hexdigest()
+    if r is not None:
+        try:
+            cached = r.get(cache_key)
+            if cached:
+                yield from _json_loads(cached)
+                return
+        except Exception as e:
+            current_app.logger.warning(f"Redis unavailable for FB Ads prompt cache: {e}")
+
+    client = _openai_client()
+    parser = StreamedItemParser()
+    items = []
+
+    try:
+        stream = client.chat.completions.create(
+            **_chat_request(system_message, user_prompt, model, temperature, max_tokens, keys),
+            stream=True
+        )
 
-        return recommendations
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            content = chunk.choices[0].delta.content
+            if content:
+                for item in parser.feed(content):
+                    items.append(item)
+                    yield item
 
     except Exception as e:
         current_app.logger.exception(f"OpenAI API error: {e}")
         raise
 
+    if not items:
+        current_app.logger.warning(f"Unexpected OpenAI response format: {''.join(parser.chunks)}")
+    elif r is not None:
+        try:
+            r.set(cache_key, _json_dumps(items), ex=_PROMPT_RESULT_TTL)
+        except Exception as e:
+            current_app.logger.warning(f"Redis unavailable for FB Ads prompt cache: {e}")
 
-def _store_recommendations(account_id: int, recommendations: List[Dict], profile_data: Dict, campaign_data: Optional[Dict]):
+
+def _extract_recommendations(result) -> List[Dict]:
+    """Pull the recommendations array out of a parsed OpenAI response."""
+    if isinstance(result, dict) and 'recommendations' in result:
+        return result['recommendations']
+    elif isinstance(result, list):
+        return result
+    current_app.logger.warning(f"Unexpected OpenAI response format: {result}")
+    return []
+
+
+def _call_openai_for_profile_insights(profile_data: Dict) -> List[Dict]:
+    """
+    Call OpenAI API to generate Facebook Page profile optimization insights.
+
+    Args:
+        profile_data: Facebook Page profile data
+
+    Returns:
+        List of recommendation dictionaries
+    """
+    return list(_stream_json_items(*_build_profile_prompt(profile_data)))
+
+
+def _call_openai_for_campaign_insights(campaign_data: Dict) -> List[Dict]:
+    """
+    Call OpenAI API to generate Facebook Ads campaign optimization insights.
+
+    Args:
+        campaign_data: Campaign performance data
+
+    Returns:
+        List of recommendation dictionaries
+    """
+    return list(_stream_json_items(*_build_campaign_prompt(campaign_data)))
+
+
+def _call_openai_combined(profile_data: Dict, campaign_data: Dict) -> Iterator[Dict]:
+    """
+    Analyze profile and campaigns in a single OpenAI request.
+
+    Both prompts are sent under section markers with one shared system
+    message, halving round-trips and the repeated instruction tokens.
+
+    Yields:
+        Profile then campaign recommendations as they stream in; nothing if
+        the model didn't return usable arrays (callers fall back to two calls)
+    """
+    p_system, p_prompt, model, temperature, p_max_tokens = _build_profile_prompt(profile_data)
+    c_system, c_prompt, _, _, c_max_tokens = _build_campaign_prompt(campaign_data)
+
+    system_message = p_system if c_system == p_system else f"{p_system}\n\n{c_system}"
+    user_prompt = f"""# PROFILE
+{p_prompt}
+
+# CAMPAIGNS
+{c_prompt}
+
+Return a single JSON object with keys "profile_recommendations" and "campaign_recommendations", each an array of recommendations following the schema specified in its section."""
+
+    return _stream_json_items(
+        system_message, user_prompt, model, temperature, p_max_tokens + c_max_tokens,
+        keys=('profile_recommendations', 'campaign_recommendations')
+    )
+
+
+# Recommendations per INSERT while consuming a streamed response
+_STORE_BATCH_SIZE = 4
+
+# Batch API statuses after which a job will not change again
+_BATCH_FINAL_STATUSES = ('completed', 'failed', 'expired', 'cancelled')
+
+
+def submit_fbads_insights_batch(accounts: Dict[int, Dict]) -> Optional[OptimizerBatchJob]:
+    """
+    Queue insight regeneration for many accounts through the OpenAI Batch API.
+
+    Batch requests are billed at half the online price and don't count
+    against the online TPM limit, at the cost of up to 24h turnaround, so
+    this is meant for nightly refreshes rather than interactive requests.
+    Results are stored by poll_fbads_insight_batches().
+
+    Args:
+        accounts: Account ID -> {"profile_data": ..., "campaign_data": ...}
+
+    Returns:
+        The persisted OptimizerBatchJob, or None if there was nothing to submit
+    """
+    lines = []
+    for account_id, inputs in accounts.items():
+        profile_data = inputs.get('profile_data')
+        campaign_data = inputs.get('campaign_data')
+        if profile_data:
+            lines.append({
+                "custom_id": f"acct-{account_id}-profile",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": _chat_request(*_build_profile_prompt(profile_data))
+            })
+        if campaign_data:
+            lines.append({
+                "custom_id": f"acct-{account_id}-campaigns",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": _chat_request(*_build_campaign_prompt(campaign_data))
+            })
+
+    if not lines:
+        return None
+
+    client = _openai_client()
+    payload = "\n".join(_json_dumps(line) for line in lines).encode('utf-8')
+    input_file = client.files.create(file=("fbads_insights.jsonl", payload), purpose="batch")
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+
+    job = OptimizerBatchJob(
+        source_type='fbads',
+        batch_id=batch.id,
+        input_file_id=input_file.id,
+        status='submitted',
+        request_json=_json_dumps({str(account_id): inputs for account_id, inputs in accounts.items()})
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    current_app.logger.info(f"Submitted FB Ads insights batch {batch.id} ({len(lines)} requests, {len(accounts)} accounts)")
+    return job
+
+
+def poll_fbads_insight_batches() -> int:
+    """
+    Check submitted FB Ads batches and store the recommendations of finished ones.
+
+    Returns:
+        Number of batch jobs that reached a final status
+    """
+    jobs = OptimizerBatchJob.query.filter_by(source_type='fbads', status='submitted').all()
+    if not jobs:
+        return 0
+
+    client = _openai_client()
+    finished = 0
+
+    for job in jobs:
+        try:
+            batch = client.batches.retrieve(job.batch_id)
+            if batch.status not in _BATCH_FINAL_STATUSES:
+                continue
+
+            # Expired batches still return whatever completed in the window
+            stored_accounts = []
+            if batch.output_file_id:
+                job.output_file_id = batch.output_file_id
+                stored_accounts = _store_batch_output(job, client.files.content(batch.output_file_id).text)
+
+            if batch.status != 'completed':
+                job.error = _json_dumps(batch.errors.model_dump()) if batch.errors else batch.status
+
+            job.status = batch.status
+            job.completed_at = datetime.utcnow()
+            # Stored recommendations and the final status commit together
+            db.session.commit()
+            for account_id in stored_accounts:
+                invalidate_fbads_insights_cache(account_id)
+            finished += 1
+
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.exception(f"Error polling FB Ads insights batch {job.batch_id}: {e}")
+
+    return finished
+
+
+def _store_batch_output(job: OptimizerBatchJob, output: str) -> List[int]:
+    """
+    Route each Batch API output line back to its account by custom_id.
+
+    Malformed or failed lines are logged and skipped. Nothing is committed
+    here: the caller commits every account's rows together with the job's
+    final status, so a failure can't leave some accounts stored while the
+    job is polled (and stored) again.
+
+    Returns:
+        IDs of the accounts that got recommendations
+    """
+    inputs = _json_loads(job.request_json)
+    recommendations: Dict[str, List[Dict]] = {}
+
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        try:
+            item = _json_loads(line)
+            custom_id = item['custom_id']
+            response = item.get('response') or {}
+
+            if item.get('error') or response.get('status_code') != 200:
+                current_app.logger.warning(f"FB Ads batch request {custom_id} failed: {item.get('error') or response}")
+                continue
+
+            account_id = str(int(custom_id.split('-')[1]))
+            content = response['body']['choices'][0]['message']['content']
+            recs = [rec for rec in _extract_recommendations(_json_loads(content)) if isinstance(rec, dict)]
+        except (ValueError, KeyError, IndexError, TypeError, AttributeError) as e:
+            current_app.logger.error(f"Skipping malformed FB Ads batch output line in {job.batch_id}: {e}")
+            continue
+
+        recommendations.setdefault(account_id, []).extend(recs)
+
+    stored = []
+    for account_id, recs in recommendations.items():
+        if not recs:
+            continue
+        account_inputs = inputs.get(account_id, {})
+        _store_recommendations(
+            int(account_id),
+            recs,
+            account_inputs.get('profile_data') or {},
+            account_inputs.get('campaign_data'),
+            commit=False
+        )
+        stored.append(int(account_id))
+    return stored
+
+
+def _store_recommendations(
+    account_id: int,
+    recommendations: Iterable[Dict],
+    profile_data: Dict,
+    campaign_data: Optional[Dict],
+    commit: bool = True
+) -> int:
     """
     Store recommendations in the database.
 
+    Rows are inserted in small batches as the iterable produces them, so a
+    streamed response is written while the rest is still generating; the
+    whole set is committed once at the end.
+
     Args:
         account_id: The account ID
-        recommendations: List of recommendation dicts from OpenAI
+        recommendations: Recommendation dicts from OpenAI (list or stream)
         profile_data: Profile data for context
         campaign_data: Campaign data for context
+        commit: If False, leave the rows in the caller's open transaction
+
+    Returns:
+        Number of recommendations stored
     """
     # Calculate confidence based on data completeness
     confidence = _calculate_confidence(profile_data, campaign_data)
@@ -303,124 +846,206 @@ def _store_recommendations(account_id: int, recommendations: List[Dict], profile
     # Get profile identifier
     source_id = profile_data.get('page_id') or profile_data.get('name') or 'unknown'
 
-    for rec in recommendations:
-        # Create recommendation record
-        recommendation = OptimizerRecommendation(
-            account_id=account_id,
-            source_type='fbads',
-            source_id=str(source_id),
-            title=rec.get('title', 'Untitled Recommendation'),
-            description=rec.get('description', ''),
-            category=rec.get('category', 'general'),
-            severity=rec.get('severity', 3),
-            expected_impact=rec.get('expected_impact', ''),
-            confidence=confidence,
-            data_points=json.dumps(rec.get('data_points', [])),
-            action_data=json.dumps(rec.get('action', {})),
-            status='open',
-            created_at=datetime.utcnow()
-        )
+    now = datetime.utcnow()
+    insert = OptimizerRecommendation.__table__.insert()
+    rows = []
+    stored = 0
 
-        db.session.add(recommendation)
+    def row(rec: Dict) -> Dict:
+        return {
+            'account_id': account_id,
+            'source_type': 'fbads',
+            'source_id': str(source_id),
+            'title': rec.get('title', 'Untitled Recommendation'),
+            'details': rec.get('description', ''),
+            'category': rec.get('category', 'general'),
+            'severity': rec.get('severity', 3),
+            'expected_impact': rec.get('expected_impact', ''),
+            'confidence': confidence,
+            'data_points': _json_dumps(rec.get('data_points', [])),
+            'action_data': _json_dumps(rec.get('action', {})),
+            'status': 'open',
+            'created_at': now
+        }
 
     try:
-        db.session.commit()
-        current_app.logger.info(f"Stored {len(recommendations)} FB Ads recommendations for account {account_id}")
+        # Multi-row INSERTs instead of a round-trip per recommendation
+        for rec in recommendations:
+            rows.append(row(rec))
+            if len(rows) >= _STORE_BATCH_SIZE:
+                db.session.execute(insert, rows)
+                stored += len(rows)
+                rows = []
+        if rows:
+            db.session.execute(insert, rows)
+            stored += len(rows)
+        if commit:
+            db.session.commit()
+            invalidate_fbads_insights_cache(account_id)
+        current_app.logger.info(f"Stored {stored} FB Ads recommendations for account {account_id}")
+        return stored
     except Exception as e:
         db.session.rollback()
         current_app.logger.exception(f"Error storing FB Ads recommendations: {e}")
         raise
 
 
+# Confidence boosts for each profile field that is filled in
+_PROFILE_CONFIDENCE_WEIGHTS = (('name', 0.05), ('about', 0.05), ('description', 0.1), ('website', 0.05))
+
+
 def _calculate_confidence(profile_data: Dict, campaign_data: Optional[Dict]) -> float:
     """
     Calculate confidence score (0.0-1.0) based on data completeness.
 
     More complete data = higher confidence in recommendations.
     """
-    confidence = 0.5  # Base confidence
+    # Base confidence plus boosts for having profile data
+    confidence = 0.5 + sum(w for key, w in _PROFILE_CONFIDENCE_WEIGHTS if profile_data.get(key))
 
-    # Boost for having profile data
-    if profile_data.get('name'):
-        confidence += 0.05
-    if profile_data.get('about'):
-        confidence += 0.05
-    if profile_data.get('description'):
-        confidence += 0.1
-    if profile_data.get('website'):
-        confidence += 0.05
-
-    # Boost for having campaign data
+    # Boost for having campaign data (at least 1, at least 3, with performance data)
     if campaign_data:
         campaigns = campaign_data.get('campaigns', [])
-        if len(campaigns) >= 1:
-            confidence += 0.1
-        if len(campaigns) >= 3:
-            confidence += 0.05
-
-        # Check if campaigns have performance data
-        has_perf_data = any(c.get('spend') or c.get('impressions') for c in campaigns)
-        if has_perf_data:
-            confidence += 0.1
+        confidence += (
+            0.1 * (len(campaigns) >= 1)
+            + 0.05 * (len(campaigns) >= 3)
+            + 0.1 * any(c.get('spend') or c.get('impressions') for c in campaigns)
+        )
 
     return min(confidence, 1.0)
 
 
-def _format_recommendations_response(account_id: int) -> Dict:
+def _format_recommendations_response(account_id: int, limit: int = RESPONSE_PAGE_SIZE, offset: int = 0) -> Dict:
     """
     Format recommendations for API response.
 
     Args:
         account_id: The account ID
+        limit: Maximum number of recommendations to return
+        offset: Number of recommendations to skip (severity/recency order)
 
     Returns:
-        Dict with summary and recommendations
+        Dict with summary, one page of recommendations and the total count
     """
-    recommendations = OptimizerRecommendation.query.filter(
+    filters = (
         OptimizerRecommendation.account_id == account_id,
         OptimizerRecommendation.source_type == 'fbads',
         OptimizerRecommendation.status == 'open'
-    ).order_by(
+    )
+
+    # Plain column rows: no ORM instances or identity-map bookkeeping for a
+    # read-only listing
+    rows = db.session.query(
+        OptimizerRecommendation.id,
+        OptimizerRecommendation.title,
+        OptimizerRecommendation.details,
+        OptimizerRecommendation.category,
+        OptimizerRecommendation.severity,
+        OptimizerRecommendation.expected_impact,
+        OptimizerRecommendation.confidence,
+        OptimizerRecommendation.data_points,
+        OptimizerRecommendation.action_data,
+        OptimizerRecommendation.created_at
+    ).filter(*filters).order_by(
         OptimizerRecommendation.severity.asc(),
         OptimizerRecommendation.created_at.desc()
-    ).all()
+    ).limit(limit).offset(offset).all()
 
     # Format recommendations
-    formatted_recs = []
-    for rec in recommendations:
-        formatted_recs.append({
+    formatted_recs = [
+        {
             'id': rec.id,
             'title': rec.title,
-            'description': rec.description,
+            'description': rec.details,
             'category': rec.category,
             'severity': rec.severity,
             'expected_impact': rec.expected_impact,
             'confidence': rec.confidence or 0.75,
-            'data_points': json.loads(rec.data_points) if rec.data_points else [],
-            'action': json.loads(rec.action_data) if rec.action_data else {},
+            'data_points': _json_loads(rec.data_points) if rec.data_points else [],
+            'action': _json_loads(rec.action_data) if rec.action_data else {},
             'created_at': rec.created_at.isoformat() if rec.created_at else None
-        })
+        }
+        for rec in rows
+    ]
+
+    # A short first page is the whole list; otherwise count in the DB
+    if offset == 0 and len(formatted_recs) < limit:
+        total_count = len(formatted_recs)
+    else:
+        total_count = db.session.query(func.count(OptimizerRecommendation.id)).filter(*filters).scalar()
 
     # Generate summary
-    if not formatted_recs:
+    if not total_count:
         summary = "No optimization recommendations at this time."
-    elif len(formatted_recs) == 1:
+    elif total_count == 1:
         summary = "Found 1 optimization opportunity for your Facebook Ads account."
     else:
-        critical_count = sum(1 for r in formatted_recs if r['severity'] == 1)
+        # Rows are ordered by severity, so critical ones are a prefix
+        critical_count = sum(
+            1 for r in takewhile(lambda r: r['severity'] <= 1, formatted_recs) if r['severity'] == 1
+        )
+        if offset or critical_count == limit:
+            # Critical rows may lie outside this page
+            critical_count = db.session.query(func.count(OptimizerRecommendation.id)).filter(
+                *filters, OptimizerRecommendation.severity == 1
+            ).scalar()
         if critical_count > 0:
-            summary = f"Found {len(formatted_recs)} optimization opportunities including {critical_count} critical issue(s)."
+            summary = f"Found {total_count} optimization opportunities including {critical_count} critical issue(s)."
         else:
-            summary = f"Found {len(formatted_recs)} optimization opportunities to improve your Facebook Ads performance."
+            summary = f"Found {total_count} optimization opportunities to improve your Facebook Ads performance."
 
     return {
         "ok": True,
         "summary": summary,
         "recommendations": formatted_recs,
-        "total_count": len(formatted_recs)
+        "total_count": total_count,
+        "limit": limit,
+        "offset": offset
     }
 
 
+def _set_recommendation_status(
+    account_id: int,
+    recommendation_id: int,
+    user_id: int,
+    status: str,
+    notes: Optional[str] = None
+) -> bool:
+    """
+    Set a recommendation's status and record the action in one transaction.
+
+    The UPDATE doubles as the ownership check (no SELECT first), and the
+    action row is inserted directly. MySQL has no UPDATE ... RETURNING, so
+    this is two statements rather than one CTE.
+
+    Returns:
+        False if no FB Ads recommendation with that ID belongs to the account
+    """
+    result = db.session.execute(
+        OptimizerRecommendation.__table__.update().where(
+            OptimizerRecommendation.id == recommendation_id,
+            OptimizerRecommendation.account_id == account_id,
+            OptimizerRecommendation.source_type == 'fbads'
+        ).values(status=status)
+    )
+    if result.rowcount == 0:
+        db.session.rollback()
+        return False
+
+    db.session.execute(
+        OptimizerAction.__table__.insert().values(
+            recommendation_id=recommendation_id,
+            applied_by=user_id,
+            applied_at=datetime.utcnow(),
+            action_type=status,
+            notes=notes
+        )
+    )
+    db.session.commit()
+    invalidate_fbads_insights_cache(account_id)
+    return True
+
+
 def apply_fbads_recommendation(account_id: int, recommendation_id: int, user_id: int) -> Dict:
     """
     Mark a FB Ads recommendation as applied.
@@ -433,31 +1058,10 @@ def apply_fbads_recommendation(account_id: int, recommendation_id: int, user_id:
     Returns:
         Dict with ok status
     """
-    recommendation = OptimizerRecommendation.query.filter(
-        OptimizerRecommendation.id == recommendation_id,
-        OptimizerRecommendation.account_id == account_id,
-        OptimizerRecommendation.source_type == 'fbads'
-    ).first()
-
-    if not recommendation:
-        return {"ok": False, "error": "Recommendation not found"}
-
-    # Update status
-    recommendation.status = 'applied'
-
-    # Create action record
-    action = OptimizerAction(
-        recommendation_id=recommendation_id,
-        applied_by=user_id,
-        applied_at=datetime.utcnow(),
-        action_type='applied',
-        notes=None
-    )
-
-    db.session.add(action)
-
     try:
-        db.session.commit()
+        if not _set_recommendation_status(account_id, recommendation_id, user_id, 'applied'):
+            return {"ok": False, "error": "Recommendation not found"}
+
         current_app.logger.info(f"Applied FB Ads recommendation {recommendation_id} for account {account_id}")
         return {"ok": True}
     except Exception as e:
@@ -484,31 +1088,10 @@ def dismiss_fbads_recommendation(
     Returns:
         Dict with ok status
     """
-    recommendation = OptimizerRecommendation.query.filter(
-        OptimizerRecommendation.id == recommendation_id,
-        OptimizerRecommendation.account_id == account_id,
-        OptimizerRecommendation.source_type == 'fbads'
-    ).first()
-
-    if not recommendation:
-        return {"ok": False, "error": "Recommendation not found"}
-
-    # Update status
-    recommendation.status = 'dismissed'
-
-    # Create action record
-    action = OptimizerAction(
-        recommendation_id=recommendation_id,
-        applied_by=user_id,
-        applied_at=datetime.utcnow(),
-        action_type='dismissed',
-        notes=reason
-    )
-
-    db.session.add(action)
-
     try:
-        db.session.commit()
+        if not _set_recommendation_status(account_id, recommendation_id, user_id, 'dismissed', reason):
+            return {"ok": False, "error": "Recommendation not found"}
+
         current_app.logger.info(f"Dismissed FB Ads recommendation {recommendation_id} for account {account_id}")
         return {"ok": True}
     except Exception as e:
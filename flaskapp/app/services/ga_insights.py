@@ -11,20 +11,140 @@ Features:
 - Stores insights in database for tracking
 - Supports apply/dismiss workflow
 - Confidence scoring based on data quality
+
+Bulk, refresh and background-job generations each hold a DB connection per
+worker thread, alongside request traffic; this relies on the pooled engine
+configured in create_app() (DB_POOL_SIZE + DB_MAX_OVERFLOW, pre-ping and
+recycle), which should stay larger than the thread pools here.
 """
 
 import os
 import json
+import hashlib
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from flask import current_app
+from sqlalchemy import func, select
+from openai import OpenAI, Timeout
 from app import db
-from app.models_ads import OptimizerRecommendation, OptimizerAction
+from app.models_ads import OptimizerRecommendation, OptimizerAction, OptimizerBatchJob
+from app.services.json_stream import StreamedItemParser
+
+# orjson is several times faster than the stdlib for the prompt, cache and
+# per-row payload (de)serialisation on this path; fall back if missing
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _json_dumps(obj) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj, separators=(',', ':'))
+
+
+_json_loads = orjson.loads if orjson is not None else json.loads
 
 # Configuration
 HIGH_SESSIONS_THRESHOLD = int(os.environ.get('HIGH_SESSIONS_THRESHOLD', 10000))  # 10k+ sessions/week = high traffic
 OPENAI_MODEL = os.environ.get('OPENAI_MODEL', 'gpt-4o-mini')
 CACHE_DURATION_HOURS = 6  # Prevent redundant API calls
+# Below this many sessions (or with no page data) the rule-based
+# recommendations say all there is to say, without an OpenAI call
+MIN_SESSIONS_FOR_LLM = int(os.environ.get('GA_MIN_SESSIONS_FOR_LLM', 100))
+
+# Stored insights younger than SOFT_TTL are served as-is; up to HARD_TTL
+# they are still served but regenerated in the background, so only
+# properties idle for longer wait on OpenAI
+SOFT_TTL = timedelta(hours=CACHE_DURATION_HOURS)
+HARD_TTL = timedelta(hours=int(os.environ.get('GA_INSIGHTS_HARD_TTL_HOURS', 24)))
+# Concurrent generations in generate_ga_insights_for_properties()
+BULK_CONCURRENCY = 8
+_REFRESH_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="ga-insights-refresh")
+_refreshing = set()  # (account_id, property_id) refreshes queued in this process
+_refreshing_lock = threading.Lock()
+
+# Generations requested as background jobs (start_ga_insights_job()) run here;
+# their state is kept in Redis (or locally) for JOB_TTL seconds for polling
+JOB_TTL = 3600
+_JOB_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="ga-insights-job")
+_jobs: Dict[str, Tuple[float, str]] = {}  # job_id -> (expires_at, state json)
+_jobs_lock = threading.Lock()
+
+# Bump whenever the prompt wording changes so cached completions for the old
+# wording stop matching
+PROMPT_VERSION = 4
+
+# Longest string (page path, title, source) sent to the model
+_PROMPT_STR_MAX = 80
+
+# Static instructions used when no database prompt is configured. They go
+# first, byte-identical on every call, with only the property's data after
+# them, so OpenAI's automatic prompt caching can reuse the prefix.
+_RECOMMENDATION_FIELDS = """- title: Brief, action-oriented title
+- description: Detailed explanation (2-3 sentences)
+- category: One of [content, traffic_sources, conversions, engagement, technical, user_experience]
+- severity: 1=critical issue, 2=high-impact opportunity, 3=quick win, 4-5=long-term optimization
+- expected_impact: Specific metric improvement (e.g., "Increase conversion rate by 15-20%")
+- data_points: Array of key metrics supporting this recommendation
+- action: Dict with implementation steps
+
+Focus on:
+1. Content optimization for high-traffic pages with low engagement
+2. Traffic source opportunities (underperforming channels)
+3. Conversion funnel improvements
+4. User engagement enhancements
+5. Technical performance issues"""
+
+SYSTEM_PROMPT = f"""You are a Google Analytics optimization expert providing data-driven recommendations in JSON format.
+
+You will be given a GA4 property's last 30 days of data. Provide 5-10 specific, actionable recommendations. Each recommendation should include:
+{_RECOMMENDATION_FIELDS}
+
+Return ONLY a JSON object of the form {{"recommendations": [...]}}, no additional text."""
+
+# Several low-traffic properties of one account are analysed per call (see
+# generate_ga_insights_grouped()), amortising the instructions and request
+# overhead across them
+GROUP_PROMPT_SIZE = 4
+GROUP_SYSTEM_PROMPT = f"""You are a Google Analytics optimization expert providing data-driven recommendations in JSON format.
+
+You will be given the last 30 days of data for several GA4 properties, each under a "PROPERTY <id>" heading. For EACH property provide 3-5 specific, actionable recommendations. Each recommendation should include:
+{_RECOMMENDATION_FIELDS}
+
+Return ONLY a JSON object mapping each property id to its recommendations, of the form {{"<property id>": [...], ...}}, no additional text."""
+
+# Completions are also cached by a hash of the prompt inputs, so properties
+# (or reruns) with identical aggregated data reuse one OpenAI response.
+# Redis is shared by all workers; the local dict is only a fallback.
+PROMPT_CACHE_TTL = CACHE_DURATION_HOURS * 3600
+_PROMPT_CACHE_MAX = 128
+_prompt_cache: Dict[str, Tuple[float, str]] = {}  # key -> (expires_at, content)
+_prompt_cache_lock = threading.Lock()
+
+# One OpenAI client per process, so calls reuse its keep-alive connections
+# to the API instead of a fresh TCP + TLS handshake each time
+_openai_client: Optional[OpenAI] = None
+# Rate limits (429), 5xx responses and connection errors are retried by
+# the SDK with jittered exponential backoff (honouring Retry-After) before
+# the rule-based fallback is used; malformed output is not retried
+OPENAI_MAX_RETRIES = 3
+_openai_client_lock = threading.Lock()
+
+# Recommendations per insights response; stats cover the rest
+RESPONSE_PAGE_SIZE = 50
+
+# Recommendations per INSERT while consuming a streamed response
+_STORE_BATCH_SIZE = 3
+
+# Batch API statuses after which a job will not change again
+_BATCH_FINAL_STATUSES = ('completed', 'failed', 'expired', 'cancelled')
 
 
 def should_run_daily_analysis_ga(account_id: int, weekly_sessions: int) -> bool:
@@ -62,174 +182,788 @@ def generate_ga_insights(account_id: int, property_id: str, regenerate: bool = F
         }
     """
     try:
-        # Check for recent insights (unless regenerate=True)
+        # Serve stored insights unless they are past the hard limit
+        # (or regenerate=True); past the soft limit they are refreshed in the
+        # background while the stale ones are returned. One query loads the
+        # open set (a single generation, so a handful of rows) for both the
+        # freshness check and the response.
+        rows = []
         if not regenerate:
-            recent = OptimizerRecommendation.query.filter(
-                OptimizerRecommendation.account_id == account_id,
-                OptimizerRecommendation.source_type == 'google_analytics',
-                OptimizerRecommendation.source_id == property_id,
-                OptimizerRecommendation.status == 'open',
-                OptimizerRecommendation.created_at >= datetime.utcnow() - timedelta(hours=CACHE_DURATION_HOURS)
-            ).first()
-
-            if recent:
-                current_app.logger.info(f"Using cached GA insights for account {account_id}, property {property_id}")
-                return _format_recommendations_response(account_id, property_id)
+            rows = _open_recommendation_rows(account_id, property_id)
+
+            if rows:
+                age = datetime.utcnow() - max(row.created_at for row in rows)
+                if age < HARD_TTL:
+                    current_app.logger.info(f"Using cached GA insights for account {account_id}, property {property_id}")
+                    response = _format_recommendations_response(account_id, property_id, rows=rows)
+                    if age >= SOFT_TTL:
+                        _schedule_refresh(account_id, property_id)
+                    return response
 
         # Get GA data for analysis
         ga_data = get_ga_performance_data(account_id, property_id, days=30)
 
         if not ga_data or not ga_data.get('summary'):
-            return {
-                "summary": "Insufficient data available for analysis.",
-                "recommendations": [],
-                "stats": {"total": 0, "open": 0}
-            }
+            return _no_insights_response("Insufficient data available for analysis.")
 
         # Generate insights using OpenAI
         current_app.logger.info(f"Generating GA insights for account {account_id}, property {property_id}")
-        recommendations = _call_openai_for_ga_insights(ga_data)
-
-        # Mark old recommendations as superseded
-        if regenerate:
-            OptimizerRecommendation.query.filter(
-                OptimizerRecommendation.account_id == account_id,
-                OptimizerRecommendation.source_type == 'google_analytics',
-                OptimizerRecommendation.source_id == property_id,
-                OptimizerRecommendation.status == 'open'
-            ).update({'status': 'superseded'})
-            db.session.commit()
-
-        # Store recommendations in database
-        for rec in recommendations:
-            confidence = _calculate_confidence_ga(rec, ga_data)
-
-            db_rec = OptimizerRecommendation(
-                account_id=account_id,
-                source_type='google_analytics',
-                source_id=property_id,
-                category=rec.get('category', 'general'),
-                title=rec.get('title', 'Untitled'),
-                details=rec.get('description', ''),
-                expected_impact=rec.get('expected_impact', 'Not specified'),
-                confidence=confidence,
-                severity=rec.get('severity', 4),
-                data_points=json.dumps(rec.get('data_points', [])),
-                action_data=json.dumps(rec.get('action', {})),
-                status='open'
-            )
-            db.session.add(db_rec)
-
-        db.session.commit()
-        current_app.logger.info(f"Stored {len(recommendations)} GA recommendations for account {account_id}")
+        by_severity = _persist_ga_recommendations(
+            account_id, property_id, _call_openai_for_ga_insights(ga_data), ga_data,
+            supersede=regenerate or bool(rows)
+        )
 
-        return _format_recommendations_response(account_id, property_id)
+        # The property's open set is now exactly what was just stored, so the
+        # stats come from memory; only the listing (which needs the new ids)
+        # is read back
+        return _format_recommendations_response(account_id, property_id, by_severity=by_severity)
 
     except Exception as e:
         current_app.logger.error(f"Error generating GA insights: {e}", exc_info=True)
+        return _no_insights_response(f"Error generating insights: {str(e)}")
+
+
+def _no_insights_response(summary: str) -> Dict:
+    return {
+        "summary": summary,
+        "recommendations": [],
+        "stats": {"total": 0, "open": 0}
+    }
+
+
+def generate_ga_insights_for_properties(jobs: List[Tuple[int, str]], regenerate: bool = True,
+                                        max_workers: int = BULK_CONCURRENCY) -> Dict[Tuple[int, str], Dict]:
+    """
+    Generate insights for many properties at once, for scheduled runs that
+    need results now rather than via the Batch API.
+
+    Each property's OpenAI call is network-bound, so up to ``max_workers``
+    run side by side, each on its own thread and app context (and so its own
+    DB session); wall-clock time approaches the slowest property instead of
+    the sum.
+
+    Args:
+        jobs: (account_id, property_id) pairs
+        regenerate: Passed through to generate_ga_insights()
+        max_workers: Maximum concurrent generations
+
+    Returns:
+        Dict mapping (account_id, property_id) to that property's response
+    """
+    if not jobs:
+        return {}
+
+    app = current_app._get_current_object()
+
+    def run(job: Tuple[int, str]) -> Dict:
+        with app.app_context():
+            return generate_ga_insights(job[0], job[1], regenerate=regenerate)
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs)), thread_name_prefix="ga-insights") as pool:
+        return dict(zip(jobs, pool.map(run, jobs)))
+
+
+def generate_ga_insights_grouped(account_id: int, property_ids: List[str]) -> Dict[str, Dict]:
+    """
+    Regenerate insights for several properties of one account, analysing
+    low-traffic properties GROUP_PROMPT_SIZE at a time in a single OpenAI
+    call instead of one call each.
+
+    High-traffic properties (HIGH_SESSIONS_THRESHOLD sessions/week or more)
+    still get their own call, and data too thin for OpenAI gets the
+    rule-based recommendations, as in generate_ga_insights().
+
+    Args:
+        account_id: The account ID
+        property_ids: GA4 property IDs
+
+    Returns:
+        Dict mapping property_id to that property's response
+    """
+    responses = {}
+    grouped = {}
+
+    def store(property_id: str, recommendations: Iterable[Dict], ga_data: Dict):
+        try:
+            by_severity = _persist_ga_recommendations(account_id, property_id, recommendations, ga_data,
+                                                      supersede=True)
+            responses[property_id] = _format_recommendations_response(account_id, property_id,
+                                                                      by_severity=by_severity)
+        except Exception as e:
+            current_app.logger.error(f"Error generating GA insights for property {property_id}: {e}",
+                                     exc_info=True)
+            responses[property_id] = _no_insights_response(f"Error generating insights: {str(e)}")
+
+    for property_id in property_ids:
+        ga_data = get_ga_performance_data(account_id, property_id, days=30)
+        if not ga_data or not ga_data.get('summary'):
+            responses[property_id] = _no_insights_response("Insufficient data available for analysis.")
+        elif _worth_llm_call(ga_data) and not _is_high_traffic(ga_data):
+            grouped[property_id] = ga_data
+        else:
+            store(property_id, _call_openai_for_ga_insights(ga_data), ga_data)
+
+    pending = list(grouped.items())
+    for i in range(0, len(pending), GROUP_PROMPT_SIZE):
+        group = dict(pending[i:i + GROUP_PROMPT_SIZE])
+        current_app.logger.info(f"Generating GA insights for account {account_id}, properties {list(group)}")
+        for property_id, recommendations in _call_openai_for_ga_insights_group(group).items():
+            store(property_id, recommendations, group[property_id])
+
+    return responses
+
+
+def start_ga_insights_job(account_id: int, property_id: str, regenerate: bool = False) -> str:
+    """
+    Run generate_ga_insights() on a background thread, so the HTTP worker
+    isn't held for the OpenAI call.
+
+    Returns:
+        Job id to poll with get_ga_insights_job()
+    """
+    job_id = uuid.uuid4().hex
+    job = {"status": "pending", "account_id": account_id, "property_id": property_id}
+    _save_job(job_id, job)
+
+    app = current_app._get_current_object()
+
+    def run():
+        with app.app_context():
+            try:
+                result = generate_ga_insights(account_id, property_id, regenerate=regenerate)
+                _save_job(job_id, {**job, "status": "complete", "result": result})
+            except Exception as e:
+                current_app.logger.error(f"GA insights job {job_id} failed: {e}", exc_info=True)
+                _save_job(job_id, {**job, "status": "failed", "error": str(e)})
+
+    _JOB_POOL.submit(run)
+    return job_id
+
+
+def get_ga_insights_job(job_id: str, account_id: int) -> Optional[Dict]:
+    """
+    Current state of a job from start_ga_insights_job().
+
+    Returns:
+        Dict with "status" (pending, complete or failed) plus "result" (the
+        generate_ga_insights() response) or "error"; None if the job is
+        unknown, expired or belongs to another account
+    """
+    key = f"ga_insights_job:{job_id}"
+    state = None
+    r = getattr(current_app, 'redis', None)
+    if r is not None:
+        try:
+            state = r.get(key)
+        except Exception as e:
+            current_app.logger.warning(f"Redis unavailable for GA insight jobs: {e}")
+    if state is None:
+        with _jobs_lock:
+            entry = _jobs.get(key)
+        if entry is not None and entry[0] > time.time():
+            state = entry[1]
+
+    job = _json_loads(state) if state is not None else None
+    if not job or job.get('account_id') != account_id:
+        return None
+    return job
+
+
+def _save_job(job_id: str, job: Dict):
+    key = f"ga_insights_job:{job_id}"
+    state = _json_dumps(job)
+    r = getattr(current_app, 'redis', None)
+    if r is not None:
+        try:
+            r.setex(key, JOB_TTL, state)
+            return
+        except Exception as e:
+            current_app.logger.warning(f"Redis unavailable for GA insight jobs: {e}")
+
+    now = time.time()
+    with _jobs_lock:
+        for expired in [k for k, (expires_at, _) in _jobs.items() if expires_at <= now]:
+            del _jobs[expired]
+        _jobs[key] = (now + JOB_TTL, state)
+
+
+def _schedule_refresh(account_id: int, property_id: str):
+    """Regenerate a property's insights on a background thread, once at a time."""
+    key = (account_id, property_id)
+    with _refreshing_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+
+    app = current_app._get_current_object()
+
+    def refresh():
+        try:
+            with app.app_context():
+                generate_ga_insights(account_id, property_id, regenerate=True)
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(key)
+
+    current_app.logger.info(f"Refreshing stale GA insights for account {account_id}, property {property_id}")
+    _REFRESH_POOL.submit(refresh)
+
+
+def _persist_ga_recommendations(account_id: int, property_id: str, recommendations: Iterable[Dict],
+                                ga_data: Dict, supersede: bool = False) -> Counter:
+    """
+    Store generated recommendations for a property.
+
+    Rows are inserted in small batches as the iterable produces them, so a
+    streamed response is written while the rest is still generating; the
+    supersede and all inserts are committed once at the end.
+
+    Args:
+        account_id: The account ID
+        property_id: GA property ID
+        recommendations: Recommendation dicts from OpenAI (list or stream) or the fallback rules
+        ga_data: Performance data the recommendations were generated from
+        supersede: Mark the property's current open recommendations as superseded first
+
+    Returns:
+        Counter of stored recommendations by severity
+    """
+    now = datetime.utcnow()
+    traffic_multiplier = _traffic_multiplier(ga_data)
+    insert = OptimizerRecommendation.__table__.insert()
+    rows = []
+    by_severity = Counter()
+
+    def row(rec: Dict) -> Dict:
         return {
-            "summary": f"Error generating insights: {str(e)}",
-            "recommendations": [],
-            "stats": {"total": 0, "open": 0}
+            'account_id': account_id,
+            'source_type': 'google_analytics',
+            'source_id': property_id,
+            'category': rec.get('category', 'general'),
+            'title': rec.get('title', 'Untitled'),
+            'details': rec.get('description', ''),
+            'expected_impact': rec.get('expected_impact', 'Not specified'),
+            'confidence': _calculate_confidence_ga(rec, traffic_multiplier),
+            'severity': _severity(rec),
+            'data_points': _json_or_none(rec.get('data_points')),
+            'action_data': _json_or_none(rec.get('action')),
+            'status': 'open',
+            'created_at': now
         }
 
+    try:
+        # Mark old recommendations as superseded. A plain Core UPDATE skips
+        # the ORM's scan of the session for matching objects to synchronise.
+        # It commits together with the inserts, so readers keep seeing the
+        # old set until the new one is complete, and a failure restores it.
+        if supersede:
+            table = OptimizerRecommendation.__table__
+            db.session.execute(
+                table.update().where(
+                    table.c.account_id == account_id,
+                    table.c.source_type == 'google_analytics',
+                    table.c.source_id == property_id,
+                    table.c.status == 'open'
+                ).values(status='superseded')
+            )
+
+        # Multi-row INSERTs instead of a round-trip per recommendation
+        for rec in recommendations:
+            rows.append(row(rec))
+            by_severity[rows[-1]['severity']] += 1
+            if len(rows) >= _STORE_BATCH_SIZE:
+                db.session.execute(insert, rows)
+                rows = []
+        if rows:
+            db.session.execute(insert, rows)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    current_app.logger.info(f"Stored {sum(by_severity.values())} GA recommendations for account {account_id}")
+    return by_severity
+
+
+def _severity(rec: Dict) -> int:
+    """Model-supplied severity as an int (1-5), defaulting to 4."""
+    try:
+        return int(rec.get('severity', 4))
+    except (TypeError, ValueError):
+        return 4
+
 
-def _call_openai_for_ga_insights(ga_data: Dict) -> List[Dict]:
+def generate_ga_insights_batch(jobs: List[Tuple[int, str]]) -> Optional[OptimizerBatchJob]:
+    """
+    Queue insight generation for many properties through the OpenAI Batch API.
+
+    Meant for scheduled scans: batch requests cost half as much as online
+    ones but may take up to 24 hours. Interactive requests should keep using
+    generate_ga_insights(). Results are stored by poll_ga_insight_batches().
+
+    Args:
+        jobs: (account_id, property_id) pairs
+
+    Returns:
+        The persisted OptimizerBatchJob, or None if there was nothing to submit
+    """
+    lines = []
+    inputs = {}
+    for account_id, property_id in jobs:
+        ga_data = get_ga_performance_data(account_id, property_id, days=30)
+        if not ga_data or not ga_data.get('summary'):
+            continue
+        if not _worth_llm_call(ga_data):
+            _persist_ga_recommendations(
+                account_id, property_id, _get_fallback_ga_recommendations(ga_data), ga_data, supersede=True
+            )
+            continue
+
+        custom_id = f"{account_id}:{property_id}"
+        system_message, prompt, model, temperature, max_tokens, _ = _build_ga_prompt(ga_data)
+        lines.append({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": _ga_chat_request(system_message, prompt, model, temperature, max_tokens)
+        })
+        inputs[custom_id] = ga_data
+
+    if not lines:
+        return None
+
+    client = _get_openai_client()
+    payload = "\n".join(_json_dumps(line) for line in lines).encode('utf-8')
+    input_file = client.files.create(file=("ga_insights.jsonl", payload), purpose="batch")
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+
+    job = OptimizerBatchJob(
+        source_type='google_analytics',
+        batch_id=batch.id,
+        input_file_id=input_file.id,
+        status='submitted',
+        request_json=_json_dumps(inputs)
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    current_app.logger.info(f"Submitted GA insights batch {batch.id} ({len(lines)} properties)")
+    return job
+
+
+def poll_ga_insight_batches() -> int:
+    """
+    Check submitted GA batches and store the recommendations of finished ones.
+
+    Returns:
+        Number of batch jobs that reached a final status
+    """
+    jobs = OptimizerBatchJob.query.filter_by(source_type='google_analytics', status='submitted').all()
+    if not jobs:
+        return 0
+
+    client = _get_openai_client()
+    finished = 0
+
+    for job in jobs:
+        try:
+            batch = client.batches.retrieve(job.batch_id)
+            if batch.status not in _BATCH_FINAL_STATUSES:
+                continue
+
+            # Expired batches still return whatever completed in the window
+            if batch.output_file_id:
+                job.output_file_id = batch.output_file_id
+                _store_ga_batch_output(job, client.files.content(batch.output_file_id).text)
+
+            if batch.status != 'completed':
+                job.error = _json_dumps(batch.errors.model_dump()) if batch.errors else batch.status
+
+            job.status = batch.status
+            job.completed_at = datetime.utcnow()
+            db.session.commit()
+            finished += 1
+
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Error polling GA insights batch {job.batch_id}: {e}", exc_info=True)
+
+    return finished
+
+
+def _store_ga_batch_output(job: OptimizerBatchJob, output: str):
+    """
+    Route each Batch API output line back to its property by custom_id.
+
+    Lines that can't be routed (unparsable, no custom_id) are logged and
+    skipped; a routed line whose completion is unusable gets the rule-based
+    fallback. Each property's set supersedes the previous one, so storing
+    the same output again on a later poll doesn't duplicate rows.
+    """
+    inputs = _json_loads(job.request_json)
+
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        try:
+            item = _json_loads(line)
+            custom_id = item['custom_id']
+            response = item.get('response') or {}
+            account_id, property_id = custom_id.split(':', 1)
+            account_id = int(account_id)
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            current_app.logger.error(f"Skipping malformed GA batch output line in {job.batch_id}: {e}")
+            continue
+
+        if item.get('error') or response.get('status_code') != 200:
+            current_app.logger.warning(f"GA batch request {custom_id} failed: {item.get('error') or response}")
+            continue
+
+        ga_data = inputs.get(custom_id, {})
+        try:
+            content = response['body']['choices'][0]['message']['content']
+            recommendations = _parse_ga_recommendations(content)
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            current_app.logger.error(f"Failed to parse GA batch response for {custom_id}: {e}")
+            recommendations = _get_fallback_ga_recommendations(ga_data)
+
+        _persist_ga_recommendations(account_id, property_id, recommendations, ga_data, supersede=True)
+
+
+def _json_or_none(value) -> Optional[str]:
+    """
+    Serialise a JSON payload column, storing NULL for an empty one.
+
+    Readers already treat NULL as []/{}, so empty payloads skip both the
+    dump here and the parse when they are listed.
+    """
+    return _json_dumps(value) if value else None
+
+
+def _worth_llm_call(ga_data: Dict) -> bool:
+    """Whether the data has enough traffic and page detail to analyse with OpenAI."""
+    sessions = ga_data.get('summary', {}).get('sessions', 0) or 0
+    return sessions >= MIN_SESSIONS_FOR_LLM and bool(ga_data.get('top_pages'))
+
+
+def _call_openai_for_ga_insights(ga_data: Dict) -> Iterator[Dict]:
     """
     Call OpenAI to analyze GA data and generate recommendations.
 
+    The completion is streamed and each recommendation is yielded as soon as
+    it is complete, so callers can store it while the rest is generating.
+    If OpenAI fails before producing any recommendation, the rule-based
+    fallback recommendations are yielded instead.
+
     Args:
         ga_data: Performance data from GA4
 
+    Yields:
+        Recommendation dicts
+    """
+    if not _worth_llm_call(ga_data):
+        current_app.logger.info("GA data too thin for OpenAI analysis, using rule-based recommendations")
+        yield from _get_fallback_ga_recommendations(ga_data)
+        return
+
+    recommendations = []
+    try:
+        system_message, prompt, model, temperature, max_tokens, prompt_config = _build_ga_prompt(ga_data)
+
+        cache_key = _prompt_cache_key(ga_data, model, system_message, prompt_config)
+        cached = _get_cached_completion(cache_key)
+        if cached is not None:
+            current_app.logger.info("Using cached OpenAI completion for identical GA data")
+            yield from _json_loads(cached)
+            return
+
+        stream = _get_openai_client().chat.completions.create(
+            **_ga_chat_request(system_message, prompt, model, temperature, max_tokens),
+            stream=True
+        )
+
+        # Items of the response's "recommendations" array
+        parser = StreamedItemParser(container=('{', '['))
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            content = chunk.choices[0].delta.content
+            if content:
+                for rec in parser.feed(content):
+                    recommendations.append(rec)
+                    yield rec
+                # JSON mode can pad the finished object with whitespace up
+                # to max_tokens; stop paying for it once the object is closed
+                if parser.complete:
+                    stream.close()
+                    break
+
+        if not recommendations:
+            # A bare top-level array (older database prompts) isn't streamed
+            # item by item; parse the finished text like the batch path does
+            for rec in _parse_ga_recommendations(''.join(parser.chunks)):
+                recommendations.append(rec)
+                yield rec
+
+        # Only cache completions that parsed, so a malformed one is retried
+        _cache_completion(cache_key, _json_dumps(recommendations))
+
+    except Exception as e:
+        if recommendations:
+            # Part of the response is already with the caller; let it roll back
+            raise
+        if isinstance(e, ValueError):
+            current_app.logger.error(f"Unusable OpenAI response: {e}")
+        else:
+            current_app.logger.error(f"OpenAI API error: {e}", exc_info=True)
+        yield from _get_fallback_ga_recommendations(ga_data)
+
+
+def _is_high_traffic(ga_data: Dict) -> bool:
+    """Whether a property's 30-day sessions reach HIGH_SESSIONS_THRESHOLD per week."""
+    sessions = ga_data.get('summary', {}).get('sessions', 0) or 0
+    return sessions * 7 / 30 >= HIGH_SESSIONS_THRESHOLD
+
+
+def _call_openai_for_ga_insights_group(ga_data_by_property: Dict[str, Dict]) -> Dict[str, List[Dict]]:
+    """
+    Analyse several properties' GA data in one OpenAI call.
+
+    Always uses the built-in GROUP_SYSTEM_PROMPT, since the database prompt
+    template describes a single property. Properties missing from the
+    response, or all of them if the call fails, get the rule-based fallback
+    recommendations.
+
+    Args:
+        ga_data_by_property: Performance data keyed by property_id
+
     Returns:
-        List of recommendation dicts
+        Recommendation dicts keyed by property_id
     """
+    results = {}
     try:
-        import openai
-        from app.services.ai_prompts_init import get_prompt_for_service
+        prompt = "\n\n".join(
+            f"PROPERTY {property_id} (Last 30 Days):\n{_ga_data_block(ga_data)}"
+            for property_id, ga_data in ga_data_by_property.items()
+        )
+        response = _get_openai_client().chat.completions.create(
+            **_ga_chat_request(GROUP_SYSTEM_PROMPT, prompt, OPENAI_MODEL, 0.7,
+                               600 * len(ga_data_by_property))
+        )
+        data = _json_loads(response.choices[0].message.content)
+        if not isinstance(data, dict):
+            raise ValueError("OpenAI response is not a JSON object")
+        results = {
+            property_id: [rec for rec in recs if isinstance(rec, dict)]
+            for property_id, recs in data.items()
+            if property_id in ga_data_by_property and isinstance(recs, list)
+        }
+    except Exception as e:
+        current_app.logger.error(f"OpenAI API error for grouped GA insights: {e}", exc_info=True)
 
-        api_key = os.environ.get('OPENAI_API_KEY')
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY not configured")
+    for property_id, ga_data in ga_data_by_property.items():
+        if not results.get(property_id):
+            results[property_id] = _get_fallback_ga_recommendations(ga_data)
+    return results
 
-        openai.api_key = api_key
 
-        # Prepare data summary for AI
-        summary = ga_data.get('summary', {})
-        top_pages = ga_data.get('top_pages', [])[:10]
-        top_sources = ga_data.get('top_sources', [])[:10]
-        conversions = ga_data.get('conversions', [])[:5]
-
-        # Load prompt from database
-        prompt_config = get_prompt_for_service('google_analytics_main')
-
-        if not prompt_config:
-            current_app.logger.warning("Google Analytics prompt not found in database, using fallback")
-            # Fallback if database prompt not available
-            system_message = "You are a Google Analytics expert providing data-driven optimization recommendations in JSON format."
-            model = OPENAI_MODEL
-            temperature = 0.7
-            max_tokens = 2000
-
-            prompt = f"""Analyze GA4 data and provide 5-10 recommendations in JSON array format.
-Sessions: {summary.get('sessions', 0)}, Users: {summary.get('users', 0)}, Engagement: {summary.get('engagement_rate', 0):.2%}
-TOP PAGES: {json.dumps(top_pages, indent=2)}
-Return JSON array of recommendations."""
-        else:
-            # Use database prompt
-            system_message = prompt_config.get('system_message', '')
-            model = prompt_config.get('model', 'gpt-4o-mini')
-            temperature = prompt_config.get('temperature', 0.7)
-            max_tokens = prompt_config.get('max_tokens', 2000)
-
-            # Format the prompt template with actual data
-            prompt = prompt_config.get('prompt_template', '').format(
-                sessions=f"{summary.get('sessions', 0):,}",
-                users=f"{summary.get('users', 0):,}",
-                engagement_rate=f"{summary.get('engagement_rate', 0):.2%}",
-                avg_session_duration=f"{summary.get('avg_session_duration', 0):.1f}",
-                conversions=summary.get('conversions', 0),
-                conversion_rate=f"{summary.get('conversion_rate', 0):.2%}",
-                revenue=f"{summary.get('revenue', 0):,.2f}",
-                top_pages=json.dumps(top_pages, indent=2),
-                top_sources=json.dumps(top_sources, indent=2),
-                conversions_data=json.dumps(conversions, indent=2)
-            )
+def _get_openai_client() -> OpenAI:
+    """Return the shared OpenAI client, creating it on first use."""
+    global _openai_client
+
+    api_key = os.environ.get('OPENAI_API_KEY')
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY not configured")
+
+    client = _openai_client
+    if client is None or client.api_key != api_key:
+        with _openai_client_lock:
+            client = _openai_client
+            if client is None or client.api_key != api_key:
+                client = _openai_client = OpenAI(
+                    api_key=api_key, max_retries=OPENAI_MAX_RETRIES, timeout=Timeout(30.0, connect=5.0)
+                )
+    return client
+
+
+def close_openai_client() -> None:
+    """Close the shared OpenAI client's connections, e.g. on worker shutdown."""
+    global _openai_client
+
+    with _openai_client_lock:
+        if _openai_client is not None:
+            _openai_client.close()
+            _openai_client = None
 
-        response = openai.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=temperature,
-            max_tokens=max_tokens
+
+def _compact_value(value):
+    if isinstance(value, float):
+        return round(value, 3)
+    if isinstance(value, str):
+        return value[:_PROMPT_STR_MAX]
+    return value
+
+
+def _compact_json(rows: List[Dict]) -> str:
+    """
+    Serialise page/source rows for the prompt: compact separators, floats
+    rounded to 3 places and long strings (URLs, titles) truncated.
+    """
+    return _json_dumps([{k: _compact_value(v) for k, v in row.items()} for row in rows])
+
+
+def _build_ga_prompt(ga_data: Dict) -> tuple:
+    """
+    Build the chat prompt for one property's GA data.
+
+    Returns:
+        (system_message, prompt, model, temperature, max_tokens, prompt_config)
+    """
+    from app.services.ai_prompts_init import get_prompt_for_service
+
+    # Load prompt from database
+    prompt_config = get_prompt_for_service('google_analytics_main')
+
+    if not prompt_config:
+        current_app.logger.warning("Google Analytics prompt not found in database, using fallback")
+        # Fallback if database prompt not available
+        system_message = SYSTEM_PROMPT
+        model = OPENAI_MODEL
+        temperature = 0.7
+        max_tokens = 1200
+
+        prompt = f"PROPERTY PERFORMANCE (Last 30 Days):\n{_ga_data_block(ga_data)}"
+    else:
+        # Use database prompt
+        summary = ga_data.get('summary', {})
+        top_pages = _compact_json(ga_data.get('top_pages', [])[:10])
+        top_sources = _compact_json(ga_data.get('top_sources', [])[:10])
+        conversions = _compact_json(ga_data.get('conversions', [])[:5])
+
+        system_message = prompt_config.get('system_message', '')
+        model = prompt_config.get('model', 'gpt-4o-mini')
+        temperature = prompt_config.get('temperature', 0.7)
+        max_tokens = prompt_config.get('max_tokens', 2000)
+
+        # Format the prompt template with actual data
+        prompt = prompt_config.get('prompt_template', '').format(
+            sessions=f"{summary.get('sessions', 0):,}",
+            users=f"{summary.get('users', 0):,}",
+            engagement_rate=f"{summary.get('engagement_rate', 0):.2%}",
+            avg_session_duration=f"{summary.get('avg_session_duration', 0):.1f}",
+            conversions=summary.get('conversions', 0),
+            conversion_rate=f"{summary.get('conversion_rate', 0):.2%}",
+            revenue=f"{summary.get('revenue', 0):,.2f}",
+            top_pages=top_pages,
+            top_sources=top_sources,
+            conversions_data=conversions
         )
 
-        content = response.choices[0].message.content.strip()
+    return system_message, prompt, model, temperature, max_tokens, prompt_config
 
-        # Parse JSON response
-        if content.startswith('```json'):
-            content = content[7:]
-        if content.startswith('```'):
-            content = content[3:]
-        if content.endswith('```'):
-            content = content[:-3]
-        content = content.strip()
 
-        recommendations = json.loads(content)
+def _ga_data_block(ga_data: Dict) -> str:
+    """One property's data as sent to the built-in prompts."""
+    summary = ga_data.get('summary', {})
+    return f"""Sessions: {summary.get('sessions', 0)}, Users: {summary.get('users', 0)}, Engagement: {summary.get('engagement_rate', 0):.2%}, Conversion Rate: {summary.get('conversion_rate', 0):.2%}
+TOP PAGES: {_compact_json(ga_data.get('top_pages', [])[:10])}
+TOP TRAFFIC SOURCES: {_compact_json(ga_data.get('top_sources', [])[:10])}"""
 
-        if not isinstance(recommendations, list):
-            raise ValueError("OpenAI response is not a JSON array")
 
-        return recommendations
+def _ga_chat_request(system_message: str, prompt: str, model: str, temperature: float, max_tokens: int) -> Dict:
+    """Chat completion parameters, shared by online calls and Batch API lines."""
+    return {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        # JSON mode guarantees well-formed JSON; it must be an object, hence
+        # the {"recommendations": [...]} wrapper
+        "response_format": {"type": "json_object"}
+    }
 
-    except json.JSONDecodeError as e:
-        current_app.logger.error(f"Failed to parse OpenAI response as JSON: {e}")
-        return _get_fallback_ga_recommendations(ga_data)
-    except Exception as e:
-        current_app.logger.error(f"OpenAI API error: {e}", exc_info=True)
-        return _get_fallback_ga_recommendations(ga_data)
+
+def _parse_ga_recommendations(content: str) -> List[Dict]:
+    """
+    Pull the recommendations out of a whole completion.
+
+    Accepts a bare array as well as arrays directly inside a top-level
+    object, the same shapes the streaming path takes, since database
+    prompts seeded before JSON mode still ask for a JSON array.
+    """
+    data = _json_loads(content)
+    if isinstance(data, list):
+        arrays = [data]
+    elif isinstance(data, dict):
+        arrays = [value for value in data.values() if isinstance(value, list)]
+    else:
+        arrays = []
+
+    recommendations = [rec for array in arrays for rec in array if isinstance(rec, dict)]
+    if not recommendations:
+        raise ValueError("OpenAI response has no recommendations array")
+
+    return recommendations
+
+
+def _prompt_cache_key(ga_data: Dict, model: str, system_message: str, prompt_config: Optional[Dict]) -> str:
+    """
+    Hash everything that shapes the completion: the GA data actually sent,
+    the model, the prompt version and the (database-editable) prompt text.
+    """
+    payload = {
+        "m": model,
+        "v": PROMPT_VERSION,
+        "sys": system_message,
+        "tpl": (prompt_config or {}).get('prompt_template', ''),
+        "s": ga_data.get('summary', {}),
+        "p": ga_data.get('top_pages', [])[:10],
+        "src": ga_data.get('top_sources', [])[:10],
+        "c": ga_data.get('conversions', [])[:5],
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return "ga_insights:prompt:" + hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _get_cached_completion(key: str) -> Optional[str]:
+    r = getattr(current_app, 'redis', None)
+    if r is not None:
+        try:
+            return r.get(key)
+        except Exception as e:
+            current_app.logger.warning(f"Redis unavailable for GA prompt cache: {e}")
+
+    with _prompt_cache_lock:
+        entry = _prompt_cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.time():
+            del _prompt_cache[key]
+            return None
+        return entry[1]
+
+
+def _cache_completion(key: str, content: str):
+    r = getattr(current_app, 'redis', None)
+    if r is not None:
+        try:
+            r.setex(key, PROMPT_CACHE_TTL, content)
+            return
+        except Exception as e:
+            current_app.logger.warning(f"Redis unavailable for GA prompt cache: {e}")
+
+    with _prompt_cache_lock:
+        if len(_prompt_cache) >= _PROMPT_CACHE_MAX:
+            # Drop the entry closest to expiry
+            del _prompt_cache[min(_prompt_cache, key=lambda k: _prompt_cache[k][0])]
+        _prompt_cache[key] = (time.time() + PROMPT_CACHE_TTL, content)
 
 
 def _get_fallback_ga_recommendations(ga_data: Dict) -> List[Dict]:
@@ -288,26 +1022,29 @@ def _get_fallback_ga_recommendations(ga_data: Dict) -> List[Dict]:
     return recommendations
 
 
-def _calculate_confidence_ga(recommendation: Dict, ga_data: Dict) -> float:
+def _traffic_multiplier(ga_data: Dict) -> float:
+    """Confidence multiplier for a property's traffic volume; constant per property."""
+    sessions = ga_data.get('summary', {}).get('sessions', 0)
+    if sessions < 100:
+        return 0.5
+    elif sessions < 1000:
+        return 0.8
+    return 1.0
+
+
+def _calculate_confidence_ga(recommendation: Dict, traffic_multiplier: float) -> float:
     """
     Calculate confidence score for GA recommendation based on data quality.
 
     Args:
         recommendation: The recommendation dict
-        ga_data: Performance data
+        traffic_multiplier: _traffic_multiplier() of the property's data
 
     Returns:
         Confidence score (0.0 to 1.0)
     """
-    base_confidence = 0.75
-    summary = ga_data.get('summary', {})
-
     # Reduce confidence for low traffic
-    sessions = summary.get('sessions', 0)
-    if sessions < 100:
-        base_confidence *= 0.5
-    elif sessions < 1000:
-        base_confidence *= 0.8
+    base_confidence = 0.75 * traffic_multiplier
 
     # Reduce confidence for limited time range
     # (Assuming 30-day analysis in production)
@@ -320,23 +1057,79 @@ def _calculate_confidence_ga(recommendation: Dict, ga_data: Dict) -> float:
     return round(min(1.0, max(0.0, base_confidence)), 2)
 
 
-def _format_recommendations_response(account_id: int, property_id: str) -> Dict:
+def _open_recommendation_filters(account_id: int, property_id: str) -> tuple:
+    return (
+        OptimizerRecommendation.account_id == account_id,
+        OptimizerRecommendation.source_type == 'google_analytics',
+        OptimizerRecommendation.source_id == property_id,
+        OptimizerRecommendation.status == 'open'
+    )
+
+
+def _open_recommendation_rows(account_id: int, property_id: str, limit: Optional[int] = None) -> list:
+    """
+    A property's open recommendations, most severe first, as plain column
+    rows: no ORM instances or identity-map bookkeeping for a read-only
+    listing.
+    """
+    query = db.session.query(
+        OptimizerRecommendation.id,
+        OptimizerRecommendation.title,
+        OptimizerRecommendation.details,
+        OptimizerRecommendation.category,
+        OptimizerRecommendation.severity,
+        OptimizerRecommendation.expected_impact,
+        OptimizerRecommendation.confidence,
+        OptimizerRecommendation.data_points,
+        OptimizerRecommendation.action_data,
+        OptimizerRecommendation.created_at
+    ).filter(*_open_recommendation_filters(account_id, property_id)).order_by(
+        OptimizerRecommendation.severity.asc()
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
+
+
+def _format_recommendations_response(account_id: int, property_id: str, limit: int = RESPONSE_PAGE_SIZE,
+                                     by_severity: Optional[Dict[int, int]] = None,
+                                     rows: Optional[list] = None) -> Dict:
     """
     Format stored recommendations into response structure.
 
     Args:
         account_id: The account ID
         property_id: GA property ID
+        limit: Maximum number of recommendations to return
+        by_severity: Open recommendation counts per severity, when already
+            known (e.g. just stored); queried otherwise
+        rows: All open recommendation rows from _open_recommendation_rows(),
+            when already loaded; stats and listing then need no query
 
     Returns:
-        Formatted response dict
+        Formatted response dict; stats cover all open recommendations
     """
-    recs = OptimizerRecommendation.query.filter(
-        OptimizerRecommendation.account_id == account_id,
-        OptimizerRecommendation.source_type == 'google_analytics',
-        OptimizerRecommendation.source_id == property_id,
-        OptimizerRecommendation.status == 'open'
-    ).order_by(OptimizerRecommendation.severity.asc()).all()
+    # Counts per severity come from the database (or the rows at hand)
+    # rather than from scanning the formatted list once per counter
+    if rows is not None:
+        by_severity = Counter(row.severity for row in rows)
+    elif by_severity is None:
+        by_severity = dict(
+            db.session.query(OptimizerRecommendation.severity, func.count(OptimizerRecommendation.id))
+            .filter(*_open_recommendation_filters(account_id, property_id))
+            .group_by(OptimizerRecommendation.severity)
+            .all()
+        )
+    total = sum(by_severity.values())
+    critical = by_severity.get(1, 0)
+    high = by_severity.get(2, 0)
+
+    if rows is not None:
+        recs = rows[:limit]
+    elif total:
+        recs = _open_recommendation_rows(account_id, property_id, limit)
+    else:
+        recs = []
 
     recommendations = []
     for rec in recs:
@@ -348,33 +1141,29 @@ def _format_recommendations_response(account_id: int, property_id: str) -> Dict:
             "severity": rec.severity,
             "expected_impact": rec.expected_impact,
             "confidence": rec.confidence,
-            "data_points": json.loads(rec.data_points) if rec.data_points else [],
-            "action": json.loads(rec.action_data) if rec.action_data else {}
+            "data_points": _json_loads(rec.data_points) if rec.data_points else [],
+            "action": _json_loads(rec.action_data) if rec.action_data else {}
         })
 
     # Generate summary
-    if not recommendations:
+    if not total:
         summary = "No significant optimization opportunities found at this time. Your GA4 property is performing well."
+    elif critical > 0:
+        summary = f"Found {critical} critical issue(s) requiring immediate attention, plus {total - critical} additional optimization opportunities."
+    elif high > 0:
+        summary = f"Identified {high} high-impact opportunity/opportunities and {total - high} additional recommendations to improve your GA4 performance."
     else:
-        critical = len([r for r in recommendations if r['severity'] == 1])
-        high = len([r for r in recommendations if r['severity'] == 2])
-
-        if critical > 0:
-            summary = f"Found {critical} critical issue(s) requiring immediate attention, plus {len(recommendations) - critical} additional optimization opportunities."
-        elif high > 0:
-            summary = f"Identified {high} high-impact opportunity/opportunities and {len(recommendations) - high} additional recommendations to improve your GA4 performance."
-        else:
-            summary = f"Found {len(recommendations)} optimization opportunities to enhance your analytics performance."
+        summary = f"Found {total} optimization opportunities to enhance your analytics performance."
 
     return {
         "summary": summary,
         "recommendations": recommendations,
         "stats": {
-            "total": len(recommendations),
-            "open": len(recommendations),
-            "critical": len([r for r in recommendations if r['severity'] == 1]),
-            "high_impact": len([r for r in recommendations if r['severity'] == 2]),
-            "quick_wins": len([r for r in recommendations if r['severity'] == 3])
+            "total": total,
+            "open": total,
+            "critical": critical,
+            "high_impact": high,
+            "quick_wins": by_severity.get(3, 0)
         }
     }
 
@@ -412,6 +1201,66 @@ def get_ga_performance_data(account_id: int, property_id: str, days: int = 30) -
     }
 
 
+def _transition_recs(ids: List[int], status: str, user_id: int, notes: Optional[str] = None) -> List[int]:
+    """
+    Move open recommendations to ``status`` and record an action for each,
+    in one transaction.
+
+    A single ID needs only the UPDATE (its rowcount says whether it was
+    open). For several, the open ones are selected and locked first, since
+    MySQL has no UPDATE ... RETURNING. Actions are inserted with one
+    executemany.
+
+    Returns:
+        IDs that were open and have been transitioned
+    """
+    table = OptimizerRecommendation.__table__
+    try:
+        if len(ids) == 1:
+            result = db.session.execute(
+                table.update().where(table.c.id == ids[0], table.c.status == 'open').values(status=status)
+            )
+            open_ids = list(ids) if result.rowcount else []
+        else:
+            open_ids = db.session.execute(
+                select(table.c.id).where(table.c.id.in_(ids), table.c.status == 'open').with_for_update()
+            ).scalars().all()
+            if open_ids:
+                db.session.execute(table.update().where(table.c.id.in_(open_ids)).values(status=status))
+
+        if not open_ids:
+            db.session.rollback()
+            return []
+
+        now = datetime.utcnow()
+        db.session.execute(OptimizerAction.__table__.insert(), [
+            {
+                'recommendation_id': rec_id,
+                'applied_by': user_id,
+                'applied_at': now,
+                'action_type': status,
+                'notes': notes
+            }
+            for rec_id in open_ids
+        ])
+        db.session.commit()
+        return open_ids
+
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def _not_transitioned_message(recommendation_id: int) -> str:
+    status = db.session.query(OptimizerRecommendation.status).filter(
+        OptimizerRecommendation.id == recommendation_id
+    ).scalar()
+    db.session.rollback()
+    if status is None:
+        return "Recommendation not found"
+    return f"Recommendation is already {status}"
+
+
 def apply_ga_recommendation(recommendation_id: int, user_id: int) -> Tuple[bool, str]:
     """
     Mark a GA recommendation as applied.
@@ -424,27 +1273,8 @@ def apply_ga_recommendation(recommendation_id: int, user_id: int) -> Tuple[bool,
         (success, message) tuple
     """
     try:
-        rec = OptimizerRecommendation.query.get(recommendation_id)
-
-        if not rec:
-            return False, "Recommendation not found"
-
-        if rec.status != 'open':
-            return False, f"Recommendation is already {rec.status}"
-
-        # Update status
-        rec.status = 'applied'
-
-        # Record action
-        action = OptimizerAction(
-            recommendation_id=recommendation_id,
-            applied_by=user_id,
-            applied_at=datetime.utcnow(),
-            action_type='applied',
-            notes=None
-        )
-        db.session.add(action)
-        db.session.commit()
+        if not _transition_recs([recommendation_id], 'applied', user_id):
+            return False, _not_transitioned_message(recommendation_id)
 
         current_app.logger.info(f"GA recommendation {recommendation_id} applied by user {user_id}")
         return True, "Recommendation marked as applied"
@@ -468,27 +1298,8 @@ def dismiss_ga_recommendation(recommendation_id: int, user_id: int, reason: str
         (success, message) tuple
     """
     try:
-        rec = OptimizerRecommendation.query.get(recommendation_id)
-
-        if not rec:
-            return False, "Recommendation not found"
-
-        if rec.status != 'open':
-            return False, f"Recommendation is already {rec.status}"
-
-        # Update status
-        rec.status = 'dismissed'
-
-        # Record action
-        action = OptimizerAction(
-            recommendation_id=recommendation_id,
-            applied_by=user_id,
-            applied_at=datetime.utcnow(),
-            action_type='dismissed',
-            notes=reason
-        )
-        db.session.add(action)
-        db.session.commit()
+        if not _transition_recs([recommendation_id], 'dismissed', user_id, reason):
+            return False, _not_transitioned_message(recommendation_id)
 
         current_app.logger.info(f"GA recommendation {recommendation_id} dismissed by user {user_id}")
         return True, "Recommendation dismissed"
@@ -4,19 +4,53 @@ AI-powered optimization insights for Google Local Services Ads (GLSA).
 Uses OpenAI GPT models with database-stored prompts to generate recommendations.
 """
 
+import hashlib
 import json
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from flask import current_app
 from openai import OpenAI
 
 from app import db
-from app.models_ads import OptimizerRecommendation, OptimizerAction
+from app.models_ads import OptimizerRecommendation, OptimizerAction, OptimizerBatchJob
 
 # OpenAI Configuration
 OPENAI_API_KEY = None  # Set from env in generate_glsa_insights
 OPENAI_MODEL = "gpt-4o-mini"
 
+# Parsed recommendations are reused for a byte-identical request (same
+# profile data, prompt text and model settings) for a day, so regenerating
+# an unchanged profile skips OpenAI. Editing the database prompt changes the
+# request text, which retires old entries. Redis is shared by all workers;
+# the local dict is only a fallback.
+PROMPT_RESULT_TTL = 86400
+_PROMPT_RESULT_MAX = 256
+_prompt_results: Dict[str, tuple] = {}  # key -> (expires_at, recommendations json)
+_prompt_results_lock = threading.Lock()
+
+# Near-duplicate profiles: a regenerate after a trivial profile edit (one
+# more review, a tweaked budget) misses the exact-request cache above, so
+# each account's last few generations are also kept with an embedding of
+# the profile's signature and reused when a new signature is close enough
+EMBEDDING_MODEL = "text-embedding-3-small"
+SEMANTIC_MIN_SIMILARITY = 0.97
+_SEMANTIC_ENTRIES_PER_ACCOUNT = 5
+_semantic_results: Dict[int, tuple] = {}  # account_id -> (expires_at, entries json)
+# The embeddings endpoint accepts up to 2048 inputs per request
+_EMBEDDING_BATCH_SIZE = 2048
+
+# Concurrent accounts in bulk_generate_glsa_insights(); each chat completion
+# is seconds of network wait, so they overlap up to this bound (kept under
+# the OpenAI rate limits)
+BULK_CONCURRENCY = 10
+
+# Batch API statuses after which a job will not change again
+_BATCH_FINAL_STATUSES = ('completed', 'failed', 'expired', 'cancelled')
+
 
 def generate_glsa_insights(
     account_id: int,
@@ -29,7 +63,10 @@ def generate_glsa_insights(
     Args:
         account_id: The account ID
         profile_data: Profile data including categories, service areas, reviews, etc.
-        regenerate: If True, force regeneration even if recent insights exist
+        regenerate: If True, force regeneration even if recent insights exist.
+            As in the FB Ads and GA services, the OpenAI result is still
+            reused for an identical prompt, or for a profile at least
+            SEMANTIC_MIN_SIMILARITY similar to one of the account's recent ones
 
     Returns:
         Dict with summary and recommendations
@@ -53,7 +90,7 @@ def generate_glsa_insights(
 
     try:
         # Get AI recommendations from OpenAI
-        recommendations = _call_openai_for_glsa_insights(profile_data)
+        recommendations = _call_openai_for_glsa_insights(profile_data, account_id)
 
         # Store recommendations in database
         _store_recommendations(account_id, recommendations, profile_data)
@@ -71,16 +108,255 @@ def generate_glsa_insights(
         }
 
 
-def _call_openai_for_glsa_insights(profile_data: Dict) -> List[Dict]:
+def bulk_generate_glsa_insights(account_profiles: Dict[int, Dict],
+                                max_workers: int = BULK_CONCURRENCY) -> Dict[int, Dict]:
+    """
+    Regenerate insights for many accounts, e.g. from a scheduled job.
+
+    All profile signatures are embedded up front in one request, so the
+    similarity cache costs one embeddings round-trip for the whole run;
+    only accounts without a cached or near-identical result reach the chat
+    completion. Accounts then run up to ``max_workers`` at a time, each on
+    its own thread and app context (and so its own DB session), so the run
+    takes about as long as the slowest few accounts rather than the sum.
+
+    Args:
+        account_profiles: Profile data keyed by account ID
+        max_workers: Maximum concurrent accounts
+
+    Returns:
+        Dict mapping account ID to that account's response
+    """
+    if not account_profiles:
+        return {}
+
+    api_key = current_app.config.get('OPENAI_API_KEY')
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY not configured")
+
+    account_ids = list(account_profiles)
+    embeddings = _embed_profiles_batch(OpenAI(api_key=api_key), [account_profiles[a] for a in account_ids])
+
+    app = current_app._get_current_object()
+
+    def run(account_id: int, embedding: Optional[List[float]]) -> Dict:
+        profile_data = account_profiles[account_id]
+        with app.app_context():
+            try:
+                recommendations = _call_openai_for_glsa_insights(profile_data, account_id, embedding)
+                _store_recommendations(account_id, recommendations, profile_data)
+                return _format_recommendations_response(account_id)
+            except Exception as e:
+                current_app.logger.exception(f"Error generating GLSA insights for account {account_id}: {e}")
+                return {
+                    "ok": False,
+                    "error": str(e),
+                    "summary": "Failed to generate insights. Please try again.",
+                    "recommendations": []
+                }
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(account_ids)), thread_name_prefix="glsa-insights") as pool:
+        return dict(zip(account_ids, pool.map(run, account_ids, embeddings)))
+
+
+def submit_glsa_insights_batch(account_profiles: Dict[int, Dict]) -> Optional[OptimizerBatchJob]:
+    """
+    Queue insight regeneration for many accounts through the OpenAI Batch API.
+
+    Batch requests are billed at half the online price and don't count
+    against the online rate limits, at the cost of up to 24h turnaround, so
+    this is meant for nightly refreshes rather than interactive requests.
+    Results are stored by poll_glsa_insight_batches().
+
+    Args:
+        account_profiles: Profile data keyed by account ID
+
+    Returns:
+        The persisted OptimizerBatchJob, or None if there was nothing to submit
+    """
+    if not account_profiles:
+        return None
+
+    api_key = current_app.config.get('OPENAI_API_KEY')
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY not configured")
+    client = OpenAI(api_key=api_key)
+
+    lines = [
+        json.dumps({
+            "custom_id": f"acct-{account_id}",
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": _glsa_chat_request(*_build_glsa_prompt(profile_data))
+        })
+        for account_id, profile_data in account_profiles.items()
+    ]
+    input_file = client.files.create(file=("glsa_insights.jsonl", "\n".join(lines).encode('utf-8')), purpose="batch")
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+
+    job = OptimizerBatchJob(
+        source_type='glsa',
+        batch_id=batch.id,
+        input_file_id=input_file.id,
+        status='submitted',
+        request_json=json.dumps({str(account_id): p for account_id, p in account_profiles.items()})
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    current_app.logger.info(f"Submitted GLSA insights batch {batch.id} ({len(lines)} accounts)")
+    return job
+
+
+def poll_glsa_insight_batches() -> int:
+    """
+    Check submitted GLSA batches and store the recommendations of finished ones.
+
+    Returns:
+        Number of batch jobs that reached a final status
+    """
+    jobs = OptimizerBatchJob.query.filter_by(source_type='glsa', status='submitted').all()
+    if not jobs:
+        return 0
+
+    api_key = current_app.config.get('OPENAI_API_KEY')
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY not configured")
+    client = OpenAI(api_key=api_key)
+    finished = 0
+
+    for job in jobs:
+        try:
+            batch = client.batches.retrieve(job.batch_id)
+            if batch.status not in _BATCH_FINAL_STATUSES:
+                continue
+
+            # Expired batches still return whatever completed in the window
+            if batch.output_file_id:
+                job.output_file_id = batch.output_file_id
+                _store_batch_output(job, client.files.content(batch.output_file_id).text)
+
+            if batch.status != 'completed':
+                job.error = json.dumps(batch.errors.model_dump()) if batch.errors else batch.status
+
+            # Stored recommendations and the final status commit together
+            job.status = batch.status
+            job.completed_at = datetime.utcnow()
+            db.session.commit()
+            finished += 1
+
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.exception(f"Error polling GLSA insights batch {job.batch_id}: {e}")
+
+    return finished
+
+
+def _store_batch_output(job: OptimizerBatchJob, output: str):
+    """
+    Route each Batch API output line back to its account by custom_id.
+
+    Malformed or failed lines are logged and skipped. Nothing is committed
+    here: the caller commits every account's rows together with the job's
+    final status, so a failure can't leave some accounts stored while the
+    job is polled (and stored) again.
+    """
+    profiles = json.loads(job.request_json)
+
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+            custom_id = item['custom_id']
+            response = item.get('response') or {}
+
+            if item.get('error') or response.get('status_code') != 200:
+                current_app.logger.warning(f"GLSA batch request {custom_id} failed: {item.get('error') or response}")
+                continue
+
+            account_id = int(custom_id.split('-', 1)[1])
+            content = response['body']['choices'][0]['message']['content']
+            recommendations = [
+                rec for rec in _extract_recommendations(json.loads(content)) if isinstance(rec, dict)
+            ]
+        except (ValueError, KeyError, IndexError, TypeError, AttributeError) as e:
+            current_app.logger.error(f"Skipping malformed GLSA batch output line in {job.batch_id}: {e}")
+            continue
+
+        if recommendations:
+            _store_recommendations(account_id, recommendations, profiles.get(str(account_id), {}), commit=False)
+
+
+def _call_openai_for_glsa_insights(profile_data: Dict, account_id: Optional[int] = None,
+                                   embedding: Optional[List[float]] = None) -> List[Dict]:
     """
     Call OpenAI API to generate GLSA optimization insights using database-stored prompts.
 
     Args:
         profile_data: Profile data to analyze
+        account_id: The account ID; enables reuse of the account's recent
+            recommendations for a near-identical profile
+        embedding: The profile's signature embedding, if already computed
+            (see bulk_generate_glsa_insights())
 
     Returns:
         List of recommendation dictionaries
     """
+    system_message, user_prompt, model, temperature, max_tokens = _build_glsa_prompt(profile_data)
+
+    cache_key = _prompt_result_key(model, temperature, max_tokens, system_message, user_prompt)
+    cached = _get_prompt_result(cache_key)
+    if cached is not None:
+        current_app.logger.info("Using cached OpenAI recommendations for identical GLSA profile")
+        return cached
+
+    # Get API key from environment
+    api_key = current_app.config.get('OPENAI_API_KEY')
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY not configured")
+
+    # Call OpenAI
+    client = OpenAI(api_key=api_key)
+
+    if account_id is not None:
+        embedding = embedding or _embed_profile(client, profile_data)
+        similar = _find_similar_result(account_id, embedding) if embedding else None
+        if similar is not None:
+            current_app.logger.info(f"Using OpenAI recommendations for a near-identical GLSA profile, account {account_id}")
+            return similar
+
+    try:
+        response = client.chat.completions.create(
+            **_glsa_chat_request(system_message, user_prompt, model, temperature, max_tokens)
+        )
+
+        content = response.choices[0].message.content
+        recommendations = _extract_recommendations(json.loads(content))
+
+        if recommendations:
+            _save_prompt_result(cache_key, recommendations)
+            if embedding:
+                _save_similar_result(account_id, embedding, recommendations)
+        return recommendations
+
+    except Exception as e:
+        current_app.logger.exception(f"OpenAI API error: {e}")
+        raise
+
+
+def _build_glsa_prompt(profile_data: Dict) -> tuple:
+    """
+    Build the chat prompt for a profile from the database prompt (or the
+    built-in fallback).
+
+    Returns:
+        (system_message, user_prompt, model, temperature, max_tokens)
+    """
     from app.services.ai_prompts_init import get_prompt_for_service
 
     # Load prompt from database
@@ -159,46 +435,179 @@ Return ONLY valid JSON array of recommendations with these fields:
             lead_goal=lead_goal
         )
 
-    # Get API key from environment
-    api_key = current_app.config.get('OPENAI_API_KEY')
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY not configured")
+    return system_message, user_prompt, model, temperature, max_tokens
 
-    # Call OpenAI
-    client = OpenAI(api_key=api_key)
 
-    try:
-        response = client.chat.completions.create(
-            model=model,
-            temperature=temperature,
-            max_tokens=max_tokens,
-            response_format={"type": "json_object"},
-            messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": user_prompt}
-            ]
-        )
+def _glsa_chat_request(system_message: str, user_prompt: str, model: str, temperature: float,
+                       max_tokens: int) -> Dict:
+    """Chat completion parameters, shared by online calls and Batch API lines."""
+    return {
+        "model": model,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "response_format": {"type": "json_object"},
+        "messages": [
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": user_prompt}
+        ]
+    }
 
-        content = response.choices[0].message.content
-        result = json.loads(content)
 
-        # Extract recommendations array
-        if isinstance(result, dict) and 'recommendations' in result:
-            recommendations = result['recommendations']
-        elif isinstance(result, list):
-            recommendations = result
-        else:
-            current_app.logger.warning(f"Unexpected OpenAI response format: {result}")
-            recommendations = []
+def _extract_recommendations(result) -> List[Dict]:
+    """Pull the recommendations array out of a parsed OpenAI response."""
+    if isinstance(result, dict) and 'recommendations' in result:
+        return result['recommendations']
+    elif isinstance(result, list):
+        return result
+    current_app.logger.warning(f"Unexpected OpenAI response format: {result}")
+    return []
+
+
+def _prompt_result_key(model: str, temperature: float, max_tokens: int, system_message: str, user_prompt: str) -> str:
+    payload = json.dumps([model, temperature, max_tokens, system_message, user_prompt])
+    return "glsa_rec:" + hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _get_prompt_result(key: str) -> Optional[List[Dict]]:
+    r = getattr(current_app, 'redis', None)
+    if r is not None:
+        try:
+            cached = r.get(key)
+            return json.loads(cached) if cached else None
+        except Exception as e:
+            current_app.logger.warning(f"Redis unavailable for GLSA prompt cache: {e}")
+
+    with _prompt_results_lock:
+        entry = _prompt_results.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.time():
+            del _prompt_results[key]
+            return None
+        return json.loads(entry[1])
+
+
+def _save_prompt_result(key: str, recommendations: List[Dict]):
+    content = json.dumps(recommendations)
+    r = getattr(current_app, 'redis', None)
+    if r is not None:
+        try:
+            r.setex(key, PROMPT_RESULT_TTL, content)
+            return
+        except Exception as e:
+            current_app.logger.warning(f"Redis unavailable for GLSA prompt cache: {e}")
+
+    with _prompt_results_lock:
+        if len(_prompt_results) >= _PROMPT_RESULT_MAX:
+            # Drop the entry closest to expiry
+            del _prompt_results[min(_prompt_results, key=lambda k: _prompt_results[k][0])]
+        _prompt_results[key] = (time.time() + PROMPT_RESULT_TTL, content)
+
+
+def _profile_signature(profile_data: Dict) -> str:
+    """
+    Canonical text of the profile fields that shape recommendations, with
+    counts and amounts bucketed so noise (one more review, a few dollars of
+    budget) barely moves the embedding.
+    """
+    answers = profile_data.get('answers', {})
+    reviews_count = profile_data.get('reviews_count', 0) or 0
+    weekly_budget = profile_data.get('weekly_budget', 0) or 0
+    return "\n".join((
+        f"category: {profile_data.get('primary_category', '')}",
+        f"categories: {', '.join(sorted(profile_data.get('categories', [])))}",
+        f"service areas: {', '.join(sorted(profile_data.get('service_areas', [])))}",
+        f"rating: {round(profile_data.get('rating', 0) or 0, 1)}",
+        f"reviews: {'50+' if reviews_count >= 50 else '20-49' if reviews_count >= 20 else 'under 20'}",
+        f"weekly budget: {round(weekly_budget, -2):.0f}",
+        *(f"{k}: {answers.get(k, '')}" for k in ('priorities', 'priority_areas', 'response_time',
+                                                  'after_hours', 'lead_goal')),
+    ))
 
-        return recommendations
 
-    except Exception as e:
-        current_app.logger.exception(f"OpenAI API error: {e}")
-        raise
+def _embed_profile(client: OpenAI, profile_data: Dict) -> Optional[List[float]]:
+    return _embed_profiles_batch(client, [profile_data])[0]
 
 
-def _store_recommendations(account_id: int, recommendations: List[Dict], profile_data: Dict):
+def _embed_profiles_batch(client: OpenAI, profiles: List[Dict]) -> List[Optional[List[float]]]:
+    """
+    Embed many profiles' signatures with one embeddings request per
+    _EMBEDDING_BATCH_SIZE profiles, instead of a round-trip each.
+
+    Returns:
+        One embedding per profile, in order; None where embedding failed
+    """
+    embeddings = []
+    for i in range(0, len(profiles), _EMBEDDING_BATCH_SIZE):
+        batch = profiles[i:i + _EMBEDDING_BATCH_SIZE]
+        try:
+            response = client.embeddings.create(
+                model=EMBEDDING_MODEL, input=[_profile_signature(p) for p in batch]
+            )
+            # Results carry their input index; don't rely on response order
+            batch_embeddings = [None] * len(batch)
+            for item in response.data:
+                batch_embeddings[item.index] = item.embedding
+            embeddings.extend(batch_embeddings)
+        except Exception as e:
+            current_app.logger.warning(f"GLSA profile embedding failed, skipping similarity cache: {e}")
+            embeddings.extend([None] * len(batch))
+    return embeddings
+
+
+def _cosine_similarity(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def _get_similar_entries(account_id: int) -> List[Dict]:
+    r = getattr(current_app, 'redis', None)
+    if r is not None:
+        try:
+            cached = r.get(f"glsa_sem:{account_id}")
+            return json.loads(cached) if cached else []
+        except Exception as e:
+            current_app.logger.warning(f"Redis unavailable for GLSA similarity cache: {e}")
+
+    with _prompt_results_lock:
+        entry = _semantic_results.get(account_id)
+        if entry is None or entry[0] <= time.time():
+            return []
+        return json.loads(entry[1])
+
+
+def _find_similar_result(account_id: int, embedding: List[float]) -> Optional[List[Dict]]:
+    """The account's recent recommendations for the most similar profile, if similar enough."""
+    best, best_similarity = None, SEMANTIC_MIN_SIMILARITY
+    for entry in _get_similar_entries(account_id):
+        similarity = _cosine_similarity(embedding, entry['embedding'])
+        if similarity >= best_similarity:
+            best, best_similarity = entry['recommendations'], similarity
+    return best
+
+
+def _save_similar_result(account_id: int, embedding: List[float], recommendations: List[Dict]):
+    entries = _get_similar_entries(account_id)
+    entries = [{"embedding": embedding, "recommendations": recommendations}] + entries
+    content = json.dumps(entries[:_SEMANTIC_ENTRIES_PER_ACCOUNT])
+
+    r = getattr(current_app, 'redis', None)
+    if r is not None:
+        try:
+            r.setex(f"glsa_sem:{account_id}", PROMPT_RESULT_TTL, content)
+            return
+        except Exception as e:
+            current_app.logger.warning(f"Redis unavailable for GLSA similarity cache: {e}")
+
+    with _prompt_results_lock:
+        if account_id not in _semantic_results and len(_semantic_results) >= _PROMPT_RESULT_MAX:
+            del _semantic_results[min(_semantic_results, key=lambda k: _semantic_results[k][0])]
+        _semantic_results[account_id] = (time.time() + PROMPT_RESULT_TTL, content)
+
+
+def _store_recommendations(account_id: int, recommendations: List[Dict], profile_data: Dict,
+                           commit: bool = True):
     """
     Store recommendations in the database.
 
@@ -206,6 +615,8 @@ def _store_recommendations(account_id: int, recommendations: List[Dict], profile
         account_id: The account ID
         recommendations: List of recommendation dicts from OpenAI
         profile_data: Original profile data for context
+        commit: Commit now; False leaves the rows in the session for the
+            caller's transaction
     """
     # Calculate confidence based on data completeness
     confidence = _calculate_confidence(profile_data)
@@ -220,7 +631,7 @@ def _store_recommendations(account_id: int, recommendations: List[Dict], profile
             source_type='glsa',
             source_id=str(source_id),
             title=rec.get('title', 'Untitled Recommendation'),
-            description=rec.get('description', ''),
+            details=rec.get('description', ''),
             category=rec.get('category', 'profile'),
             severity=rec.get('severity', 3),
             expected_impact=rec.get('expected_impact', ''),
@@ -233,6 +644,9 @@ def _store_recommendations(account_id: int, recommendations: List[Dict], profile
 
         db.session.add(recommendation)
 
+    if not commit:
+        return
+
     try:
         db.session.commit()
         current_app.logger.info(f"Stored {len(recommendations)} GLSA recommendations for account {account_id}")
@@ -308,7 +722,7 @@ def _format_recommendations_response(account_id: int) -> Dict:
         formatted_recs.append({
             'id': rec.id,
             'title': rec.title,
-            'description': rec.description,
+            'description': rec.details,
             'category': rec.category,
             'severity': rec.severity,
             'expected_impact': rec.expected_impact,
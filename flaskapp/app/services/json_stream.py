@@ -0,0 +1,72 @@
+# app/services/json_stream.py
+"""
+Incremental parsing of streamed JSON-mode OpenAI completions.
+
+Lets insight services act on each recommendation as soon as its closing
+brace arrives instead of waiting for (and holding) the whole response.
+"""
+
+import json
+from typing import Iterator, List, Optional, Tuple
+
+# orjson parses each item faster when available
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+
+class StreamedItemParser:
+    """
+    Pull complete objects out of a JSON document as it streams in.
+
+    ``container`` is the bracket path to the array holding the items:
+    ('{', '[') for arrays inside a top-level object, e.g.
+    {"recommendations": [{...}, {...}]}, or ('[',) for a bare top-level array.
+    Text outside the JSON (such as a markdown fence) is ignored.
+    """
+
+    def __init__(self, container: Tuple[str, ...] = ('{', '[')):
+        self.chunks: List[str] = []  # full response text, for logging
+        self._container = list(container)
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escaped = False
+        self._item: Optional[List[str]] = None
+        self._started = False
+
+    @property
+    def complete(self) -> bool:
+        """Whether the top-level JSON value has been closed."""
+        return self._started and not self._stack
+
+    def feed(self, chunk: str) -> Iterator[dict]:
+        self.chunks.append(chunk)
+        for ch in chunk:
+            if self._item is not None:
+                self._item.append(ch)
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == '\\':
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in '{[':
+                # An object directly inside the item array
+                if ch == '{' and self._stack == self._container:
+                    self._item = [ch]
+                self._stack.append(ch)
+                self._started = True
+            elif ch in '}]' and self._stack:
+                self._stack.pop()
+                if ch == '}' and self._item is not None and self._stack == self._container:
+                    item = _json_loads(''.join(self._item))
+                    self._item = None
+                    if isinstance(item, dict):
+                        yield item
@@ -288,6 +288,9 @@ def get_trend_data(
             try:
                 metrics_dict = json.loads(m.metrics_json)
                 value = metrics_dict.get(metric_name)
+                # Some sources store cost in micros only
+                if value is None and metric_name == 'cost' and 'cost_micros' in metrics_dict:
+                    value = metrics_dict['cost_micros'] / 1_000_000
             except (json.JSONDecodeError, AttributeError):
                 value = None
 
@@ -0,0 +1,26 @@
+import pytest
+
+from app.services.baseline_import import _coerce_metric
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("5", 5),
+    (" 5", 5),
+    ("5 ", 5),
+    ("+5", 5),
+    ("-5", -5),
+    ("250.50", 250.5),
+    (" -0.5 ", -0.5),
+    (".5", 0.5),
+    ("1e3", 1000.0),
+    ("", ""),
+    ("  ", "  "),
+    (None, None),
+    ("2024-01-01", "2024-01-01"),
+    ("abc", "abc"),
+    ("5 5", "5 5"),
+])
+def test_coerce_metric(value, expected):
+    result = _coerce_metric(value)
+    assert result == expected
+    assert type(result) is type(expected)
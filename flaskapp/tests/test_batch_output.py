@@ -0,0 +1,99 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask
+
+from app.services import fbads_insights, ga_insights, glsa_insights
+
+
+@pytest.fixture
+def app_ctx():
+    app = Flask(__name__)
+    with app.app_context():
+        yield app
+
+
+def _ok_line(custom_id, content):
+    return json.dumps({
+        "custom_id": custom_id,
+        "response": {"status_code": 200, "body": {"choices": [{"message": {"content": content}}]}},
+    })
+
+
+def test_glsa_batch_output_skips_bad_lines_and_defers_commit(app_ctx, monkeypatch):
+    stored = []
+    monkeypatch.setattr(
+        glsa_insights, "_store_recommendations",
+        lambda account_id, recs, profile, commit=True: stored.append((account_id, [r["title"] for r in recs], profile, commit)),
+    )
+    job = SimpleNamespace(batch_id="batch-1", request_json=json.dumps({"1": {"customer_id": "c1"}, "3": {}}))
+    output = "\n".join([
+        _ok_line("acct-1", '{"recommendations": [{"title": "A"}]}'),
+        _ok_line("acct-2", '{"recommendations": [{"title": "trunc'),   # truncated content
+        '{"custom_id": "acct-4", "response": {"status_code": 200',       # truncated line
+        json.dumps({"custom_id": "acct-5", "response": {"status_code": 200, "body": {}}}),
+        json.dumps({"custom_id": "acct-6", "error": {"message": "boom"}}),
+        "",
+        _ok_line("acct-3", '{"recommendations": [{"title": "B"}, "junk"]}'),
+    ])
+
+    glsa_insights._store_batch_output(job, output)
+
+    assert stored == [
+        (1, ["A"], {"customer_id": "c1"}, False),
+        (3, ["B"], {}, False),
+    ]
+
+
+def test_fbads_batch_output_skips_bad_lines_and_defers_commit(app_ctx, monkeypatch):
+    stored = []
+    monkeypatch.setattr(
+        fbads_insights, "_store_recommendations",
+        lambda account_id, recs, profile, campaigns, commit=True: stored.append(
+            (account_id, [r["title"] for r in recs], profile, campaigns, commit)
+        ),
+    )
+    job = SimpleNamespace(batch_id="batch-2", request_json=json.dumps({
+        "1": {"profile_data": {"page_id": "p1"}, "campaign_data": {"c": 1}},
+    }))
+    output = "\n".join([
+        _ok_line("acct-1-profile", '{"recommendations": [{"title": "A"}]}'),
+        _ok_line("acct-1-campaigns", '[{"title": "B"}, 7]'),
+        _ok_line("acct-2-profile", '{"recommendations": [{"title": "trunc'),
+        "not json at all",
+        json.dumps({"custom_id": "acct-3-profile", "response": {"status_code": 200, "body": {"choices": []}}}),
+        json.dumps({"custom_id": "acct-4-profile", "response": {"status_code": 500, "body": {}}}),
+        _ok_line("acct-x-profile", '{"recommendations": [{"title": "C"}]}'),
+    ])
+
+    assert fbads_insights._store_batch_output(job, output) == [1]
+    assert stored == [(1, ["A", "B"], {"page_id": "p1"}, {"c": 1}, False)]
+
+
+def test_ga_batch_output_skips_bad_lines_and_falls_back(app_ctx, monkeypatch):
+    stored = []
+    monkeypatch.setattr(
+        ga_insights, "_persist_ga_recommendations",
+        lambda account_id, property_id, recs, ga_data, supersede=False: stored.append(
+            (account_id, property_id, [r["title"] for r in recs], supersede)
+        ),
+    )
+    monkeypatch.setattr(ga_insights, "_get_fallback_ga_recommendations", lambda ga_data: [{"title": "fallback"}])
+    job = SimpleNamespace(batch_id="batch-3", request_json=json.dumps({"1:p1": {}, "2:p2": {}, "3:p3": {}}))
+    output = "\n".join([
+        _ok_line("1:p1", '{"recommendations": [{"title": "A"}]}'),
+        _ok_line("2:p2", '{"recommendations": [{"title": "trunc'),
+        json.dumps({"custom_id": "3:p3", "response": {"status_code": 200, "body": {}}}),
+        '{"custom_id": "4:p4", "resp',
+        json.dumps({"custom_id": "no-colon", "response": {"status_code": 200}}),
+        json.dumps({"custom_id": "5:p5", "error": {"message": "boom"}}),
+    ])
+
+    ga_insights._store_ga_batch_output(job, output)
+
+    assert stored == [
+        (1, "p1", ["A"], True),
+        (2, "p2", ["fallback"], True),
+        (3, "p3", ["fallback"], True),
+    ]
@@ -0,0 +1,183 @@
+import smtplib
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask, current_app
+
+from app.services import email_service
+from app.services.email_service import AIMDLimiter
+
+
+@pytest.fixture
+def app_ctx(monkeypatch):
+    app = Flask(__name__)
+    app.config.update(TESTING=True, EMAIL_PROVIDER_CHAIN="sendgrid,smtp")
+    monkeypatch.setattr(email_service, "_local_sent_keys", {})
+    monkeypatch.setattr(email_service, "_provider_down_until", {})
+    monkeypatch.setattr(email_service.time, "sleep", lambda seconds: None)
+    with app.app_context():
+        yield email_service.get_email_config()
+
+
+def test_aimd_grows_on_success_and_halves_on_overload():
+    limiter = AIMDLimiter(maximum=4)
+    for _ in range(10):
+        with limiter.slot():
+            pass
+    assert limiter.limit == 4
+
+    with pytest.raises(smtplib.SMTPServerDisconnected):
+        with limiter.slot():
+            raise smtplib.SMTPServerDisconnected()
+    assert limiter.limit == 2
+
+    with pytest.raises(ValueError):
+        with limiter.slot():
+            raise ValueError("bad template data")
+    assert limiter.limit == 2
+
+
+def test_aimd_never_drops_below_minimum():
+    limiter = AIMDLimiter(maximum=4, initial=1.0)
+    for _ in range(3):
+        with pytest.raises(OSError):
+            with limiter.slot():
+                raise OSError()
+    assert limiter.limit == 1.0
+
+
+def test_aimd_caps_concurrent_slots():
+    limiter = AIMDLimiter(maximum=2, initial=2.0, increase=0)
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def send():
+        with limiter.slot():
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.01)
+            with lock:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=send) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert peak[0] == 2
+
+
+@pytest.mark.parametrize("error, transient", [
+    (OSError("reset"), True),
+    (smtplib.SMTPServerDisconnected(), True),
+    (smtplib.SMTPResponseException(421, b"busy"), True),
+    (smtplib.SMTPResponseException(550, b"no such user"), False),
+    (smtplib.SMTPAuthenticationError(535, b"bad login"), False),
+    (smtplib.SMTPRecipientsRefused({"a@x": (550, b"no")}), False),
+    (SimpleNamespace(status_code=429), True),
+    (SimpleNamespace(status_code=503), True),
+    (SimpleNamespace(status_code=400), False),
+    (ValueError("bad"), False),
+])
+def test_overload_classification(error, transient):
+    assert email_service._is_overload_error(error) is transient
+
+
+def test_claim_is_exclusive_until_released(app_ctx):
+    digest = email_service._idempotency_digest("a@x", "invite:1")
+
+    assert digest == email_service._idempotency_digest("a@x", "invite:1")
+    assert digest != email_service._idempotency_digest("b@x", "invite:1")
+    assert email_service._claim_send(digest)
+    assert not email_service._claim_send(digest)
+
+    email_service._release_send(digest)
+    assert email_service._claim_send(digest)
+
+
+def test_expired_claim_can_be_taken_again(app_ctx, monkeypatch):
+    digest = email_service._idempotency_digest("a@x", "welcome:1")
+    assert email_service._claim_send(digest)
+
+    monkeypatch.setattr(email_service.time, "time", lambda: 10 ** 12)
+    assert email_service._claim_send(digest)
+
+
+def test_deliver_sends_a_key_once(app_ctx, monkeypatch):
+    sent = []
+    monkeypatch.setattr(email_service, "_send_via_sendgrid", lambda to, *args: sent.append(to) or True)
+
+    for _ in range(2):
+        assert email_service._deliver("a@x", "s", "<p>hi</p>", None, None, app_ctx, idempotency_key="k")
+    assert sent == ["a@x"]
+
+
+def test_failed_delivery_releases_its_key(app_ctx, monkeypatch):
+    results = iter([False, True])
+    monkeypatch.setattr(email_service, "_send_via_sendgrid", lambda *args: next(results))
+    monkeypatch.setattr(email_service, "_send_via_smtp", lambda *args: False)
+
+    assert not email_service._deliver("a@x", "s", "<p>hi</p>", None, None, app_ctx, idempotency_key="k")
+    assert email_service._deliver("a@x", "s", "<p>hi</p>", None, None, app_ctx, idempotency_key="k")
+
+
+def test_permanent_rejection_is_not_retried_or_failed_over(app_ctx, monkeypatch):
+    calls = []
+
+    def refuse(to, *args):
+        calls.append("sendgrid")
+        raise smtplib.SMTPRecipientsRefused({to: (550, b"no")})
+
+    monkeypatch.setattr(email_service, "_send_via_sendgrid", refuse)
+    monkeypatch.setattr(email_service, "_send_via_smtp", lambda *args: calls.append("smtp") or True)
+
+    assert not email_service._deliver("a@x", "s", "<p>hi</p>", None, None, app_ctx, max_retries=3)
+    assert calls == ["sendgrid"]
+    assert "sendgrid" not in email_service._provider_down_until
+
+
+def test_transient_error_fails_over_and_cools_down(app_ctx, monkeypatch):
+    def drop(*args):
+        raise smtplib.SMTPServerDisconnected()
+
+    monkeypatch.setattr(email_service, "_send_via_sendgrid", drop)
+    monkeypatch.setattr(email_service, "_send_via_smtp", lambda *args: True)
+
+    assert email_service._deliver("a@x", "s", "<p>hi</p>", None, None, app_ctx, max_retries=3)
+    assert email_service._ordered_providers(["sendgrid", "smtp"]) == ["smtp", "sendgrid"]
+
+
+@pytest.fixture
+def async_config(app_ctx, monkeypatch):
+    config = dict(app_ctx, send_async=True, smtp_host="mail.example.com", max_retries=1)
+    monkeypatch.setattr(current_app._get_current_object(), "_email_config", config)
+
+    class InlineExecutor:
+        def submit(self, fn, *args):
+            fn(*args)
+
+    monkeypatch.setattr(email_service, "_get_executor", lambda workers: InlineExecutor())
+    return config
+
+
+def test_async_send_without_a_configured_provider_fails(async_config, monkeypatch):
+    async_config.update(smtp_host="localhost", sendgrid_api_key="")
+    monkeypatch.setattr(email_service, "_outbox_add", lambda messages: pytest.fail("queued"))
+
+    assert email_service.send_email("a@x", "s", "<p>hi</p>") is False
+    assert email_service.send_bulk([{"to": "a@x", "subject": "s", "html_body": "h"}]) == [False]
+
+
+def test_async_send_records_outcome_in_outbox(async_config, monkeypatch):
+    finished = []
+    monkeypatch.setattr(email_service, "_outbox_add", lambda messages: list(range(10, 10 + len(messages))))
+    monkeypatch.setattr(email_service, "_outbox_finish", lambda ids, results, attempts: finished.append((ids, results, attempts)))
+    monkeypatch.setattr(email_service, "_send_via_sendgrid", lambda *args: False)
+    monkeypatch.setattr(email_service, "_send_via_smtp", lambda to, *args: to == "a@x")
+
+    assert email_service.send_email("a@x", "s", "<p>hi</p>") is True
+    assert email_service.send_email("b@x", "s", "<p>hi</p>") is True
+
+    assert finished == [([10], [True], 2), ([10], [False], 2)]
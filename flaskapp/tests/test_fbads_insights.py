@@ -0,0 +1,27 @@
+import pytest
+from flask import Flask
+
+from app.services import fbads_insights
+
+
+@pytest.fixture
+def app_ctx():
+    app = Flask(__name__)
+    with app.app_context():
+        yield app
+
+
+def test_follower_stops_waiting_on_a_stuck_leader(app_ctx, monkeypatch):
+    monkeypatch.setattr(fbads_insights, "_GENERATION_LOCK_TTL", 0.05)
+    monkeypatch.setitem(fbads_insights._INFLIGHT, 1, fbads_insights._Flight())  # leader never finishes
+
+    assert fbads_insights._single_flight(1, lambda: {"ok": True}) == {"ok": True}
+
+
+def test_follower_shares_the_leaders_result(app_ctx, monkeypatch):
+    flight = fbads_insights._Flight()
+    flight.result = {"ok": "shared"}
+    flight.done.set()
+    monkeypatch.setitem(fbads_insights._INFLIGHT, 1, flight)
+
+    assert fbads_insights._single_flight(1, lambda: pytest.fail("generated")) == {"ok": "shared"}
@@ -0,0 +1,70 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask
+
+from app.services import glsa_insights
+
+
+class _FakeOpenAI:
+    calls = 0
+
+    def __init__(self, api_key=None):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        type(self).calls += 1
+        content = json.dumps({"recommendations": [{"title": f"r{type(self).calls}"}]})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+@pytest.fixture
+def app_ctx(monkeypatch):
+    app = Flask(__name__)
+    app.config["OPENAI_API_KEY"] = "test"
+    _FakeOpenAI.calls = 0
+    monkeypatch.setattr(glsa_insights, "OpenAI", _FakeOpenAI)
+    monkeypatch.setattr(glsa_insights, "_build_glsa_prompt", lambda profile: ("sys", json.dumps(profile), "m", 0.7, 100))
+    monkeypatch.setattr(glsa_insights, "_prompt_results", {})
+    monkeypatch.setattr(glsa_insights, "_semantic_results", {})
+    with app.app_context():
+        yield app
+
+
+def test_identical_prompt_reuses_cached_result(app_ctx, monkeypatch):
+    monkeypatch.setattr(glsa_insights, "_embed_profile", lambda client, profile: None)
+
+    first = glsa_insights._call_openai_for_glsa_insights({"a": 1}, account_id=1)
+    second = glsa_insights._call_openai_for_glsa_insights({"a": 1}, account_id=1)
+
+    assert first == second == [{"title": "r1"}]
+    assert _FakeOpenAI.calls == 1
+
+
+def test_similarity_threshold(app_ctx, monkeypatch):
+    vectors = {1: [1.0, 0.0], 2: [0.99, 0.1], 3: [0.9, 0.43]}  # cosine to #1: ~0.995, ~0.90
+    monkeypatch.setattr(glsa_insights, "_embed_profile", lambda client, profile: vectors[profile["v"]])
+
+    glsa_insights._call_openai_for_glsa_insights({"v": 1}, account_id=1)
+    near = glsa_insights._call_openai_for_glsa_insights({"v": 2}, account_id=1)
+    far = glsa_insights._call_openai_for_glsa_insights({"v": 3}, account_id=1)
+    other_account = glsa_insights._call_openai_for_glsa_insights({"v": 2}, account_id=2)
+
+    assert near == [{"title": "r1"}]
+    assert far == [{"title": "r2"}]
+    assert other_account == [{"title": "r3"}]
+
+
+def test_regenerate_reuses_result_for_near_identical_profile(app_ctx, monkeypatch):
+    vectors = {1: [1.0, 0.0], 2: [0.99, 0.1]}
+    monkeypatch.setattr(glsa_insights, "_embed_profile", lambda client, profile: vectors[profile["v"]])
+    stored = []
+    monkeypatch.setattr(glsa_insights, "_store_recommendations", lambda account_id, recs, profile: stored.append(recs))
+    monkeypatch.setattr(glsa_insights, "_format_recommendations_response", lambda account_id: {})
+
+    glsa_insights.generate_glsa_insights(1, {"v": 1}, regenerate=True)
+    glsa_insights.generate_glsa_insights(1, {"v": 2}, regenerate=True)
+
+    assert stored == [[{"title": "r1"}], [{"title": "r1"}]]
+    assert _FakeOpenAI.calls == 1
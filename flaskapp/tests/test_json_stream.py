@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from app.services.json_stream import StreamedItemParser
+
+DOC = json.dumps({
+    "recommendations": [
+        {"title": "Quote \" and brace } inside", "action": {"type": "x"}},
+        {"title": "Backslash \\ then [bracket]", "data_points": [1, {"n": 2}]},
+    ],
+    "notes": "{not an item}",
+})
+
+
+def _feed_all(parser, chunks):
+    items = []
+    for chunk in chunks:
+        items.extend(parser.feed(chunk))
+    return items
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, len(DOC)])
+def test_items_survive_any_chunking(size):
+    parser = StreamedItemParser()
+    items = _feed_all(parser, [DOC[i:i + size] for i in range(0, len(DOC), size)])
+
+    assert items == json.loads(DOC)["recommendations"]
+    assert parser.complete
+
+
+def test_item_is_yielded_as_soon_as_it_closes():
+    parser = StreamedItemParser()
+    first_end = DOC.index('"x"}}') + len('"x"}}')
+
+    assert _feed_all(parser, [DOC[:first_end - 1]]) == []
+    assert _feed_all(parser, [DOC[first_end - 1:first_end]]) == [json.loads(DOC)["recommendations"][0]]
+    assert not parser.complete
+
+
+def test_escaped_quote_at_chunk_boundary():
+    parser = StreamedItemParser()
+    doc = '{"r": [{"t": "a\\"}b"}]}'
+    split = doc.index('\\') + 1
+
+    assert _feed_all(parser, [doc[:split], doc[split:]]) == [{"t": 'a"}b'}]
+
+
+def test_bare_array_and_surrounding_text():
+    parser = StreamedItemParser(container=('[',))
+    items = _feed_all(parser, ['```json\n[{"a": 1}, 2, {"b"', ': 2}]\n```'])
+
+    assert items == [{"a": 1}, {"b": 2}]
+    assert parser.complete
+
+
+def test_not_complete_before_any_json():
+    parser = StreamedItemParser()
+    assert _feed_all(parser, ["```json\n"]) == []
+    assert not parser.complete
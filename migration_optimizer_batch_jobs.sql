@@ -0,0 +1,37 @@
+-- ============================================================================
+-- Migration: Add optimizer_batch_jobs table for OpenAI Batch API submissions
+-- Database: MySQL
+-- Created: 2026-10-18
+-- ============================================================================
+
+-- Create optimizer_batch_jobs table
+CREATE TABLE IF NOT EXISTS `optimizer_batch_jobs` (
+  `id` BIGINT NOT NULL AUTO_INCREMENT,
+  `source_type` VARCHAR(32) NOT NULL COMMENT 'fbads, ...',
+
+  -- OpenAI identifiers
+  `batch_id` VARCHAR(64) NOT NULL,
+  `input_file_id` VARCHAR(64) NOT NULL,
+  `output_file_id` VARCHAR(64) DEFAULT NULL,
+
+  `status` VARCHAR(16) NOT NULL DEFAULT 'submitted' COMMENT 'submitted, completed, failed, expired, cancelled',
+
+  -- Inputs each request was built from, keyed by account ID
+  `request_json` TEXT NOT NULL COMMENT 'JSON object',
+  `error` TEXT DEFAULT NULL,
+
+  -- Audit fields
+  `created_at` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  `completed_at` DATETIME DEFAULT NULL,
+
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `batch_id` (`batch_id`),
+  INDEX `ix_optimizer_batch_jobs_status` (`status`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='OpenAI Batch API jobs for overnight insight regeneration';
+
+-- ============================================================================
+-- Verify migration
+-- ============================================================================
+SELECT 'Table created successfully' AS status;
+SHOW CREATE TABLE `optimizer_batch_jobs`;
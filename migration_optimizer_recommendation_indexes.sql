@@ -0,0 +1,19 @@
+-- ============================================================================
+-- Migration: Add compound indexes for open-recommendation lookups
+-- Database: MySQL
+-- Created: 2026-10-18
+-- ============================================================================
+
+-- Listing open recommendations for an account ordered by severity, recency
+CREATE INDEX `ix_optrec_acct_src_status_sev_ctime`
+  ON `optimizer_recommendations` (`account_id`, `source_type`, `status`, `severity`, `created_at`);
+
+-- Freshness check ("any open insights newer than N hours?")
+CREATE INDEX `ix_optrec_recent`
+  ON `optimizer_recommendations` (`account_id`, `source_type`, `status`, `created_at`);
+
+-- ============================================================================
+-- Verify migration
+-- ============================================================================
+SELECT 'Indexes created successfully' AS status;
+SHOW INDEX FROM `optimizer_recommendations`;
@@ -0,0 +1,22 @@
+-- ============================================================================
+-- Migration: Add per-property indexes for open-recommendation lookups
+-- Database: MySQL
+-- Created: 2026-10-18
+-- ============================================================================
+-- Google Analytics (and Search Console) insights filter on account, source
+-- type, property/site and status. MySQL has no partial indexes, so the
+-- equality columns lead and the sort/range column comes last.
+
+-- Open recommendations for a property, ordered by severity
+CREATE INDEX `ix_optrec_src_id_status_sev`
+  ON `optimizer_recommendations` (`account_id`, `source_type`, `source_id`, `status`, `severity`);
+
+-- Freshness check for a property ("any open insights newer than 6 hours?")
+CREATE INDEX `ix_optrec_src_id_recent`
+  ON `optimizer_recommendations` (`account_id`, `source_type`, `source_id`, `status`, `created_at`);
+
+-- ============================================================================
+-- Verify migration
+-- ============================================================================
+SELECT 'Indexes created successfully' AS status;
+SHOW INDEX FROM `optimizer_recommendations`;